@@ -0,0 +1,26 @@
+from django_filters.rest_framework import FilterSet, NumberFilter
+
+from analytics.models import PizzaSalesDaily, PizzaSalesHourly
+
+
+class PizzaSalesFilter(FilterSet):
+    """
+    Pizza and size are filtered by plain ids, rollups keep sales of deleted pizzas too and the ids need
+    no lookup
+    """
+    pizza_name = NumberFilter()
+    pizza_size = NumberFilter()
+
+
+class HourlySalesFilter(PizzaSalesFilter):
+
+    class Meta:
+        model = PizzaSalesHourly
+        fields = {'hour': ['gte', 'lt']}
+
+
+class DailySalesFilter(PizzaSalesFilter):
+
+    class Meta:
+        model = PizzaSalesDaily
+        fields = {'day': ['gte', 'lte']}
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.rollups import backfill
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the analytics rollups from scratch, one day per transaction. Afterwards refresh_analytics
+    continues with the changes made during the backfill
+    """
+    help = 'Rebuilds the analytics rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='first_day', help='First day to rebuild, YYYY-MM-DD')
+        parser.add_argument('--to', dest='last_day', help='Last day to rebuild, YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        try:
+            first_day, last_day = (
+                datetime.strptime(options[x], '%Y-%m-%d').date() if options[x] else None
+                for x in ('first_day', 'last_day')
+            )
+        except ValueError:
+            raise CommandError('Days must be in the YYYY-MM-DD format')
+
+        days, customers = backfill(first_day, last_day, progress=lambda day: self.stdout.write(str(day)))
+        self.stdout.write(self.style.SUCCESS('Rebuilt {} days and the totals of {} customers'.format(days, customers)))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import refresh
+
+
+class Command(BaseCommand):
+    """
+    Brings the analytics rollups up to date with the orders and items changed since the previous run.
+    Meant to run every minute or so from cron, the first run rebuilds everything
+    """
+    help = 'Refreshes the analytics rollups incrementally'
+
+    def handle(self, *args, **options):
+        hours, customers = refresh()
+        self.stdout.write('Rebuilt {} hours and {} customers'.format(hours, customers))
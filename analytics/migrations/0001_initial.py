@@ -0,0 +1,86 @@
+# Generated by Django 2.1.4 on 2026-10-18 02:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('customers', '0003_contact_indexes'),
+        ('pizzas', '0002_active_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerOrderTotals',
+            fields=[
+                ('customer', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='customers.Customers')),
+                ('orders', models.PositiveIntegerField(verbose_name='Number of orders')),
+                ('pizzas', models.PositiveIntegerField(verbose_name='Number of pizzas')),
+                ('items', models.PositiveIntegerField(verbose_name='Number of items')),
+                ('first_order', models.DateTimeField(verbose_name='First order')),
+                ('last_order', models.DateTimeField(verbose_name='Last order')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PizzaSalesDaily',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('pizzas', models.PositiveIntegerField(verbose_name='Number of pizzas')),
+                ('items', models.PositiveIntegerField(verbose_name='Number of items')),
+                ('pizza_name', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='pizzas.Pizzas')),
+                ('pizza_size', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='pizzas.PizzaSizes')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PizzaSalesHourly',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='Hour')),
+                ('pizzas', models.PositiveIntegerField(verbose_name='Number of pizzas')),
+                ('items', models.PositiveIntegerField(verbose_name='Number of items')),
+                ('pizza_name', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='pizzas.Pizzas')),
+                ('pizza_size', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='pizzas.PizzaSizes')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(null=True, verbose_name='Hour')),
+                ('order_id', models.IntegerField(null=True, verbose_name='Order')),
+                ('customer_id', models.IntegerField(null=True, verbose_name='Customer')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Name')),
+                ('refreshed', models.DateTimeField(verbose_name='Refreshed')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='customerordertotals',
+            index=models.Index(fields=['-orders', '-customer'], name='customer_totals_orders_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pizzasaleshourly',
+            index=models.Index(fields=['pizza_name', 'hour'], name='sales_hourly_pizza_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='pizzasaleshourly',
+            unique_together={('hour', 'pizza_name', 'pizza_size')},
+        ),
+        migrations.AddIndex(
+            model_name='pizzasalesdaily',
+            index=models.Index(fields=['pizza_name', 'day'], name='sales_daily_pizza_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='pizzasalesdaily',
+            unique_together={('day', 'pizza_name', 'pizza_size')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.1.4 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+def fill_rank(apps, schema_editor):
+    CustomerOrderTotals = apps.get_model('analytics', 'CustomerOrderTotals')
+    CustomerOrderTotals.objects.update(rank=models.F('orders') * 2 ** 32 + models.F('customer_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customerordertotals',
+            name='customer_totals_orders_idx',
+        ),
+        migrations.AddField(
+            model_name='customerordertotals',
+            name='rank',
+            field=models.BigIntegerField(null=True, verbose_name='Rank'),
+        ),
+        migrations.RunPython(fill_rank, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customerordertotals',
+            name='rank',
+            field=models.BigIntegerField(unique=True, verbose_name='Rank'),
+        ),
+    ]
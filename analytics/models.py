@@ -0,0 +1,91 @@
+from django.db import models
+
+
+class PizzaSalesHourly(models.Model):
+    """
+    Pizzas sold per hour, pizza and size. Rows are rebuilt from OrderItem by analytics.rollups, items of
+    canceled orders and inactive items are not counted
+    """
+    hour = models.DateTimeField('Hour')
+    # Indexed together with the period below
+    pizza_name = models.ForeignKey('pizzas.Pizzas', on_delete=models.DO_NOTHING, db_constraint=False, null=True,
+                                   db_index=False, related_name='+')
+    pizza_size = models.ForeignKey('pizzas.PizzaSizes', on_delete=models.DO_NOTHING, db_constraint=False,
+                                   null=True, related_name='+')
+    pizzas = models.PositiveIntegerField('Number of pizzas')
+    items = models.PositiveIntegerField('Number of items')
+
+    class Meta:
+        unique_together = ('hour', 'pizza_name', 'pizza_size')
+        indexes = [
+            models.Index(fields=['pizza_name', 'hour'], name='sales_hourly_pizza_idx'),
+        ]
+
+
+class PizzaSalesDaily(models.Model):
+    """
+    Pizzas sold per day, pizza and size, summed up from PizzaSalesHourly. Days are in settings.TIME_ZONE
+    """
+    day = models.DateField('Day')
+    # Indexed together with the period below
+    pizza_name = models.ForeignKey('pizzas.Pizzas', on_delete=models.DO_NOTHING, db_constraint=False, null=True,
+                                   db_index=False, related_name='+')
+    pizza_size = models.ForeignKey('pizzas.PizzaSizes', on_delete=models.DO_NOTHING, db_constraint=False,
+                                   null=True, related_name='+')
+    pizzas = models.PositiveIntegerField('Number of pizzas')
+    items = models.PositiveIntegerField('Number of items')
+
+    class Meta:
+        unique_together = ('day', 'pizza_name', 'pizza_size')
+        indexes = [
+            models.Index(fields=['pizza_name', 'day'], name='sales_daily_pizza_idx'),
+        ]
+
+
+class CustomerOrderTotals(models.Model):
+    """
+    Order totals of a customer, canceled orders are not counted
+    """
+    customer = models.OneToOneField('customers.Customers', primary_key=True, on_delete=models.DO_NOTHING,
+                                    db_constraint=False, related_name='+')
+    orders = models.PositiveIntegerField('Number of orders')
+    pizzas = models.PositiveIntegerField('Number of pizzas')
+    items = models.PositiveIntegerField('Number of items')
+    first_order = models.DateTimeField('First order')
+    last_order = models.DateTimeField('Last order')
+    # Unique sort key of the "most orders first" list, see rank_of
+    rank = models.BigIntegerField('Rank', unique=True)
+
+    def save(self, *args, **kwargs):
+        self.rank = self.rank_of(self.orders, self.customer_id)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def rank_of(orders, customer_id):
+        """
+        Number of orders in the high bits and the customer id in the low 32 bits. Cursor pagination takes its
+        position from one column only, on 'orders' alone every page would skip the customers with the same
+        number of orders with an OFFSET
+        :type orders: int
+        :type customer_id: int
+        :rtype: int
+        """
+        return (orders << 32) | customer_id
+
+
+class RollupChange(models.Model):
+    """
+    Hours and customers affected by deleted orders and items. Changed rows are found by their 'updated'
+    timestamp, deleted ones leave a record here until the next refresh
+    """
+    hour = models.DateTimeField('Hour', null=True)
+    order_id = models.IntegerField('Order', null=True)
+    customer_id = models.IntegerField('Customer', null=True)
+
+
+class RollupState(models.Model):
+    """
+    Time of the last refresh of the rollups
+    """
+    name = models.CharField('Name', max_length=50, primary_key=True)
+    refreshed = models.DateTimeField('Refreshed')
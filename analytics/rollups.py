@@ -0,0 +1,236 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+
+from analytics.models import CustomerOrderTotals, PizzaSalesDaily, PizzaSalesHourly, RollupChange, RollupState
+from customers.models import Customers
+from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+STATE_NAME = 'rollups'
+HOUR = timedelta(hours=1)
+
+
+def hour_of(value):
+    """
+    Start of the hour of a timestamp in settings.TIME_ZONE, like Trunc(..., 'hour')
+    :type value: datetime
+    :rtype: datetime
+    """
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(day):
+    """
+    Midnight of a day in settings.TIME_ZONE
+    :type day: date
+    :rtype: datetime
+    """
+    return timezone.make_aware(datetime.combine(day, time()))
+
+
+def rebuild_sales(start, end):
+    """
+    Recalculates the hourly sales of [start, end) from the order items, archived ones included, and the daily
+    sales of the days the range touches from the hourly ones
+    :param start: start of an hour
+    :type start: datetime
+    :param end: start of an hour
+    :type end: datetime
+    """
+    def sales(items):
+        return items.filter(
+            created__gte=start, created__lt=end, is_active=True
+        ).exclude(
+            order__order_state=Order.CANCELED
+        ).annotate(
+            hour=Trunc('created', 'hour')
+        ).order_by().values('hour', 'pizza_name', 'pizza_size').annotate(
+            pizzas=Sum('number_of_pizzas'), items=Count('id')
+        )
+
+    totals = {}
+    # Archived orders are final, their items still count. Both tables are read by one UNION ALL statement, so
+    # an archive batch committed in between can't be seen in both or in neither
+    for x in sales(OrderItem.objects).union(sales(ArchivedOrderItem.objects), all=True):
+        key = (x['hour'], x['pizza_name'], x['pizza_size'])
+        pizzas, count = totals.get(key, (0, 0))
+        totals[key] = (pizzas + x['pizzas'], count + x['items'])
+    first_day = timezone.localtime(start).date()
+    last_day = timezone.localtime(end - timedelta(microseconds=1)).date()
+    with transaction.atomic():
+        PizzaSalesHourly.objects.filter(hour__gte=start, hour__lt=end).delete()
+        PizzaSalesHourly.objects.bulk_create([
+            PizzaSalesHourly(hour=hour, pizza_name_id=pizza_name, pizza_size_id=pizza_size, pizzas=pizzas, items=count)
+            for (hour, pizza_name, pizza_size), (pizzas, count) in totals.items()
+        ])
+        rebuild_days(first_day, last_day)
+
+
+def rebuild_days(first_day, last_day):
+    """
+    Sums up the hourly sales of the days from first_day to last_day inclusive
+    :type first_day: date
+    :type last_day: date
+    """
+    start, end = day_start(first_day), day_start(last_day + timedelta(days=1))
+    rows = PizzaSalesHourly.objects.filter(hour__gte=start, hour__lt=end).annotate(
+        day=TruncDate('hour')
+    ).order_by().values('day', 'pizza_name', 'pizza_size').annotate(pizzas=Sum('pizzas'), items=Sum('items'))
+    PizzaSalesDaily.objects.filter(day__gte=first_day, day__lte=last_day).delete()
+    PizzaSalesDaily.objects.bulk_create([
+        PizzaSalesDaily(day=x['day'], pizza_name_id=x['pizza_name'], pizza_size_id=x['pizza_size'],
+                        pizzas=x['pizzas'], items=x['items'])
+        for x in rows
+    ])
+
+
+def rebuild_customers(customer_ids):
+    """
+    Recalculates the order totals of the customers from the counters of their orders and archived orders
+    :type customer_ids: list
+    """
+    def totals_of(orders):
+        return orders.filter(customer__in=customer_ids).exclude(order_state=Order.CANCELED).order_by().values(
+            'customer'
+        ).annotate(
+            orders=Count('id'), pizzas=Sum('total_pizzas'), items=Sum('active_items'),
+            first_order=Min('created'), last_order=Max('created')
+        )
+
+    totals = {}
+    # One UNION ALL statement, see rebuild_sales
+    for x in totals_of(Order.objects).union(totals_of(ArchivedOrder.objects), all=True):
+        customer_id = x.pop('customer')
+        if customer_id in totals:
+            total = totals[customer_id]
+            x = {'orders': total['orders'] + x['orders'], 'pizzas': total['pizzas'] + x['pizzas'],
+                 'items': total['items'] + x['items'], 'first_order': min(total['first_order'], x['first_order']),
+                 'last_order': max(total['last_order'], x['last_order'])}
+        totals[customer_id] = x
+    with transaction.atomic():
+        CustomerOrderTotals.objects.filter(customer__in=customer_ids).delete()
+        CustomerOrderTotals.objects.bulk_create([
+            CustomerOrderTotals(customer_id=customer_id, rank=CustomerOrderTotals.rank_of(x['orders'], customer_id),
+                                **x)
+            for customer_id, x in totals.items()
+        ])
+
+
+def hour_ranges(hours):
+    """
+    Joins consecutive hours into [start, end) ranges
+    :type hours: iterable
+    :rtype: list
+    """
+    ranges = []
+    for hour in sorted(hours):
+        if ranges and ranges[-1][1] == hour:
+            ranges[-1][1] = hour + HOUR
+        else:
+            ranges.append([hour, hour + HOUR])
+    return [tuple(x) for x in ranges]
+
+
+def chunks(values, size):
+    """
+    Splits values into lists of the size
+    :type values: iterable
+    :type size: int
+    """
+    chunk = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def refresh():
+    """
+    Rebuilds the rollup rows affected by changes since the previous refresh. Changed items and orders are
+    found by their 'updated' timestamp, deleted ones by RollupChange. The previous refresh time is moved back
+    by settings.ANALYTICS_REFRESH_OVERLAP, so changes of transactions committed late are not missed,
+    rebuilding a row twice is harmless. Without a previous refresh everything is rebuilt, see backfill
+    :return: number of rebuilt hours and customers
+    :rtype: tuple
+    """
+    if not RollupState.objects.filter(name=STATE_NAME).exists():
+        return backfill()
+
+    now = timezone.now()
+    with transaction.atomic():
+        # The lock keeps concurrent refreshes from running at once
+        state = RollupState.objects.select_for_update().get(name=STATE_NAME)
+        since = state.refreshed - timedelta(seconds=settings.ANALYTICS_REFRESH_OVERLAP)
+        changes = list(RollupChange.objects.all())
+
+        hours = {hour_of(x.hour) for x in changes if x.hour}
+        for items in (OrderItem.objects.filter(updated__gte=since),
+                      OrderItem.objects.filter(order__updated__gte=since)):
+            hours.update(items.annotate(hour=Trunc('created', 'hour')).order_by().values_list(
+                'hour', flat=True
+            ).distinct())
+
+        customers = {x.customer_id for x in changes if x.customer_id}
+        for orders in (Order.objects.filter(updated__gte=since),
+                       Order.objects.filter(items__updated__gte=since),
+                       Order.objects.filter(id__in={x.order_id for x in changes if x.order_id})):
+            customers.update(orders.order_by().values_list('customer', flat=True).distinct())
+        customers.discard(None)
+
+        for start, end in hour_ranges(hours):
+            rebuild_sales(start, end)
+        for chunk in chunks(customers, settings.ANALYTICS_BATCH_SIZE):
+            rebuild_customers(chunk)
+
+        RollupChange.objects.filter(id__in=[x.id for x in changes]).delete()
+        state.refreshed = now
+        state.save()
+    return len(hours), len(customers)
+
+
+def backfill(first_day=None, last_day=None, progress=None):
+    """
+    Rebuilds the sales day by day and the totals of all customers, then records the refresh time taken before
+    the start, so the next refresh picks up changes made in the meantime
+    :param first_day: first day to rebuild, the day of the oldest item by default
+    :type first_day: date
+    :param last_day: last day to rebuild, the day of the newest item by default
+    :type last_day: date
+    :param progress: called with every rebuilt day
+    :return: number of rebuilt days and customers
+    :rtype: tuple
+    """
+    started = timezone.now()
+    last_change = RollupChange.objects.aggregate(last=Max('id'))['last']
+
+    bounds = [x for items in (OrderItem.objects, ArchivedOrderItem.objects)
+              for x in items.aggregate(first=Min('created'), last=Max('created')).values() if x is not None]
+    days = 0
+    if bounds:
+        day = first_day or timezone.localtime(min(bounds)).date()
+        last_day = last_day or timezone.localtime(max(bounds)).date()
+        while day <= last_day:
+            rebuild_sales(day_start(day), day_start(day + timedelta(days=1)))
+            days += 1
+            if progress:
+                progress(day)
+            day += timedelta(days=1)
+
+    customers = 0
+    customer_ids = Customers.objects.order_by('id').values_list('id', flat=True)
+    for chunk in chunks(customer_ids.iterator(), settings.ANALYTICS_BATCH_SIZE):
+        rebuild_customers(chunk)
+        customers += len(chunk)
+
+    if last_change is not None:
+        RollupChange.objects.filter(id__lte=last_change).delete()
+    RollupState.objects.update_or_create(name=STATE_NAME, defaults={'refreshed': started})
+    return days, customers
@@ -0,0 +1,41 @@
+from rest_framework.serializers import ModelSerializer, Serializer, IntegerField
+
+from analytics.models import CustomerOrderTotals, PizzaSalesDaily, PizzaSalesHourly
+from core.serializers import SelectableFieldsMixin
+
+
+class PizzaSalesHourlySerializer(SelectableFieldsMixin, ModelSerializer):
+    """
+    A serializer for hourly pizza sales
+    """
+    class Meta:
+        model = PizzaSalesHourly
+        fields = ('hour', 'pizza_name', 'pizza_size', 'pizzas', 'items')
+
+
+class PizzaSalesDailySerializer(SelectableFieldsMixin, ModelSerializer):
+    """
+    A serializer for daily pizza sales
+    """
+    class Meta:
+        model = PizzaSalesDaily
+        fields = ('day', 'pizza_name', 'pizza_size', 'pizzas', 'items')
+
+
+class PizzaSalesSummarySerializer(Serializer):
+    """
+    Sales of a pizza and size summed up over a period
+    """
+    pizza_name = IntegerField()
+    pizza_size = IntegerField()
+    pizzas = IntegerField()
+    items = IntegerField()
+
+
+class CustomerOrderTotalsSerializer(SelectableFieldsMixin, ModelSerializer):
+    """
+    A serializer for order totals of a customer
+    """
+    class Meta:
+        model = CustomerOrderTotals
+        fields = ('customer', 'orders', 'pizzas', 'items', 'first_order', 'last_order')
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from analytics.models import RollupChange
+from analytics.rollups import hour_of
+from orders.models import Order, OrderItem
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created, **kwargs):
+    """
+    An order moved to another customer changes the totals of the previous customer as well
+    """
+    previous = getattr(instance, '_loaded_customer', None)
+    if not created and previous is not None and previous != instance.customer_id:
+        RollupChange.objects.create(customer_id=previous)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    if instance.customer_id is not None:
+        RollupChange.objects.create(customer_id=instance.customer_id)
+
+
+@receiver(post_save, sender=OrderItem)
+def item_saved(sender, instance, created, **kwargs):
+    """
+    An item moved to another order changes the totals of the customer of the previous order. '_counted' still
+    holds the previous order during post_save
+    """
+    counted = getattr(instance, '_counted', None)
+    if not created and counted and counted[0] != instance.order_id:
+        RollupChange.objects.create(order_id=counted[0])
+
+
+@receiver(post_delete, sender=OrderItem)
+def item_deleted(sender, instance, **kwargs):
+    RollupChange.objects.create(hour=hour_of(instance.created), order_id=instance.order_id)
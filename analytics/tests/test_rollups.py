@@ -0,0 +1,204 @@
+from datetime import date, datetime, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APIClient
+
+from analytics.models import CustomerOrderTotals, PizzaSalesDaily, PizzaSalesHourly
+from analytics.rollups import backfill, hour_ranges, refresh
+from orders.archive import archive_orders
+from customers.models import Customers
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+NOON = timezone.make_aware(datetime(2026, 3, 1, 12))
+
+
+class RollupsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customers.objects.create(name='rollups', phone='777', gender=Customers.FEMALE)
+        cls.other_customer = Customers.objects.create(name='rollups_2', phone='778', gender=Customers.MALE)
+        cls.pizza = Pizzas.objects.create(name='rollups_pizza')
+        cls.size = PizzaSizes.objects.create(sizename=PizzaSizes.SMALL)
+
+    def setUp(self):
+        self.order = Order.objects.create(customer=RollupsTest.customer)
+
+    def add_item(self, number_of_pizzas, created, order=None):
+        item = OrderItem.objects.create(order=order or self.order, pizza_name=RollupsTest.pizza,
+                                        pizza_size=RollupsTest.size, number_of_pizzas=number_of_pizzas)
+        OrderItem.objects.filter(pk=item.pk).update(created=created)
+        item.refresh_from_db()
+        return item
+
+    def hourly(self):
+        return list(PizzaSalesHourly.objects.order_by('hour').values_list('hour', 'pizzas', 'items'))
+
+    def test_backfill(self):
+        self.add_item(2, NOON)
+        self.add_item(3, NOON + timedelta(minutes=30))
+        self.add_item(1, NOON + timedelta(hours=13))
+        canceled = Order.objects.create(customer=RollupsTest.customer, order_state=Order.CANCELED)
+        self.add_item(10, NOON, order=canceled)
+
+        self.assertEqual(backfill(), (2, 2))
+        self.assertEqual(self.hourly(), [(NOON, 5, 2), (NOON + timedelta(hours=13), 1, 1)])
+        self.assertEqual(
+            list(PizzaSalesDaily.objects.order_by('day').values_list('day', 'pizzas')),
+            [(date(2026, 3, 1), 5), (date(2026, 3, 2), 1)]
+        )
+        totals = CustomerOrderTotals.objects.get(customer=RollupsTest.customer)
+        self.assertEqual((totals.orders, totals.pizzas, totals.items), (1, 6, 3))
+
+    def test_refresh_picks_up_changes(self):
+        first = self.add_item(2, NOON)
+        second = self.add_item(3, NOON + timedelta(hours=1))
+        backfill()
+
+        other_order = Order.objects.create(customer=RollupsTest.other_customer)
+        self.add_item(4, NOON, order=other_order)
+        second.delete()
+        first.number_of_pizzas = 5
+        first.save()
+        refresh()
+
+        self.assertEqual(self.hourly(), [(NOON, 9, 2)])
+        self.assertEqual(CustomerOrderTotals.objects.get(customer=RollupsTest.customer).pizzas, 5)
+        self.assertEqual(CustomerOrderTotals.objects.get(customer=RollupsTest.other_customer).pizzas, 4)
+
+        self.order.order_state = Order.CANCELED
+        self.order.customer = RollupsTest.other_customer
+        self.order.save()
+        refresh()
+
+        self.assertEqual(self.hourly(), [(NOON, 4, 1)])
+        self.assertFalse(CustomerOrderTotals.objects.filter(customer=RollupsTest.customer).exists())
+
+    def test_archived_orders_still_count(self):
+        self.add_item(2, NOON)
+        self.add_item(3, NOON)
+        Order.objects.filter(pk=self.order.pk).update(order_state=Order.DELIVERED)
+        recent = Order.objects.create(customer=RollupsTest.customer)
+        self.add_item(4, NOON, order=recent)
+        backfill()
+
+        archive_orders(timezone.now() + timedelta(seconds=1))
+        recent.delete()
+        refresh()
+        self.assertEqual(self.hourly(), [(NOON, 5, 2)])
+        totals = CustomerOrderTotals.objects.get(customer=RollupsTest.customer)
+        self.assertEqual((totals.orders, totals.pizzas, totals.items), (1, 5, 2))
+        backfill()
+        self.assertEqual(self.hourly(), [(NOON, 5, 2)])
+
+    def test_live_and_archived_read_at_once(self):
+        self.add_item(2, NOON)
+        Order.objects.filter(pk=self.order.pk).update(order_state=Order.DELIVERED)
+        archived = Order.objects.create(customer=RollupsTest.customer, order_state=Order.DELIVERED)
+        self.add_item(3, NOON, order=archived)
+        archive_orders(timezone.now() + timedelta(seconds=1))
+        self.order = Order.objects.create(customer=RollupsTest.customer)
+        self.add_item(4, NOON)
+
+        with CaptureQueriesContext(connection) as captured:
+            backfill(NOON.date(), NOON.date())
+        reads = [x['sql'] for x in captured if 'order_state' in x['sql'] and x['sql'].startswith('SELECT')]
+        self.assertEqual(len(reads), 2)
+        self.assertTrue(all('UNION ALL' in x for x in reads))
+        self.assertEqual(self.hourly(), [(NOON, 9, 3)])
+        totals = CustomerOrderTotals.objects.get(customer=RollupsTest.customer)
+        self.assertEqual((totals.orders, totals.pizzas, totals.items), (3, 9, 3))
+
+    def test_hour_ranges(self):
+        hours = [NOON + timedelta(hours=x) for x in (3, 0, 1, 5)]
+        self.assertEqual(hour_ranges(hours), [
+            (NOON, NOON + timedelta(hours=2)),
+            (NOON + timedelta(hours=3), NOON + timedelta(hours=4)),
+            (NOON + timedelta(hours=5), NOON + timedelta(hours=6)),
+        ])
+
+
+class AnalyticsApiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        pizzas = [Pizzas.objects.create(name='analytics_{}'.format(x)) for x in range(2)]
+        size = PizzaSizes.objects.create(sizename=PizzaSizes.LARGE)
+        for day in range(3):
+            for number, pizza in enumerate(pizzas):
+                PizzaSalesDaily.objects.create(day=date(2026, 3, 1 + day), pizza_name=pizza, pizza_size=size,
+                                               pizzas=number + 1, items=1)
+                PizzaSalesHourly.objects.create(hour=NOON + timedelta(days=day), pizza_name=pizza, pizza_size=size,
+                                                pizzas=number + 1, items=1)
+        cls.pizzas = pizzas
+        cls.customer = Customers.objects.create(name='analytics', phone='779', gender=Customers.FEMALE)
+        CustomerOrderTotals.objects.create(customer=cls.customer, orders=2, pizzas=3, items=2,
+                                           first_order=NOON, last_order=NOON)
+
+    def test_hourly_sales(self):
+        with self.assertNumQueries(1):
+            res = AnalyticsApiTest.client.get(reverse('analytics:sales-hourly-list'), {
+                'pizza_name': AnalyticsApiTest.pizzas[0].id, 'hour__gte': (NOON + timedelta(days=1)).isoformat()
+            })
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual([x['pizzas'] for x in res.data['results']], [1, 1])
+
+    def test_daily_summary(self):
+        res = AnalyticsApiTest.client.get(reverse('analytics:sales-daily-summary'), {'day__lte': '2026-03-02'})
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual([(x['pizza_name'], x['pizzas']) for x in res.data], [
+            (AnalyticsApiTest.pizzas[1].id, 4), (AnalyticsApiTest.pizzas[0].id, 2)
+        ])
+
+    def test_customer_totals(self):
+        res = AnalyticsApiTest.client.get(reverse('analytics:customer-totals-detail', args=[AnalyticsApiTest.customer.id]))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data['orders'], 2)
+
+    def pages(self, url, **params):
+        """
+        Follows the cursor from the first page to the last one
+        :return: rows of all pages and the SQL of every page
+        :rtype: tuple
+        """
+        rows, queries = [], []
+        params['page_size'] = 1
+        res = AnalyticsApiTest.client.get(url, params)
+        while True:
+            rows.extend(res.data['results'])
+            if not res.data['next']:
+                return rows, queries
+            with CaptureQueriesContext(connection) as captured:
+                res = AnalyticsApiTest.client.get(res.data['next'])
+            queries.extend(x['sql'] for x in captured)
+
+    def test_customer_totals_pages_on_rank(self):
+        """
+        Customers with the same number of orders are paged by the cursor, not by an OFFSET
+        """
+        for number in range(3):
+            customer = Customers.objects.create(name='ties_{}'.format(number), phone='78{}'.format(number),
+                                                gender=Customers.MALE)
+            CustomerOrderTotals.objects.create(customer=customer, orders=1, pizzas=1, items=1,
+                                               first_order=NOON, last_order=NOON)
+        rows, queries = self.pages(reverse('analytics:customer-totals-list'))
+
+        self.assertEqual([x['orders'] for x in rows], [2, 1, 1, 1])
+        self.assertEqual(len({x['customer'] for x in rows}), 4)
+        self.assertTrue(all('OFFSET' not in x for x in queries))
+
+    def test_hourly_sales_ties(self):
+        """
+        Rows of the same hour are all returned once, skipped with an OFFSET within the hour
+        """
+        rows, _ = self.pages(reverse('analytics:sales-hourly-list'))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(len({(x['hour'], x['pizza_name']) for x in rows}), 6)
@@ -0,0 +1,15 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from analytics import views
+
+
+router = DefaultRouter()
+router.register('analytics/sales/hourly', views.HourlySalesViewSet, basename='sales-hourly')
+router.register('analytics/sales/daily', views.DailySalesViewSet, basename='sales-daily')
+router.register('analytics/customers', views.CustomerTotalsViewSet, basename='customer-totals')
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('', include(router.urls))
+]
@@ -0,0 +1,77 @@
+from django.db.models import Sum
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from analytics.filters import DailySalesFilter, HourlySalesFilter
+from analytics.models import CustomerOrderTotals, PizzaSalesDaily, PizzaSalesHourly
+from analytics.serializers import CustomerOrderTotalsSerializer, PizzaSalesDailySerializer, \
+                                  PizzaSalesHourlySerializer, PizzaSalesSummarySerializer
+from core.mixins import SparseFieldsMixin
+from core.pagination import CreatedCursorPagination
+
+
+class HourlyCursorPagination(CreatedCursorPagination):
+    """
+    The cursor position is the hour. Rows of one hour, at most one per pizza and size, are skipped with an
+    OFFSET, so a page costs at most the size of the menu more
+    """
+    ordering = ('-hour', '-id')
+
+
+class DailyCursorPagination(CreatedCursorPagination):
+    """
+    The cursor position is the day, rows of one day are skipped with an OFFSET like in HourlyCursorPagination
+    """
+    ordering = ('-day', '-id')
+
+
+class CustomerTotalsCursorPagination(CreatedCursorPagination):
+    """
+    Most orders first. The position is the unique rank, see CustomerOrderTotals.rank_of
+    """
+    ordering = ('-rank',)
+
+
+class HourlySalesViewSet(SparseFieldsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Pizzas sold per hour, pizza and size, newest first. Filtered by '?hour__gte=', '?hour__lt=', '?pizza_name='
+    and '?pizza_size='. Rows are maintained by the refresh_analytics command
+    """
+    serializer_class = PizzaSalesHourlySerializer
+    queryset = PizzaSalesHourly.objects.all()
+    pagination_class = HourlyCursorPagination
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = HourlySalesFilter
+
+
+class DailySalesViewSet(SparseFieldsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Pizzas sold per day, pizza and size, newest first. Filtered by '?day__gte=', '?day__lte=', '?pizza_name='
+    and '?pizza_size='
+    """
+    serializer_class = PizzaSalesDailySerializer
+    queryset = PizzaSalesDaily.objects.all()
+    pagination_class = DailyCursorPagination
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = DailySalesFilter
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request, *args, **kwargs):
+        """
+        Sales of every pizza and size summed up over the filtered days, best sellers first
+        """
+        rows = self.filter_queryset(self.get_queryset()).order_by().values('pizza_name', 'pizza_size').annotate(
+            pizzas=Sum('pizzas'), items=Sum('items')
+        ).order_by('-pizzas', 'pizza_name', 'pizza_size')
+        return Response(PizzaSalesSummarySerializer(rows, many=True).data)
+
+
+class CustomerTotalsViewSet(SparseFieldsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Order totals per customer, customers with most orders first. Retrieved by customer id
+    """
+    serializer_class = CustomerOrderTotalsSerializer
+    queryset = CustomerOrderTotals.objects.all()
+    pagination_class = CustomerTotalsCursorPagination
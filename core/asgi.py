@@ -0,0 +1,281 @@
+import asyncio
+import contextvars
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http.cookie import parse_cookie
+from django.http.request import split_domain_port, validate_host
+
+from core.db_routers import pin_primary, unpin_primary
+from core.middleware import ReplicaPinningMiddleware
+from core.renderers import FastJSONRenderer
+
+
+_executor = None
+
+
+def get_executor():
+    """
+    Thread pool running the blocking work of the ASGI application: ORM queries, cache calls and the Django
+    views. Its size, settings.ASGI_THREADS, bounds the database connections of a process no matter how many
+    clients are connected
+    :rtype: ThreadPoolExecutor
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(settings.ASGI_THREADS, thread_name_prefix='asgi')
+    return _executor
+
+
+def call_with_connections(func, *args):
+    """
+    Runs func like Django runs a request, dropping expired or broken database connections of the thread
+    before and after it
+    """
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args):
+    """
+    Awaits a blocking function executed in the thread pool, in a copy of the current context, so the database
+    router sees the primary pinning of the request
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_event_loop().run_in_executor(
+        get_executor(), context.run, partial(call_with_connections, func, *args)
+    )
+
+
+class AsgiRequest:
+    """
+    The parts of an ASGI HTTP scope the async handlers need
+    """
+
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.method = scope['method']
+        self.path = scope['path']
+        self.headers = {}
+        for name, value in scope['headers']:
+            name = name.decode('latin1').lower()
+            value = value.decode('latin1')
+            self.headers[name] = '{},{}'.format(self.headers[name], value) if name in self.headers else value
+        self.query_params = {k: v[-1] for k, v in parse_qs(scope['query_string'].decode('latin1')).items()}
+        self.cookies = parse_cookie(self.headers.get('cookie', ''))
+
+    def has_allowed_host(self):
+        """
+        Validates the Host header against settings.ALLOWED_HOSTS like HttpRequest.get_host
+        :rtype: bool
+        """
+        host = self.headers.get('host')
+        if not host:
+            server = self.scope.get('server') or ('localhost', 80)
+            host = server[0] if server[1] in (80, 443) else '{}:{}'.format(*server)
+        allowed_hosts = settings.ALLOWED_HOSTS
+        if settings.DEBUG and not allowed_hosts:
+            allowed_hosts = ['localhost', '127.0.0.1', '[::1]']
+        domain, _ = split_domain_port(host)
+        return bool(domain) and validate_host(domain, allowed_hosts)
+
+    async def read_body(self):
+        """
+        :rtype: bytes
+        """
+        body = []
+        while True:
+            message = await self.receive()
+            if message['type'] == 'http.disconnect':
+                break
+            body.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        return b''.join(body)
+
+    async def wait_disconnect(self):
+        """
+        Returns when the client goes away, the request body must have been read
+        """
+        while (await self.receive())['type'] != 'http.disconnect':
+            pass
+
+
+async def send_response(send, status, body=b'', headers=None, content_type='application/json'):
+    """
+    Sends a complete response
+    :type status: int
+    :type body: bytes
+    :param headers: header name -> value
+    :type headers: dict
+    """
+    headers = dict(headers or {})
+    if body or status not in (204, 304):
+        headers.setdefault('Content-Type', content_type)
+    headers['Content-Length'] = str(len(body))
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(k.lower().encode('latin1'), str(v).encode('latin1')) for k, v in headers.items()],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, status, data=None, headers=None):
+    """
+    Sends data encoded like the JSON responses of the Django REST framework views
+    """
+    body = FastJSONRenderer().render(data) if data is not None else b''
+    await send_response(send, status, body, headers)
+
+
+class WsgiBridge:
+    """
+    Runs a WSGI application for the requests without an async handler. The request body is read and the
+    response is sent by the event loop, the application itself runs in the thread pool, so a slow client holds
+    a thread only while its response is being computed. Streaming responses are produced chunk by chunk
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, request, send):
+        environ = self.get_environ(request.scope, await request.read_body())
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = headers
+
+        response, body = await asyncio.get_event_loop().run_in_executor(
+            get_executor(), self.call_application, environ, start_response
+        )
+        await send({'type': 'http.response.start', 'status': started['status'],
+                    'headers': self.encode_headers(started['headers'])})
+        if body is not None:
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        chunks = iter(response)
+        disconnected = asyncio.ensure_future(request.wait_disconnect())
+        try:
+            while True:
+                chunk = asyncio.get_event_loop().run_in_executor(get_executor(), next, chunks, None)
+                done, _ = await asyncio.wait([chunk, disconnected], return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    break
+                chunk = chunk.result()
+                if chunk is None:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+            await asyncio.get_event_loop().run_in_executor(get_executor(), response.close)
+
+    def call_application(self, environ, start_response):
+        """
+        :return: the response and its whole body, None for a streaming response
+        :rtype: tuple
+        """
+        response = self.application(environ, start_response)
+        if getattr(response, 'streaming', False):
+            return response, None
+        try:
+            return response, b''.join(response)
+        finally:
+            response.close()
+
+    @staticmethod
+    def encode_headers(headers):
+        return [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in headers]
+
+    @staticmethod
+    def get_environ(scope, body):
+        """
+        WSGI environ of an ASGI HTTP scope
+        :rtype: dict
+        """
+        server = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            # WSGI strings carry the raw bytes as latin-1
+            'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+            'QUERY_STRING': scope['query_string'].decode('latin1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+            'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope['headers']:
+            name = name.decode('latin1').upper().replace('-', '_')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = 'HTTP_' + name
+            value = value.decode('latin1')
+            environ[name] = '{},{}'.format(environ[name], value) if name in environ else value
+        # The body was read whole, chunked requests included
+        environ['CONTENT_LENGTH'] = str(len(body))
+        return environ
+
+
+class AsgiApplication:
+    """
+    ASGI application of the project. GET requests matching one of the routes are served by async handlers,
+    everything else by the Django WSGI application through WsgiBridge. The async handlers skip the Django
+    middleware, the host validation and the primary pinning cookie of ReplicaPinningMiddleware are applied here
+    :param application: WSGI application
+    :param routes: (path regular expression, async handler) pairs. A handler gets an AsgiRequest, the send
+    callable and the named groups of the match as keyword arguments
+    """
+
+    def __init__(self, application, routes):
+        self.bridge = WsgiBridge(application)
+        self.routes = [(re.compile(pattern), handler) for pattern, handler in routes]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                await send({'type': '{}.complete'.format(message['type'])})
+                if message['type'] == 'lifespan.shutdown':
+                    return
+        if scope['type'] != 'http':
+            raise ValueError('Unsupported scope type {}'.format(scope['type']))
+
+        request = AsgiRequest(scope, receive)
+        if request.method == 'GET':
+            for pattern, handler in self.routes:
+                match = pattern.fullmatch(request.path)
+                if match:
+                    return await self.handle(handler, request, send, **match.groupdict())
+        return await self.bridge(request, send)
+
+    @staticmethod
+    async def handle(handler, request, send, **kwargs):
+        if not request.has_allowed_host():
+            return await send_json(send, 400, {'detail': 'Invalid host'})
+        pinned = ReplicaPinningMiddleware.cookie_name in request.cookies
+        token = pin_primary() if pinned else None
+        try:
+            await handler(request, send, **kwargs)
+        finally:
+            if token is not None:
+                unpin_primary(token)
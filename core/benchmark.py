@@ -0,0 +1,66 @@
+import time
+from contextlib import contextmanager
+
+
+def percentile(samples, pct):
+    """
+    Returns the percentile of the samples using the nearest-rank method
+    :param samples: measured values
+    :type samples: list
+    :param pct: percentile, 0-100
+    :type pct: float
+    :rtype: float
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100.0 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def measure(func, repeat=10):
+    """
+    Calls func repeat times and collects the wall clock durations
+    :param func: callable without arguments
+    :param repeat: number of calls
+    :type repeat: int
+    :return: durations in milliseconds
+    :rtype: list
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(samples):
+    """
+    Builds a one line summary of the measured durations
+    :param samples: durations in milliseconds
+    :type samples: list
+    :rtype: str
+    """
+    return 'min {:.2f}ms  median {:.2f}ms  p99 {:.2f}ms  max {:.2f}ms'.format(
+        min(samples), percentile(samples, 50), percentile(samples, 99), max(samples)
+    )
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Lets the caller set 'created' and 'updated' of TimeStampedModel instances explicitly, e.g. to seed
+    benchmark data spread over time with bulk_create. auto_now flags are restored on exit
+    :param models: TimeStampedModel subclasses
+    """
+    fields = [model._meta.get_field(name) for model in models for name in ('created', 'updated')]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
@@ -0,0 +1,49 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+_primary_pinned = ContextVar('primary_pinned', default=False)
+
+
+def pin_primary(pinned=True):
+    """
+    Sends all reads of the current context (request, thread or task) to the primary database
+    :param pinned: pin or unpin
+    :type pinned: bool
+    :return: token for unpin_primary
+    """
+    return _primary_pinned.set(pinned)
+
+
+def unpin_primary(token):
+    """
+    Restores the pinning state changed by pin_primary
+    :param token: value returned by pin_primary
+    """
+    _primary_pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Routes reads to a random database of settings.DATABASE_REPLICAS and everything else to the primary.
+    Reads stay on the primary when the context is pinned to it (see core.middleware.ReplicaPinningMiddleware)
+    or when the primary is inside a transaction, so select_for_update and reads following a write in the
+    same transaction always see the primary
+    """
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or _primary_pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,147 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows are joined into chunks of about this size before they are handed to the response
+BUFFER_SIZE = 64 * 1024
+
+
+class Echo:
+    """
+    A file-like object for csv.writer that returns the written line instead of storing it
+    """
+    def write(self, value):
+        return value
+
+
+def format_value(value):
+    """
+    Formats a database value the same way the API does
+    :param value: column value
+    :return: JSON compatible value
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+    return value
+
+
+def parse_created_bound(value, end=False):
+    """
+    Parses a date or a datetime query parameter. A plain date stands for the beginning of the day, or for the
+    beginning of the next day if it is the end of a range
+    :param value: ISO 8601 date or datetime
+    :type value: str
+    :param end: the value is the end of a range
+    :type end: bool
+    :raise ValueError: if the value is not a date
+    :rtype: datetime
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError('{} is not a valid date'.format(value))
+        parsed = datetime.combine(day, time.min)
+        if end:
+            parsed += timedelta(days=1)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def filter_created(queryset, created_from=None, created_to=None):
+    """
+    Limits the queryset to the half open range [created_from, created_to) of the 'created' field
+    :param created_from: ISO 8601 date or datetime
+    :type created_from: str
+    :param created_to: ISO 8601 date or datetime
+    :type created_to: str
+    :raise ValueError: if a bound is not a date
+    """
+    if created_from:
+        queryset = queryset.filter(created__gte=parse_created_bound(created_from))
+    if created_to:
+        queryset = queryset.filter(created__lt=parse_created_bound(created_to, end=True))
+    return queryset
+
+
+def keyset_rows(queryset, fields, chunk_size):
+    """
+    Reads the rows in ('created', 'id') order with one keyset query per chunk, for connections without server
+    side cursors, where iterator() would fetch the whole result at once
+    :param queryset: rows of a model with 'created'
+    :param fields: read fields
+    :type fields: tuple
+    :param chunk_size: rows per query
+    :type chunk_size: int
+    :return: generator of tuples
+    """
+    connection = connections[queryset.db]
+    meta = queryset.model._meta
+    # A row comparison matches the ('created', 'id') index as one range, unlike the equivalent OR of two conditions
+    after = '({0}.{1}, {0}.{2}) > (%s, %s)'.format(*map(connection.ops.quote_name, (
+        meta.db_table, meta.get_field('created').column, meta.pk.column
+    )))
+    rows = queryset.order_by('created', 'id').values_list(*fields, 'created', 'id')
+    chunk = list(rows[:chunk_size])
+    while chunk:
+        for row in chunk:
+            yield row[:-2]
+        if len(chunk) < chunk_size:
+            return
+        created, last_id = chunk[-1][-2:]
+        params = [meta.get_field('created').get_db_prep_value(created, connection), last_id]
+        chunk = list(rows.extra(where=[after], params=params)[:chunk_size])
+
+
+def export_rows(queryset, fields, export_format, chunk_size=None):
+    """
+    Streams the queryset as CSV or newline delimited JSON. Rows are read as tuples through a server side cursor,
+    so memory use doesn't depend on the number of exported rows. Without server side cursors (PgBouncer) they are
+    read in keyset chunks in ('created', 'id') order
+    :param queryset: exported rows
+    :param fields: exported fields, foreign keys give their ids
+    :type fields: tuple
+    :param export_format: 'csv' or 'ndjson'
+    :type export_format: str
+    :param chunk_size: rows fetched from the database at once
+    :type chunk_size: int
+    :return: generator of text chunks
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    if connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        rows = keyset_rows(queryset, fields, chunk_size)
+    else:
+        rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        lines = (writer.writerow([format_value(x) for x in row]) for row in rows)
+        header = writer.writerow(fields)
+    else:
+        lines = (json.dumps(dict(zip(fields, map(format_value, row))), separators=(',', ':')) + '\n' for row in rows)
+        header = ''
+
+    buffer = [header]
+    size = len(header)
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
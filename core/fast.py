@@ -0,0 +1,131 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields as drf_fields, relations
+
+
+# Fields whose to_representation returns a database value of the right type unchanged
+IDENTITY_FIELDS = (drf_fields.IntegerField, drf_fields.CharField, drf_fields.BooleanField, drf_fields.ReadOnlyField)
+
+
+class RowSerializer:
+    """
+    Serializes .values() rows into the same representation a ModelSerializer builds from model instances,
+    without instantiating models or serializer fields per row. Each field of the serializer is compiled once
+    into a column and a converter: columns of plain values are copied, the rest go through the field's own
+    to_representation. Reverse foreign keys serialized as lists of primary keys are loaded with one query
+    per page. Serializers with anything else (nested serializers, method fields, dotted sources) are not
+    supported, see get_row_serializer
+    :param serializer_class: ModelSerializer subclass
+    :param fields: names of the selected fields, see core.serializers.SelectableFieldsMixin
+    :type fields: set
+    :raise ValueError: if the serializer has a field that can't be compiled
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class(context={'fields': fields})
+        self.model = serializer.Meta.model
+        self.fields = []
+        self.related = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, relations.ManyRelatedField):
+                self.related.append((name, self.compile_related(field)))
+                self.fields.append((name, None, None))
+            else:
+                self.fields.append((name,) + self.compile_field(field))
+        self.columns = tuple(column for _, column, _ in self.fields if column)
+
+    def compile_field(self, field):
+        """
+        :return: column of .values() and the converter of its non null values, None for a plain copy
+        :rtype: tuple
+        """
+        model_field = self.get_model_field(field.source)
+        if model_field.is_relation and not (model_field.many_to_one or model_field.one_to_one):
+            raise ValueError('{} is a multi valued relation'.format(field.source))
+        if model_field.is_relation:
+            if not isinstance(field, relations.PrimaryKeyRelatedField):
+                raise ValueError('{} is not serialized as a primary key'.format(field.source))
+            # The foreign key column holds the primary key the field would take from the related object
+            return model_field.attname, field.pk_field.to_representation if field.pk_field else None
+        converter = None if type(field) in IDENTITY_FIELDS else field.to_representation
+        return model_field.attname, converter
+
+    def compile_related(self, field):
+        """
+        :return: model and foreign key column of the related rows of a reverse foreign key
+        :rtype: tuple
+        """
+        model_field = self.get_model_field(field.source)
+        if not model_field.one_to_many or not isinstance(field.child_relation, relations.PrimaryKeyRelatedField):
+            raise ValueError('{} is not a reverse foreign key of primary keys'.format(field.source))
+        return model_field.related_model, model_field.field.attname
+
+    def get_model_field(self, source):
+        if '.' in source or source == '*':
+            raise ValueError('Source {} is not a model field'.format(source))
+        try:
+            return self.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise ValueError('Source {} is not a model field'.format(source))
+
+    def values(self, queryset, extra=()):
+        """
+        :param extra: more columns to select, e.g. the ordering of the cursor pagination. Extra columns are
+        not part of the representation
+        :return: the queryset selecting the columns of the representation as dicts
+        """
+        if self.related:
+            extra = ('id',) + tuple(extra)
+        columns = self.columns + tuple(x for x in extra if x not in self.columns)
+        return queryset.prefetch_related(None).values(*columns)
+
+    def to_representation(self, rows, db=None):
+        """
+        :param rows: dicts of values()
+        :type rows: list
+        :param db: database the rows were read from, the related rows are read from it too, so they can't lag
+        behind the page on a replica
+        :type db: str
+        :rtype: list
+        """
+        related = {}
+        if self.related and rows:
+            ids = [x['id'] for x in rows]
+            for name, (model, column) in self.related:
+                # The default ordering of the related model is kept, prefetch_related lists them the same way
+                related[name] = values = {x: [] for x in ids}
+                related_rows = model._default_manager.using(db).filter(**{column + '__in': ids})
+                for parent, pk in related_rows.values_list(column, 'pk'):
+                    values[parent].append(pk)
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, converter in self.fields:
+                if column is None:
+                    item[name] = related[name][row['id']]
+                    continue
+                value = row[column]
+                item[name] = value if converter is None or value is None else converter(value)
+            data.append(item)
+        return data
+
+
+_row_serializers = {}
+
+
+def get_row_serializer(serializer_class, fields=None):
+    """
+    :param fields: names of the selected fields, all fields if empty
+    :type fields: set
+    :return: the compiled RowSerializer of the serializer class and fields, None if it can't be compiled
+    :rtype: RowSerializer
+    """
+    key = (serializer_class, frozenset(fields or ()))
+    if key not in _row_serializers:
+        try:
+            _row_serializers[key] = RowSerializer(serializer_class, set(key[1]))
+        except ValueError:
+            _row_serializers[key] = None
+    return _row_serializers[key]
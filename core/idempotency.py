@@ -0,0 +1,117 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.models import IdempotencyKey
+
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+# Set on responses replayed from a stored key
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'Idempotency-Key was already used with a different request'
+    default_code = 'idempotency_key_reused'
+
+
+def key_cutoff():
+    """
+    Keys created before the cutoff are expired
+    :rtype: datetime
+    """
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def request_fingerprint(request):
+    """
+    Hash of the method, path and parsed body of a request, the same for a retry with reformatted JSON
+    :type request: rest_framework.request.Request
+    :rtype: str
+    """
+    body = json.dumps(request.data, cls=JSONEncoder, sort_keys=True)
+    return hashlib.sha256('{} {} {}'.format(request.method, request.path, body).encode()).hexdigest()
+
+
+def replay(record, fingerprint):
+    """
+    :type record: IdempotencyKey
+    :raise IdempotencyKeyReused: if the key belongs to another request
+    :rtype: Response
+    """
+    if record.fingerprint != fingerprint:
+        raise IdempotencyKeyReused()
+    response = Response(json.loads(record.response), status=record.status_code)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def claim_key(keys, key, fingerprint):
+    """
+    Inserts the key in a savepoint. A stored key is replayed, an expired one is deleted and inserted again.
+    When concurrent retries find the same expired key, one of them inserts it and the others wait on it
+    like on a fresh key and replay its response
+    :param keys: IdempotencyKey manager of the write database
+    :type key: str
+    :type fingerprint: str
+    :return: the stored response, None if the key was inserted
+    :rtype: Response
+    """
+    while True:
+        try:
+            with transaction.atomic(using=keys.db):
+                keys.create(key=key, fingerprint=fingerprint)
+            return None
+        except IntegrityError:
+            record = keys.filter(key=key).first()
+            if record is None:
+                # Deleted by a concurrent retry that failed since
+                continue
+            if record.created >= key_cutoff():
+                return replay(record, fingerprint)
+            # Expired and not purged yet, a concurrent retry may have deleted it already
+            keys.filter(key=key, created=record.created).delete()
+
+
+def idempotent(view):
+    """
+    Makes a write action of a viewset safe to retry. With an 'Idempotency-Key' header the key is inserted
+    in the transaction of the write, before it, and the successful response is stored with it. A retry with
+    the same key gets the stored response without running the write. A concurrent retry waits on the unique
+    key until the first request commits and gets its response as well. Failed requests leave no key behind,
+    so they can be retried. Requests without the header are not affected
+    """
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if key is None:
+            return view(self, request, *args, **kwargs)
+        if not key or len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            raise ValidationError({'Idempotency-Key': 'Use a key of 1 to 255 characters'})
+
+        fingerprint = request_fingerprint(request)
+        using = router.db_for_write(IdempotencyKey)
+        keys = IdempotencyKey.objects.using(using)
+        with transaction.atomic(using=using):
+            stored = claim_key(keys, key, fingerprint)
+            if stored is not None:
+                return stored
+
+            response = view(self, request, *args, **kwargs)
+            if status.is_success(response.status_code):
+                keys.filter(key=key).update(status_code=response.status_code,
+                                            response=json.dumps(response.data, cls=JSONEncoder))
+            else:
+                transaction.set_rollback(True, using=using)
+        return response
+    return wrapper
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import random
+import resource
+import time
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import percentile
+
+
+def get_paths(orders):
+    """
+    Read-heavy requests served by both the WSGI and the ASGI application
+    :param orders: ids of existing orders
+    :type orders: list
+    :return: name -> callable returning a path
+    :rtype: dict
+    """
+    return {
+        'menu': lambda: '/api/pizzas/',
+        'status': lambda: '/api/orders/status/{}/'.format(random.choice(orders)),
+        'batch': lambda: '/api/orders/status/batch/?ids={}'.format(','.join(map(str, random.sample(orders, 10)))),
+        # Holds the connection until an event or the timeout, like an idle tracking page
+        'poll': lambda: '/api/orders/status/poll/?ids={}&timeout=5'.format(random.choice(orders)),
+    }
+
+
+def parse_server(value):
+    """
+    :param value: name=http://host:port
+    :return: name, host, port
+    :rtype: tuple
+    """
+    name, _, url = value.rpartition('=')
+    url = urlsplit(url)
+    if url.scheme != 'http' or not url.hostname:
+        raise CommandError('{} is not a name=http:// URL'.format(value))
+    return name or url.netloc, url.hostname, url.port or 80
+
+
+class Command(BaseCommand):
+    """
+    Compares running servers, e.g. gunicorn serving pizza.wsgi and uvicorn serving pizza.asgi, under many
+    concurrent keep-alive connections. Each level of --connections opens that many connections to every server
+    and sends requests on all of them for --duration seconds. Reports the connections that could be opened,
+    requests per second, latency percentiles and errors. Thousands of connections need a high open files
+    limit, the soft limit is raised to the hard one
+    """
+    help = 'Benchmarks the sync and async servers at high connection counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('servers', nargs='+', help='name=http://host:port of every server to compare')
+        parser.add_argument('--connections', default='1000,5000,10000', help='Comma separated connection counts')
+        parser.add_argument('--duration', type=float, default=20, help='Seconds per connection count')
+        parser.add_argument('--path', default='status', help='Requested path: menu, status, batch or poll')
+        parser.add_argument('--connect-timeout', type=float, default=10, help='Seconds to open a connection')
+
+    def handle(self, *args, **options):
+        servers = [parse_server(x) for x in options['servers']]
+        levels = [int(x) for x in options['connections'].split(',')]
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        if max(levels) + 100 > hard:
+            self.stderr.write('The open files limit {} is below {} connections'.format(hard, max(levels)))
+
+        _, host, port = servers[0]
+        connection = HTTPConnection(host, port)
+        connection.request('GET', '/api/orders/?page_size=500', headers={'Accept': 'application/json'})
+        response = connection.getresponse()
+        if response.status != 200:
+            raise CommandError('GET /api/orders/ returned {}'.format(response.status))
+        orders = [x['id'] for x in json.loads(response.read())['results']]
+        connection.close()
+        if len(orders) < 10:
+            raise CommandError('The servers need at least 10 orders, see seed_orders in orders.benchmark')
+        paths = get_paths(orders)
+        if options['path'] not in paths:
+            raise CommandError('Unknown path {}'.format(options['path']))
+
+        self.stdout.write('{}, {}s per level'.format(options['path'], options['duration']))
+        for level in levels:
+            for name, host, port in servers:
+                loop = asyncio.new_event_loop()
+                try:
+                    connected, samples, errors, elapsed = loop.run_until_complete(self.load(
+                        host, port, paths[options['path']], level, options['duration'], options['connect_timeout']
+                    ))
+                finally:
+                    loop.close()
+                self.stdout.write(self.style.MIGRATE_LABEL(
+                    '{:>6} {:>8}: {:>6} connected {:>7.0f} rps  p50 {:.1f}ms  p99 {:.1f}ms  errors {}'.format(
+                        level, name, connected, len(samples) / elapsed, percentile(samples, 50),
+                        percentile(samples, 99), errors
+                    )
+                ))
+
+    @staticmethod
+    async def request(reader, writer, host, path):
+        """
+        Sends a keep-alive GET and reads the response
+        :return: status code
+        :rtype: int
+        """
+        writer.write('GET {} HTTP/1.1\r\nHost: {}\r\nAccept: application/json\r\n\r\n'.format(path, host).encode())
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin1').split('\r\n')
+        length = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        await reader.readexactly(length)
+        return int(lines[0].split(' ')[1])
+
+    async def load(self, host, port, path, connections, duration, connect_timeout):
+        """
+        Opens the connections, then runs one client on each of them until the deadline
+        :return: opened connections, latencies of successful requests in milliseconds, number of failed
+        requests, elapsed seconds
+        :rtype: tuple
+        """
+        samples = []
+        errors = []
+
+        async def connect():
+            try:
+                return await asyncio.wait_for(asyncio.open_connection(host, port), connect_timeout)
+            except (OSError, asyncio.TimeoutError):
+                return None
+
+        opened = [x for x in await asyncio.gather(*(connect() for _ in range(connections))) if x]
+
+        async def client(reader, writer, deadline):
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await self.request(reader, writer, host, path())
+                except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                    errors.append(1)
+                    break
+                if status < 400:
+                    samples.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors.append(status)
+            writer.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(reader, writer, started + duration) for reader, writer in opened))
+        return len(opened), samples, len(errors), time.perf_counter() - started
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmark import measure, percentile, summarize
+from core.fast import get_row_serializer
+from core.renderers import FastJSONRenderer
+from customers.models import Customers
+from customers.serializers import CustomerSerializer
+from orders.benchmark import seed_orders
+from orders.models import Order, OrderItem
+from orders.serializers import ItemSerializer, OrderSerializer
+from pizzas.models import Pizzas, PizzaSizes
+from pizzas.serializers import PizzaSerializer
+
+
+class Command(BaseCommand):
+    """
+    Measures rows per second of list responses built by the model serializers with JSONRenderer, as the
+    list actions did before, and by core.fast.RowSerializer with FastJSONRenderer. Both include the queries.
+    The two outputs are compared byte for byte
+    """
+    help = 'Benchmarks the regular and the fast serialization of list responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Rows per list')
+        parser.add_argument('--repeat', type=int, default=10, help='Measured runs per list')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.seed(rows)
+        lists = (
+            ('orders', OrderSerializer, Order.objects.prefetch_related('items')),
+            ('items', ItemSerializer, OrderItem.objects.all()),
+            ('customers', CustomerSerializer, Customers.objects.all()),
+            ('pizzas', PizzaSerializer, Pizzas.objects.all()),
+        )
+        for name, serializer_class, queryset in lists:
+            queryset = queryset.order_by('-created', '-id')[:rows]
+            count = queryset.count()
+            fast = get_row_serializer(serializer_class)
+
+            def regular_list():
+                return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+            def fast_list():
+                rows = fast.values(queryset)
+                return FastJSONRenderer().render(fast.to_representation(list(rows), rows.db))
+
+            if regular_list() != fast_list():
+                self.stdout.write(self.style.ERROR('{}: the outputs differ'.format(name)))
+            self.stdout.write(self.style.MIGRATE_LABEL('{} ({} rows)'.format(name, count)))
+            for label, func in (('regular', regular_list), ('fast', fast_list)):
+                samples = measure(func, options['repeat'])
+                self.stdout.write('  {:>7}: {:>9.0f} rows/s  {}'.format(
+                    label, count / percentile(samples, 50) * 1000, summarize(samples)
+                ))
+
+    def seed(self, rows):
+        """
+        Adds orders with three items each and customers until there are rows of each
+        """
+        missing = rows - Order.objects.count()
+        if missing > 0:
+            self.stdout.write('Seeding {} orders'.format(missing))
+            seed_orders(missing)
+        pizza = Pizzas.objects.first() or Pizzas.objects.create(name='Benchmark')
+        size = PizzaSizes.objects.first() or PizzaSizes.objects.create(sizename=PizzaSizes.LARGE)
+        missing = rows - OrderItem.objects.count()
+        if missing > 0:
+            self.stdout.write('Seeding {} items'.format(missing))
+            order_ids = Order.objects.values_list('id', flat=True)[:(missing + 2) // 3]
+            OrderItem.objects.bulk_create([
+                OrderItem(order_id=order_id, pizza_name=pizza, pizza_size=size, number_of_pizzas=1 + number)
+                for order_id in order_ids for number in range(3)
+            ][:missing])
+        missing = rows - Customers.objects.count()
+        if missing > 0:
+            self.stdout.write('Seeding {} customers'.format(missing))
+            Customers.objects.bulk_create([
+                Customers(name='Customer {}'.format(x), phone=str(10 ** 9 + x), phone_normalized=str(10 ** 9 + x),
+                          gender=Customers.FEMALE)
+                for x in range(missing)
+            ])
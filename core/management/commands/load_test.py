@@ -0,0 +1,128 @@
+import json
+import random
+import threading
+import time
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import percentile
+
+
+def get_endpoints(orders, customers):
+    """
+    Requests of the main endpoints, every call picks random existing objects
+    :param orders: ids of existing orders
+    :type orders: list
+    :param customers: ids of existing customers
+    :type customers: list
+    :return: name -> callable returning method, path and JSON body
+    :rtype: dict
+    """
+    return {
+        'menu': lambda: ('GET', '/api/pizzas/', None),
+        'orders': lambda: ('GET', '/api/orders/', None),
+        'order': lambda: ('GET', '/api/orders/{}/'.format(random.choice(orders)), None),
+        'status': lambda: ('GET', '/api/orders/status/{}/'.format(random.choice(orders)), None),
+        'history': lambda: ('GET', '/api/customers/{}/orders/'.format(random.choice(customers)), None),
+        'search': lambda: ('GET', '/api/customers/search/?q={}'.format(random.randint(100, 999)), None),
+        'create': lambda: ('POST', '/api/orders/', {'customer': random.choice(customers)}),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Load test of a running stack, e.g. the one of docker-compose.prod.yml. Every endpoint is loaded in turn by
+    --concurrency clients with keep-alive connections for --duration seconds. Reports requests per second,
+    latency percentiles and errors. Orders and customers are picked from the first page of the order list,
+    the stack needs some orders, see seed_orders in orders.benchmark
+    """
+    help = 'Load tests the main API endpoints of a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=20, help='Seconds per endpoint')
+        parser.add_argument('--endpoints', help='Comma separated endpoints, all by default')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('--url must be an http:// URL')
+        self.host, self.port = url.hostname, url.port or 80
+
+        status, page = self.request(HTTPConnection(self.host, self.port), 'GET', '/api/orders/?page_size=500')
+        if status != 200:
+            raise CommandError('GET /api/orders/ returned {}'.format(status))
+        orders = json.loads(page)['results']
+        customers = [x['customer'] for x in orders if x['customer']]
+        if not customers:
+            raise CommandError('There are no orders with customers to load test with')
+        endpoints = get_endpoints([x['id'] for x in orders], customers)
+
+        names = options['endpoints'].split(',') if options['endpoints'] else list(endpoints)
+        unknown = set(names) - set(endpoints)
+        if unknown:
+            raise CommandError('Unknown endpoints: {}'.format(', '.join(sorted(unknown))))
+
+        self.stdout.write('{} clients, {}s per endpoint'.format(options['concurrency'], options['duration']))
+        for name in names:
+            samples, errors, elapsed = self.load(endpoints[name], options['concurrency'], options['duration'])
+            self.stdout.write(self.style.MIGRATE_LABEL(
+                '{:>8}: {:>7.0f} rps  p50 {:.1f}ms  p99 {:.1f}ms  max {:.1f}ms  errors {}'.format(
+                    name, len(samples) / elapsed, percentile(samples, 50), percentile(samples, 99),
+                    max(samples, default=0), errors
+                )
+            ))
+
+    @staticmethod
+    def request(connection, method, path, body=None):
+        """
+        :return: status code and body of the response
+        :rtype: tuple
+        """
+        headers = {'Accept': 'application/json'}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        connection.request(method, path, body, headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+
+    def load(self, endpoint, concurrency, duration):
+        """
+        Runs the clients until the deadline
+        :return: latencies of successful requests in milliseconds, number of failed requests, elapsed seconds
+        :rtype: tuple
+        """
+        samples = []
+        errors = []
+        barrier = threading.Barrier(concurrency + 1)
+
+        def client():
+            connection = HTTPConnection(self.host, self.port, timeout=30)
+            barrier.wait()
+            deadline = time.perf_counter() + duration
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status, _ = self.request(connection, *endpoint())
+                except (OSError, ConnectionError):
+                    connection.close()
+                    errors.append(1)
+                    continue
+                if status < 400:
+                    samples.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors.append(status)
+            connection.close()
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return samples, len(errors), time.perf_counter() - started
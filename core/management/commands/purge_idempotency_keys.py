@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.idempotency import key_cutoff
+from core.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    """
+    Deletes idempotency keys older than settings.IDEMPOTENCY_KEY_TTL. Keys are deleted in batches found by
+    the 'created' index, every batch is a single short DELETE
+    """
+    help = 'Deletes expired idempotency keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help='Keys per DELETE')
+
+    def handle(self, *args, **options):
+        cutoff = key_cutoff()
+        expired = IdempotencyKey.objects.filter(created__lt=cutoff).order_by('created')
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += IdempotencyKey.objects.filter(key__in=keys).delete()[0]
+        self.stdout.write(self.style.SUCCESS('Deleted {} expired idempotency keys'.format(deleted)))
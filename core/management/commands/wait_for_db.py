@@ -1,20 +1,40 @@
 import time
-import sys
 
-from django.db import connections
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
 
 
 class Command(BaseCommand):
     """
-    Waiting for database to go live
+    Waiting for database to go live. The database is probed with a real query, failed attempts are retried
+    with exponential backoff until --timeout
     """
+    help = 'Waits until the database accepts queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to wait for')
+        parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait at most')
+        parser.add_argument('--max-delay', type=float, default=5, help='Longest pause between attempts, seconds')
+
     def handle(self, *args, **options):
-        pg_conn = None
-        while not pg_conn:
+        connection = connections[options['database']]
+        deadline = time.monotonic() + options['timeout']
+        delay = 0.1
+        attempt = 1
+        while True:
             try:
-                pg_conn = connections['default']
-            except OperationalError:
-                time.sleep(1)
-        sys.stdout.write('Database is UP\n')
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                break
+            except OperationalError as exc:
+                connection.close()
+                if time.monotonic() + delay > deadline:
+                    raise CommandError('Database is not available after {} attempts: {}'.format(attempt, exc))
+                self.stdout.write('Database is unavailable, attempt {}, retrying in {:.1f}s'.format(attempt, delay))
+                time.sleep(delay)
+                delay = min(delay * 2, options['max_delay'])
+                attempt += 1
+        # Connections of the command are not reused by the server
+        connection.close()
+        self.stdout.write(self.style.SUCCESS('Database is UP'))
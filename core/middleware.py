@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+from core.db_routers import pin_primary, unpin_primary
+
+
+class ReplicaPinningMiddleware:
+    """
+    Keeps a client on the primary database right after it wrote something. Unsafe requests run against the
+    primary and set a short living cookie, safe requests carrying the cookie read from the primary too,
+    so the client never reads its own write from a lagging replica
+    """
+    cookie_name = 'pin_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writing = request.method not in SAFE_METHODS
+        token = pin_primary() if writing or self.cookie_name in request.COOKIES else None
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                unpin_primary(token)
+        if writing:
+            response.set_cookie(self.cookie_name, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True)
+        return response
@@ -0,0 +1,144 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from core.export import EXPORT_FORMATS, export_rows, filter_created
+from core.fast import get_row_serializer
+from core.serializers import get_field_sources, parse_fields
+
+
+class ExpandMixin:
+    """
+    A GenericViewSet mixin that reads the comma separated '?expand=' query parameter and passes the known
+    names to the serializer context. See core.serializers.ExpandableFieldsMixin
+    """
+    expand_param = 'expand'
+
+    def get_expand(self):
+        """
+        Returns the related fields the client asked to expand
+        :rtype: set
+        """
+        if not hasattr(self, '_expand'):
+            requested = self.request.query_params.get(self.expand_param, '') if self.request else ''
+            allowed = getattr(self.get_serializer_class(), 'expandable_fields', {})
+            self._expand = {x.strip() for x in requested.split(',') if x.strip() in allowed}
+        return self._expand
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+
+class SparseFieldsMixin:
+    """
+    A GenericViewSet mixin for the comma separated '?fields=' query parameter of read requests. The known
+    names are passed to the serializer context (see core.serializers.SelectableFieldsMixin) and the queryset
+    loads only the columns of these fields with .only()
+    """
+    fields_param = 'fields'
+
+    def get_sparse_fields(self):
+        """
+        Returns the fields the client asked for, an empty set for all of them
+        :rtype: set
+        """
+        if not hasattr(self, '_sparse_fields'):
+            requested = set()
+            if self.request and self.request.method in SAFE_METHODS:
+                requested = parse_fields(self.request.query_params.get(self.fields_param, ''))
+            if requested:
+                requested &= set(get_field_sources(self.get_serializer_class()))
+            self._sparse_fields = requested
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        columns = self.get_sparse_columns(queryset)
+        return queryset.only(*columns) if columns else queryset
+
+    def get_sparse_columns(self, queryset):
+        """
+        Model fields the selected serializer fields, the pagination and select_related() need
+        :return: field names, empty if all columns must be loaded
+        :rtype: set
+        """
+        fields = self.get_sparse_fields()
+        if not fields or queryset.query.select_related is True:
+            return set()
+        opts = queryset.model._meta
+        sources = get_field_sources(self.get_serializer_class())
+        columns = {opts.pk.name}
+        for name in fields:
+            try:
+                field = opts.get_field(sources[name])
+            except FieldDoesNotExist:
+                # A property or a method may read any column
+                return set()
+            if field.concrete:
+                columns.add(field.name)
+            elif not field.auto_created:
+                return set()
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        columns.update(x.lstrip('-') for x in ((ordering,) if isinstance(ordering, str) else ordering))
+        columns.update(queryset.query.select_related or ())
+        return columns
+
+
+class FastListMixin:
+    """
+    A ListModelMixin companion serving the list action from .values() rows through core.fast.RowSerializer,
+    so large pages skip model instances and per row serializer work. The output is the same as the one of
+    the serializer class. Serializers the fast path can't compile and expanded responses use the regular list
+    """
+    def list(self, request, *args, **kwargs):
+        context = self.get_serializer_context()
+        rows = get_row_serializer(self.get_serializer_class(), context.get('fields'))
+        if rows is None or context.get('expand'):
+            return super().list(request, *args, **kwargs)
+
+        # The cursor pagination reads its position from the rows
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        ordering = [x.lstrip('-') for x in ((ordering,) if isinstance(ordering, str) else ordering)]
+        queryset = rows.values(self.filter_queryset(self.get_queryset()), ordering)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.to_representation(page, queryset.db))
+        return Response(rows.to_representation(list(queryset), queryset.db))
+
+
+class ExportMixin:
+    """
+    A GenericViewSet mixin adding the 'export' route. It streams every row of the filtered queryset as CSV
+    or NDJSON ('?output=csv|ndjson'), optionally limited by '?created_from=' and '?created_to='
+    """
+    export_fields = ()
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'output': 'Use one of: {}'.format(', '.join(EXPORT_FORMATS))})
+        try:
+            queryset = filter_created(
+                self.filter_queryset(self.get_queryset()),
+                request.query_params.get('created_from'),
+                request.query_params.get('created_to')
+            )
+        except ValueError as exc:
+            raise ValidationError({'created': str(exc)})
+
+        response = StreamingHttpResponse(
+            export_rows(queryset.order_by('created', 'id'), self.export_fields, export_format),
+            content_type=EXPORT_FORMATS[export_format]
+        )
+        response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(self.basename, export_format)
+        return response
@@ -10,3 +10,17 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class IdempotencyKey(models.Model):
+    """
+    The response of a create request made with an 'Idempotency-Key' header. A retry with the same key gets
+    the stored response instead of repeating the write, see core.idempotency. fingerprint identifies
+    the request the key was first used with
+    """
+    key = models.CharField(max_length=255, primary_key=True)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.TextField(default='')
+    # Expired keys are deleted by the purge_idempotency_keys command
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination over the '-created' ordering every model declares in Meta.ordering.
+    The cursor carries the last seen 'created' value, so any page is a single index range scan and
+    costs the same whether it is the first one or the ten thousandth one.
+    Only the first ordering field forms the cursor position. 'id' just keeps the order of rows with the same
+    'created' stable, such rows are skipped with an OFFSET within the tie group. Subclasses must lead with a
+    unique or nearly unique field, large tie groups turn into large offsets
+    """
+    ordering = ('-created', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
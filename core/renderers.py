@@ -0,0 +1,56 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets content negotiation accept 'text/event-stream'. Event stream views return StreamingHttpResponse,
+    so the renderer only passes error messages through
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return 'data: {}\n\n'.format(data).encode(self.charset)
+
+
+def has_float(data):
+    """
+    :return: whether there is a float anywhere in the lists and dicts of data
+    :rtype: bool
+    """
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if type(value) is float:
+            return True
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same bytes with orjson when it is installed. Anything orjson would encode
+    differently goes through the JSONEncoder of the Django REST framework: datetimes, decimals and the rest of
+    the types orjson refuses. Data with floats is left to JSONRenderer, orjson formats exponents differently
+    and encodes NaN and infinities as null. So is indented output for the browsable API
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact or \
+                self.get_indent(accepted_media_type, renderer_context or {}) is not None or has_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            # Integers above 64 bits, non string keys
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these two to keep the output a javascript subset
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,50 @@
+def parse_fields(value):
+    """
+    Parses a comma separated field list, e.g. the '?fields=' query parameter
+    :type value: str
+    :rtype: set
+    """
+    return {x.strip() for x in value.split(',') if x.strip()}
+
+
+_field_sources = {}
+
+
+def get_field_sources(serializer_class):
+    """
+    Fields of a serializer class, built once per class
+    :return: field name -> source
+    :rtype: dict
+    """
+    if serializer_class not in _field_sources:
+        _field_sources[serializer_class] = {name: x.source for name, x in serializer_class().fields.items()}
+    return _field_sources[serializer_class]
+
+
+class ExpandableFieldsMixin:
+    """
+    A ModelSerializer mixin that swaps related fields for nested representations on demand.
+    'expandable_fields' maps a field name to the serializer class and its keyword arguments, the names
+    requested through the 'expand' serializer context are replaced by these nested serializers
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self.context.get('expand', ()):
+            if name in self.expandable_fields:
+                serializer_class, serializer_kwargs = self.expandable_fields[name]
+                self.fields[name] = serializer_class(read_only=True, **serializer_kwargs)
+
+
+class SelectableFieldsMixin:
+    """
+    A Serializer mixin that keeps only the fields named in the 'fields' serializer context. All fields are
+    kept when the context names none of them. See core.mixins.SparseFieldsMixin
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get('fields')
+        if selected and not selected.isdisjoint(self.fields):
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
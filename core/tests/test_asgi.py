@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.wsgi import get_wsgi_application
+from django.test import TransactionTestCase, override_settings
+
+from core.asgi import AsgiApplication, run_sync, send_json
+from core.db_routers import PrimaryReplicaRouter
+from customers.models import Customers
+from orders.asgi import routes as order_routes
+from orders.events import broker, state_event
+from orders.models import Order
+from pizzas.asgi import routes as pizza_routes
+from pizzas.models import Pizzas
+
+
+class AsgiClient:
+    """
+    Calls the ASGI application on a fresh event loop and collects the sent messages. disconnect_after ends
+    the connection after the given number of response body messages
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    def request(self, method, path, query='', headers=None, body=b'', disconnect_after=None, during=None):
+        messages = []
+
+        async def run():
+            disconnected = asyncio.Event()
+            pending = [{'type': 'http.request', 'body': body}]
+
+            async def receive():
+                if pending:
+                    return pending.pop(0)
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                messages.append(message)
+                bodies = [x for x in messages if x['type'] == 'http.response.body']
+                if disconnect_after is not None and len(bodies) >= disconnect_after:
+                    disconnected.set()
+
+            scope = {
+                'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(), 'root_path': '',
+                'headers': [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+                'server': ('testserver', 80), 'client': ('127.0.0.1', 5000), 'scheme': 'http',
+            }
+            if during:
+                asyncio.get_event_loop().call_later(0.1, threading.Thread(target=during).start)
+            await self.application(scope, receive, send)
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(asyncio.wait_for(run(), 10))
+        finally:
+            loop.close()
+        start = messages[0]
+        headers = {k.decode(): v.decode() for k, v in start['headers']}
+        content = b''.join(x.get('body', b'') for x in messages[1:])
+        return start['status'], headers, content
+
+
+class AsgiApplicationTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = AsgiClient(AsgiApplication(get_wsgi_application(), order_routes + pizza_routes))
+        self.customer = Customers.objects.create(name='asgi', phone='333', gender=Customers.FEMALE)
+        self.order = Order.objects.create(customer=self.customer)
+
+    def test_order_status(self):
+        status, headers, content = self.client.request('GET', '/api/orders/status/{}/'.format(self.order.id))
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(content.decode()), {'order_state': Order.ACCEPTED})
+
+        status, _, content = self.client.request('GET', '/api/orders/status/{}/'.format(self.order.id),
+                                                 headers={'If-None-Match': headers['etag']})
+        self.assertEqual((status, content), (304, b''))
+        self.assertEqual(self.client.request('GET', '/api/orders/status/0/')[0], 404)
+
+    def test_batch_validation(self):
+        status, _, content = self.client.request('GET', '/api/orders/status/batch/', 'ids=x')
+        self.assertEqual(status, 400)
+        self.assertIn('ids', json.loads(content.decode()))
+
+    def test_poll_wakes_up(self):
+        status, _, content = self.client.request('GET', '/api/orders/status/poll/', 'ids={}'.format(self.order.id))
+        version = json.loads(content.decode())[0]['version']
+        event = state_event(self.order.id, Order.PROCESSING, self.order.updated.replace(year=2100))
+
+        started = time.monotonic()
+        status, _, content = self.client.request(
+            'GET', '/api/orders/status/poll/', 'ids={}&since={}&timeout=5'.format(self.order.id, version),
+            during=lambda: broker.publish(event)
+        )
+        self.assertLess(time.monotonic() - started, 4)
+        self.assertEqual(json.loads(content.decode()), [event])
+
+    def test_stream(self):
+        status, headers, content = self.client.request(
+            'GET', '/api/orders/status/stream/', 'ids={}'.format(self.order.id), disconnect_after=1
+        )
+        self.assertEqual((status, headers['content-type']), (200, 'text/event-stream'))
+        self.assertIn(b'retry: ', content)
+        self.assertIn('"order_state": "{}"'.format(Order.ACCEPTED).encode(), content)
+
+    def test_menu_matches_wsgi(self):
+        Pizzas.objects.create(name='asgi_pizza')
+        status, headers, content = self.client.request('GET', '/api/pizzas/')
+        self.assertEqual(status, 200)
+        self.assertEqual(content, self.client.request('GET', '/api/pizzas/', 'page=1')[2])
+        wsgi = self.client_class().get('/api/pizzas/', HTTP_ACCEPT='application/json')
+        self.assertEqual(content, wsgi.content)
+        self.assertEqual(self.client.request('GET', '/api/pizzas/', headers={'If-None-Match': headers['etag']})[0], 304)
+
+        status, headers, content = self.client.request('GET', '/api/pizzas/', 'fields=id,name')
+        wsgi = self.client_class().get('/api/pizzas/?fields=id,name', HTTP_ACCEPT='application/json')
+        self.assertEqual((content, headers['etag']), (wsgi.content, wsgi['ETag']))
+
+    def test_other_requests_go_to_django(self):
+        status, _, content = self.client.request(
+            'POST', '/api/orders/', headers={'Content-Type': 'application/json'},
+            body=json.dumps({'customer': self.customer.id}).encode()
+        )
+        self.assertEqual(status, 201)
+        self.assertEqual(Order.objects.filter(customer=self.customer).count(), 2)
+
+        status, _, content = self.client.request('GET', '/api/orders/{}/'.format(self.order.id),
+                                                 headers={'Accept': 'application/json'})
+        self.assertEqual((status, json.loads(content.decode())['id']), (200, self.order.id))
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_primary_pinning_cookie(self):
+        async def read_database(request, send):
+            await send_json(send, 200, await run_sync(PrimaryReplicaRouter().db_for_read, Order))
+
+        client = AsgiClient(AsgiApplication(get_wsgi_application(), [('/db/', read_database)]))
+        self.assertEqual(client.request('GET', '/db/')[2], b'"replica"')
+        self.assertEqual(client.request('GET', '/db/', headers={'Cookie': 'a=b; pin_primary=1'})[2], b'"default"')
+
+    def test_invalid_host(self):
+        path = '/api/orders/status/{}/'.format(self.order.id)
+        self.assertEqual(self.client.request('GET', path, headers={'Host': 'evil.example.com'})[0], 400)
+        self.assertEqual(self.client.request('GET', path, headers={'Host': 'testserver:8000'})[0], 200)
@@ -0,0 +1,72 @@
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TransactionTestCase, RequestFactory, override_settings
+from django.db import transaction
+
+from core.db_routers import PrimaryReplicaRouter, pin_primary, unpin_primary
+from core.middleware import ReplicaPinningMiddleware
+from orders.models import Order
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'])
+class PrimaryReplicaRouterTest(TransactionTestCase):
+    """
+    TestCase would run every test inside a transaction, which pins all reads to the primary
+    """
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Order), 'replica_0')
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Order), 'default')
+
+    def test_pinned_reads_go_to_primary(self):
+        token = pin_primary()
+        try:
+            self.assertEqual(self.router.db_for_read(Order), 'default')
+        finally:
+            unpin_primary(token)
+        self.assertEqual(self.router.db_for_read(Order), 'replica_0')
+
+    def test_reads_in_transaction_go_to_primary(self):
+        """
+        Tests select_for_update and other reads inside a transaction use the primary
+        """
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Order), 'default')
+            self.assertEqual(Order.objects.select_for_update().db, 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(Order), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'], REPLICA_PIN_SECONDS=5)
+class ReplicaPinningMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.routed = None
+
+    def view(self, request):
+        self.routed = self.router.db_for_read(Order)
+        return HttpResponse()
+
+    def test_write_pins_and_sets_cookie(self):
+        response = ReplicaPinningMiddleware(self.view)(self.factory.post('/api/orders/'))
+        self.assertEqual(self.routed, 'default')
+        self.assertEqual(response.cookies[ReplicaPinningMiddleware.cookie_name]['max-age'], 5)
+
+    def test_read_after_write_sticks_to_primary(self):
+        request = self.factory.get('/api/orders/')
+        request.COOKIES[ReplicaPinningMiddleware.cookie_name] = '1'
+        ReplicaPinningMiddleware(self.view)(request)
+        self.assertEqual(self.routed, 'default')
+
+    def test_read_goes_to_replica(self):
+        response = ReplicaPinningMiddleware(self.view)(self.factory.get('/api/orders/'))
+        self.assertEqual(self.routed, 'replica_0')
+        self.assertNotIn(ReplicaPinningMiddleware.cookie_name, response.cookies)
@@ -0,0 +1,106 @@
+import json
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.fast import get_row_serializer
+from core.renderers import FastJSONRenderer
+from customers.models import Customers
+from customers.serializers import CustomerSerializer
+from orders.models import Order, OrderItem
+from orders.serializers import ArchivedOrderSerializer, ItemSerializer, OrderItemSerializer, OrderSerializer
+from pizzas.models import Pizzas, PizzaSizes
+from pizzas.serializers import PizzaSerializer
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a database that doesn't exist
+    """
+    def db_for_read(self, model, **hints):
+        return 'replica'
+
+
+class FastSerializationTest(TestCase):
+    """
+    The fast list path must produce exactly the bytes of the model serializers and JSONRenderer
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        pizza = Pizzas.objects.create(name='fast   pizza')
+        size = PizzaSizes.objects.create(sizename=PizzaSizes.LARGE)
+        customer = Customers.objects.create(name='Zoë \u2028', phone='444', gender=Customers.FEMALE, age=30)
+        Customers.objects.create(name='no email', phone='445', gender=Customers.MALE)
+        Order.objects.create()
+        for _ in range(3):
+            order = Order.objects.create(customer=customer)
+            for number in range(3):
+                OrderItem.objects.create(order=order, pizza_name=pizza, pizza_size=size, number_of_pizzas=number + 1)
+        OrderItem.objects.create(order=order, pizza_name=None, pizza_size=size, number_of_pizzas=1)
+
+    def assert_same_output(self, serializer_class, queryset):
+        rows = get_row_serializer(serializer_class)
+        self.assertIsNotNone(rows)
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        self.assertEqual(FastJSONRenderer().render(rows.to_representation(list(rows.values(queryset)))), expected)
+
+    def test_serializers(self):
+        self.assert_same_output(OrderSerializer, Order.objects.prefetch_related('items'))
+        self.assert_same_output(ItemSerializer, OrderItem.objects.all())
+        self.assert_same_output(OrderItemSerializer, OrderItem.objects.all())
+        self.assert_same_output(CustomerSerializer, Customers.objects.all())
+        self.assert_same_output(PizzaSerializer, Pizzas.objects.all())
+
+    def test_related_rows_use_page_database(self):
+        rows = get_row_serializer(OrderSerializer)
+        page = list(rows.values(Order.objects.using('default')))
+        with override_settings(DATABASE_ROUTERS=[ReplicaRouter()]):
+            data = rows.to_representation(page, 'default')
+        self.assertEqual(sum(len(x['items']) for x in data), OrderItem.objects.count())
+
+    def test_unsupported_serializer(self):
+        self.assertIsNone(get_row_serializer(ArchivedOrderSerializer))
+
+    def test_renderer(self):
+        data = [{'when': timezone.now(), 'day': timezone.now().date(), 'price': Decimal('1.50'),
+                 'label': gettext_lazy('Accepted'), 'text': 'line \u2029 separator', 'ids': (1, 2)}]
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # Left to JSONRenderer
+        data.append({'big': 2 ** 70})
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=4'),
+                         JSONRenderer().render(data, 'application/json; indent=4'))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_renderer_floats(self):
+        for value in (1.5, 1e16, 1e-7, 2.5e-05, -0.0):
+            data = [{'id': 1, 'value': value}]
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # Not valid JSON, STRICT_JSON makes JSONRenderer raise
+        for value in (float('nan'), float('inf')):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'nested': [{'value': value}]})
+
+    def test_list_views(self):
+        client = APIClient()
+        for name, serializer_class, model in (('orders:orders-list', OrderSerializer, Order),
+                                              ('orders:items-list', ItemSerializer, OrderItem),
+                                              ('customers:customers-list', CustomerSerializer, Customers)):
+            # Following the cursor of the fast path pages through the rows of the regular serializer
+            results = []
+            url = reverse(name) + '?page_size=3'
+            while url:
+                content = client.get(url, HTTP_ACCEPT='application/json').json()
+                results.extend(content['results'])
+                url = content['next']
+            queryset = model.objects.order_by('-created', '-id')
+            self.assertEqual(results, json.loads(JSONRenderer().render(serializer_class(queryset, many=True).data)))
+
+        expanded = client.get(reverse('orders:orders-list'), {'expand': 'customer'}).data['results']
+        self.assertTrue(all(x['customer'] is None or 'name' in x['customer'] for x in expanded))
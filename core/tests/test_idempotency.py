@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_422_UNPROCESSABLE_ENTITY
+from rest_framework.test import APIClient
+
+from core.idempotency import REPLAYED_HEADER
+from core.models import IdempotencyKey
+from customers.models import Customers
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+class IdempotencyTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customers.objects.create(name='retry', phone='444', gender=Customers.MALE)
+        cls.pizza = Pizzas.objects.create(name='retry_pizza')
+        cls.size = PizzaSizes.objects.create(sizename=PizzaSizes.SMALL)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('orders:orders-list')
+
+    def post(self, url, data, key):
+        return self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_returns_stored_response(self):
+        first = self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'order-1')
+        self.assertEqual(first.status_code, HTTP_201_CREATED)
+        self.assertNotIn(REPLAYED_HEADER, first)
+
+        retry = self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'order-1')
+        self.assertEqual(retry.status_code, HTTP_201_CREATED)
+        self.assertEqual(retry[REPLAYED_HEADER], 'true')
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(Order.objects.filter(customer=IdempotencyTest.customer).count(), 1)
+
+    def test_item_retry(self):
+        order = Order.objects.create(customer=IdempotencyTest.customer)
+        url = reverse('orders:orderitems-list', args=[order.id])
+        data = {'pizza_name': IdempotencyTest.pizza.id, 'pizza_size': IdempotencyTest.size.id, 'number_of_pizzas': 2}
+        first = self.post(url, data, 'item-1')
+        retry = self.post(url, data, 'item-1')
+        self.assertEqual((first.status_code, retry.status_code), (HTTP_201_CREATED, HTTP_201_CREATED))
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 1)
+        order.refresh_from_db()
+        self.assertEqual(order.total_pizzas, 2)
+
+    def test_key_reused_for_another_request(self):
+        self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'order-2')
+        other = Customers.objects.create(name='other', phone='445', gender=Customers.MALE)
+        res = self.post(self.url, {'customer': other.id}, 'order-2')
+        self.assertEqual(res.status_code, HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertFalse(Order.objects.filter(customer=other).exists())
+
+    def test_failed_request_is_not_stored(self):
+        res = self.post(self.url, {}, 'order-3')
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.filter(key='order-3').exists())
+        res = self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'order-3')
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+
+    def test_without_key(self):
+        for _ in range(2):
+            self.client.post(self.url, {'customer': IdempotencyTest.customer.id}, format='json')
+        self.assertEqual(Order.objects.filter(customer=IdempotencyTest.customer).count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_invalid_key(self):
+        res = self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'x' * 256)
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=60)
+    def test_expired_key(self):
+        self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'order-4')
+        IdempotencyKey.objects.update(created=timezone.now() - timedelta(minutes=2))
+        res = self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'order-4')
+        self.assertNotIn(REPLAYED_HEADER, res)
+        self.assertEqual(Order.objects.filter(customer=IdempotencyTest.customer).count(), 2)
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=60)
+    def test_expired_key_concurrent_retry(self):
+        first = self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'order-5')
+        IdempotencyKey.objects.update(created=timezone.now() - timedelta(minutes=2))
+        stored = IdempotencyKey.objects.get()
+
+        def concurrent_retry(instance, **kwargs):
+            # Another retry inserts the key again and commits right after the expired one is deleted
+            post_delete.disconnect(concurrent_retry, sender=IdempotencyKey)
+            IdempotencyKey.objects.create(key='order-5', fingerprint=stored.fingerprint,
+                                          status_code=stored.status_code, response=stored.response)
+
+        post_delete.connect(concurrent_retry, sender=IdempotencyKey)
+        self.addCleanup(post_delete.disconnect, concurrent_retry, sender=IdempotencyKey)
+        res = self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'order-5')
+        self.assertEqual((res.status_code, res[REPLAYED_HEADER]), (HTTP_201_CREATED, 'true'))
+        self.assertEqual(res.content, first.content)
+        self.assertEqual(Order.objects.filter(customer=IdempotencyTest.customer).count(), 1)
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=60)
+    def test_purge(self):
+        self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'old')
+        IdempotencyKey.objects.update(created=timezone.now() - timedelta(minutes=2))
+        self.post(self.url, {'customer': IdempotencyTest.customer.id}, 'new')
+        call_command('purge_idempotency_keys', batch_size=1, stdout=StringIO())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
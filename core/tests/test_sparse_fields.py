@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from customers.models import Customers
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+order_url = reverse('orders:orders-list')
+pizza_url = reverse('pizzas:pizzas-list')
+
+
+class SparseFieldsTest(TestCase):
+    """
+    '?fields=' restricts both the representation and the loaded columns
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        pizza = Pizzas.objects.create(name='sparse_pizza')
+        size = PizzaSizes.objects.create(sizename=PizzaSizes.LARGE)
+        cls.customer = Customers.objects.create(name='sparse', phone='777', gender=Customers.MALE)
+        for _ in range(3):
+            order = Order.objects.create(customer=cls.customer)
+            OrderItem.objects.create(order=order, pizza_name=pizza, pizza_size=size, number_of_pizzas=1)
+        cls.order = order
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_order_list(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(order_url, {'fields': 'id,order_state'})
+        self.assertEqual([set(x) for x in res.data['results']], [{'id', 'order_state'}] * 3)
+        # No items query, no unused columns
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('total_pizzas', queries[0]['sql'])
+
+        res = self.client.get(order_url, {'fields': 'id,items'})
+        self.assertEqual(res.data['results'][0], {'id': self.order.id, 'items': [self.order.items.get().id]})
+
+    def test_order_retrieve(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse('orders:orders-detail', args=[self.order.id]), {'fields': 'order_state'})
+        self.assertEqual(res.data, {'order_state': Order.ACCEPTED})
+        self.assertNotIn('total_pizzas', queries[0]['sql'])
+
+    def test_expand(self):
+        res = self.client.get(order_url, {'fields': 'id,customer', 'expand': 'customer,items'})
+        self.assertEqual(set(res.data['results'][0]), {'id', 'customer'})
+        self.assertEqual(res.data['results'][0]['customer']['name'], 'sparse')
+
+    def test_unknown_fields(self):
+        res = self.client.get(order_url, {'fields': 'nothing'})
+        self.assertIn('total_pizzas', res.data['results'][0])
+
+    def test_write_requests(self):
+        res = self.client.post(order_url + '?fields=id', {'customer': self.customer.id}, format='json')
+        self.assertEqual(set(res.data), {'id', 'customer'})
+
+    def test_customer_search(self):
+        res = self.client.get(reverse('customers:customers-search'), {'q': 'spar', 'fields': 'name'})
+        self.assertEqual(res.data, [{'name': 'sparse'}])
+
+    def test_menu(self):
+        res = self.client.get(pizza_url, {'fields': 'id,name'})
+        self.assertEqual(res.data, [{'id': Pizzas.objects.get().id, 'name': 'sparse_pizza'}])
+        self.assertNotEqual(res['ETag'], self.client.get(pizza_url)['ETag'])
+
+        res = self.client.get(pizza_url, {'fields': 'id,name'}, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, 304)
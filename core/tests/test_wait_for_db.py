@@ -0,0 +1,35 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+
+class WaitForDbTest(SimpleTestCase):
+    allow_database_queries = True
+
+    def test_retries_until_the_database_is_up(self):
+        cursor = connection.cursor
+        attempts = []
+
+        def failing_cursor():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise OperationalError('the database system is starting up')
+            return cursor()
+
+        out = StringIO()
+        with mock.patch.object(connection, 'cursor', failing_cursor), mock.patch('time.sleep') as sleep:
+            call_command('wait_for_db', stdout=out)
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual([x[0][0] for x in sleep.call_args_list], [0.1, 0.2])
+        self.assertIn('Database is UP', out.getvalue())
+
+    def test_gives_up_after_timeout(self):
+        with mock.patch.object(connection, 'cursor', side_effect=OperationalError('refused')), \
+                mock.patch('time.sleep'):
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', timeout=1, stdout=StringIO())
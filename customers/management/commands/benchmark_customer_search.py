@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import percentile, summarize
+from customers.models import Customers
+from customers.search import search_customers
+
+
+SYLLABLES = ('an', 'bel', 'cor', 'da', 'el', 'fin', 'gor', 'ha', 'is', 'jo', 'ka', 'lin', 'mar', 'no', 'ol',
+             'pe', 'quin', 'ro', 'sa', 'ter', 'ul', 'van', 'wil', 'xe', 'yo', 'zan')
+DOMAINS = ('mail.com', 'post.org', 'inbox.net', 'example.com')
+
+
+def random_name():
+    return ' '.join(
+        ''.join(random.choice(SYLLABLES) for _ in range(random.randint(2, 3))).capitalize() for _ in range(2)
+    )
+
+
+class Command(BaseCommand):
+    """
+    Seeds customers with random names, phones and emails and measures the latency of the customer search
+    for phone prefixes, phone fragments, name fragments and email fragments taken from existing customers
+    """
+    help = 'Benchmarks the customer search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=10000000, help='Minimal number of customers')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Seeding batch size')
+        parser.add_argument('--queries', type=int, default=200, help='Searches per query kind')
+        parser.add_argument('--limit', type=int, default=20, help='Results per search')
+
+    def handle(self, *args, **options):
+        self.seed(options['customers'], options['batch_size'])
+        sample = list(Customers.objects.order_by('?').values('name', 'email', 'phone_normalized')[:options['queries']])
+
+        kinds = (
+            ('phone prefix', lambda x: x['phone_normalized'][:6]),
+            ('phone fragment', lambda x: x['phone_normalized'][3:8]),
+            ('name fragment', lambda x: x['name'][random.randint(0, 3):][:4]),
+            ('email fragment', lambda x: (x['email'] or '').split('@')[0][-5:]),
+        )
+        for name, fragment in kinds:
+            # The API takes queries of 3 characters and more
+            queries = [x for x in map(fragment, sample) if len(x.strip()) >= 3]
+            samples = []
+            for query in queries:
+                started = time.perf_counter()
+                search_customers(query, options['limit'])
+                samples.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(self.style.MIGRATE_LABEL('{}: {}'.format(name, summarize(samples))))
+            if percentile(samples, 99) > 20:
+                self.stdout.write(self.style.WARNING('  p99 is above 20ms'))
+
+    def seed(self, count, batch_size):
+        missing = count - Customers.objects.count()
+        if missing <= 0:
+            return
+        self.stdout.write('Seeding {} customers'.format(missing))
+        for start in range(0, missing, batch_size):
+            batch = []
+            for number in range(start, min(start + batch_size, missing)):
+                name = random_name()
+                phone = str(random.randint(10 ** 9, 10 ** 10 - 1))
+                batch.append(Customers(
+                    name=name,
+                    phone='+{} ({}) {}-{}'.format(phone[0], phone[1:4], phone[4:7], phone[7:]),
+                    phone_normalized=phone,
+                    email='{}.{}@{}'.format(name.replace(' ', '.').lower(), number, random.choice(DOMAINS)),
+                    gender=random.choice((Customers.FEMALE, Customers.MALE))
+                ))
+            Customers.objects.bulk_create(batch)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE customers_customers')
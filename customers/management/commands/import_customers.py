@@ -0,0 +1,138 @@
+import csv
+import io
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from customers.models import Customers, normalize_phone
+from customers.serializers import CustomerSerializer
+
+
+# Columns written by COPY, in this order
+COPY_COLUMNS = ('created', 'updated', 'email', 'name', 'phone', 'phone_normalized', 'age', 'gender')
+
+# Column compared by --dedup, phones match however they are formatted
+DEDUP_COLUMNS = {'phone': 'phone_normalized', 'email': 'email'}
+
+
+class Command(BaseCommand):
+    """
+    Streams customers from a CSV or NDJSON file, validates every row with CustomerSerializer and loads them in
+    batches. PostgreSQL batches are loaded with COPY, other databases use bulk_create. Rows whose phone or email
+    is already known, in the database or earlier in the file, can be skipped
+    """
+    help = 'Imports customers from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="Input file, '-' reads stdin")
+        parser.add_argument('--input-format', choices=('csv', 'ndjson'), help='Guessed from the file extension')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per COPY or INSERT')
+        parser.add_argument('--dedup', action='append', choices=('phone', 'email'), default=[],
+                            help='Skip rows with a known value of this field, can be repeated')
+        parser.add_argument('--method', choices=('auto', 'copy', 'bulk'), default='auto',
+                            help='Loading method, COPY is used on PostgreSQL by default')
+
+    def handle(self, *args, **options):
+        method = options['method']
+        if method == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('COPY is only available on PostgreSQL')
+
+        input_format = options['input_format'] or ('ndjson' if options['file'].endswith(('.ndjson', '.jsonl')) else 'csv')
+        source = sys.stdin if options['file'] == '-' else open(options['file'], newline='')
+        try:
+            self.import_rows(self.read_rows(source, input_format), method, options['batch_size'], options['dedup'])
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+    @staticmethod
+    def read_rows(source, input_format):
+        """
+        Yields input rows as dicts. Empty CSV cells are treated as missing values
+        """
+        if input_format == 'csv':
+            for row in csv.DictReader(source):
+                yield {key: value for key, value in row.items() if value != ''}
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+    def import_rows(self, rows, method, batch_size, dedup):
+        validator = CustomerSerializer()
+        seen = {field: set() for field in dedup}
+        stats = {'read': 0, 'imported': 0, 'invalid': 0, 'duplicates': 0}
+        started = time.perf_counter()
+
+        batch = []
+        for row in rows:
+            stats['read'] += 1
+            try:
+                batch.append(validator.run_validation(row))
+            except ValidationError as exc:
+                stats['invalid'] += 1
+                self.stderr.write('Row {}: {}'.format(stats['read'], exc.detail))
+            if len(batch) >= batch_size:
+                self.load_batch(batch, method, seen, stats)
+                self.report(stats, started)
+                batch = []
+        if batch:
+            self.load_batch(batch, method, seen, stats)
+        self.report(stats, started)
+
+    def load_batch(self, batch, method, seen, stats):
+        """
+        Drops duplicates of the batch and writes the rest in one transaction
+        """
+        # Both loading methods bypass Customers.save
+        for row in batch:
+            row['phone_normalized'] = normalize_phone(row['phone'])
+        dedup = [(DEDUP_COLUMNS[field], known) for field, known in seen.items()]
+        for column, known in dedup:
+            values = {x.get(column) for x in batch if x.get(column)}
+            known.update(Customers.objects.filter(**{column + '__in': values}).values_list(column, flat=True))
+        if seen:
+            unique = []
+            for row in batch:
+                # A row is checked against every field before any of its values counts as seen
+                if any(row.get(column) and row.get(column) in known for column, known in dedup):
+                    stats['duplicates'] += 1
+                    continue
+                for column, known in dedup:
+                    if row.get(column):
+                        known.add(row[column])
+                unique.append(row)
+            batch = unique
+
+        with transaction.atomic():
+            if method == 'copy':
+                self.copy(batch)
+            else:
+                Customers.objects.bulk_create([Customers(**x) for x in batch])
+        stats['imported'] += len(batch)
+
+    @staticmethod
+    def copy(batch):
+        now = timezone.now()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow([now, now] + [row.get(x) for x in COPY_COLUMNS[2:]])
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(Customers._meta.db_table, ', '.join(COPY_COLUMNS)),
+                buffer
+            )
+
+    def report(self, stats, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write('read {read}, imported {imported}, duplicates {duplicates}, invalid {invalid}'.format(**stats)
+                          + ' - {:.0f} rows/s'.format(stats['read'] / elapsed if elapsed else 0))
@@ -0,0 +1,17 @@
+# Generated by Django 2.1.4 on 2026-10-18 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customers',
+            index=models.Index(fields=['-created', '-id'], name='customers_created_idx'),
+        ),
+    ]
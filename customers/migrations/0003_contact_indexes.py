@@ -0,0 +1,21 @@
+# Generated by Django 2.1.15 on 2026-10-18 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customers',
+            index=models.Index(fields=['phone'], name='customers_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customers',
+            index=models.Index(fields=['email'], name='customers_email_idx'),
+        ),
+    ]
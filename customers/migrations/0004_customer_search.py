@@ -0,0 +1,62 @@
+# Generated by Django 2.1.4 on 2026-10-18 02:12
+
+import re
+
+from django.db import migrations, models
+
+
+# PostgreSQL search indexes. Trigram GIN indexes serve LIKE '%...%' and the name and email ones are built on
+# UPPER(), the form of Django's icontains. varchar_pattern_ops lets the phone prefix LIKE use a btree
+POSTGRESQL_INDEXES = (
+    ('customers_phone_prefix_idx', '(phone_normalized varchar_pattern_ops)'),
+    ('customers_phone_trgm_idx', 'USING gin (phone_normalized gin_trgm_ops)'),
+    ('customers_name_trgm_idx', 'USING gin (UPPER(name::text) gin_trgm_ops)'),
+    ('customers_email_trgm_idx', 'USING gin (UPPER(email::text) gin_trgm_ops)'),
+)
+
+
+def fill_phone_normalized(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE customers_customers SET phone_normalized = regexp_replace(phone, '[^0-9]', '', 'g')"
+        )
+        return
+    Customers = apps.get_model('customers', 'Customers')
+    for customer in Customers.objects.only('id', 'phone').iterator():
+        Customers.objects.filter(id=customer.id).update(phone_normalized=re.sub(r'[^0-9]', '', customer.phone))
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    Only PostgreSQL has trigram indexes, other databases get a plain index for the phone prefix search
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, definition in POSTGRESQL_INDEXES:
+            schema_editor.execute('CREATE INDEX {} ON customers_customers {}'.format(name, definition))
+    else:
+        schema_editor.execute('CREATE INDEX customers_phone_prefix_idx ON customers_customers (phone_normalized)')
+
+
+def drop_search_indexes(apps, schema_editor):
+    names = [x[0] for x in POSTGRESQL_INDEXES] if schema_editor.connection.vendor == 'postgresql' \
+        else ['customers_phone_prefix_idx']
+    for name in names:
+        schema_editor.execute('DROP INDEX {}'.format(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_contact_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customers',
+            name='phone_normalized',
+            field=models.CharField(default='', editable=False, max_length=50, verbose_name='Normalized phone number'),
+        ),
+        migrations.RunPython(fill_phone_normalized, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,10 +1,22 @@
+import re
+
 from django.db import models
 from core.models import TimeStampedModel
 
 
+def normalize_phone(phone):
+    """
+    Digits of a phone number, the form phone searches are matched against
+    :type phone: str
+    :rtype: str
+    """
+    return re.sub(r'[^0-9]', '', phone or '')
+
+
 class Customers(TimeStampedModel):
     """
-    Customer model
+    Customer model. phone_normalized is kept by save(), code inserting customers in bulk sets it with
+    normalize_phone
     """
     FEMALE = 'F'
     MALE = 'M'
@@ -17,10 +29,21 @@ class Customers(TimeStampedModel):
     email = models.EmailField('Email', null=True)
     name = models.CharField('Name', max_length=200, null=False)
     phone = models.CharField('Phone number', max_length=50, null=False)
+    phone_normalized = models.CharField('Normalized phone number', max_length=50, default='', editable=False)
     age = models.PositiveSmallIntegerField('Age', null=True)
     gender = models.CharField('Gender', max_length=1, choices=GENDER_CHOICES)
 
+    def save(self, *args, **kwargs):
+        self.phone_normalized = normalize_phone(self.phone)
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created']
+        # Search indexes are created by raw SQL in migration 0004
+        indexes = [
+            models.Index(fields=['-created', '-id'], name='customers_created_idx'),
+            models.Index(fields=['phone'], name='customers_phone_idx'),
+            models.Index(fields=['email'], name='customers_email_idx'),
+        ]
 
 
@@ -0,0 +1,55 @@
+import re
+
+from django.db.models import Q
+
+from customers.models import Customers, normalize_phone
+
+
+# Characters people type inside phone numbers
+PHONE_QUERY = re.compile(r'\+?[0-9][0-9\s().-]*')
+
+# Shortest text the trigram indexes serve, shorter substring searches scan the whole table
+MIN_QUERY_LENGTH = 3
+
+
+def is_phone_query(query):
+    """
+    :type query: str
+    :rtype: bool
+    """
+    return bool(PHONE_QUERY.fullmatch(query.strip()))
+
+
+def search_customers(query, limit):
+    """
+    Top matches of a support desk query, ranked in tiers: exact matches first, then prefix matches, then
+    matches anywhere. Phone-like queries are matched against the normalized phone, other queries against the
+    name and the email. Every tier is one query that stops after the missing number of rows, rows of the same
+    tier are not sorted
+    :param query: searched text, at least MIN_QUERY_LENGTH characters (digits for phone-like queries) long
+    :type query: str
+    :param limit: maximum number of customers
+    :type limit: int
+    :rtype: list
+    """
+    query = query.strip()
+    if is_phone_query(query):
+        digits = normalize_phone(query)
+        tiers = [Q(phone_normalized=digits), Q(phone_normalized__startswith=digits)]
+        if len(digits) >= MIN_QUERY_LENGTH:
+            tiers.append(Q(phone_normalized__contains=digits))
+    else:
+        tiers = [
+            Q(name__iexact=query) | Q(email__iexact=query),
+            Q(name__istartswith=query) | Q(email__istartswith=query),
+            Q(name__icontains=query) | Q(email__icontains=query),
+        ]
+
+    found = []
+    for condition in tiers:
+        if len(found) >= limit:
+            break
+        found.extend(Customers.objects.filter(condition).exclude(id__in=[x.id for x in found]).order_by()[
+            :limit - len(found)
+        ])
+    return found
@@ -1,11 +1,27 @@
-from rest_framework.serializers import ModelSerializer
-from .models import Customers
+from django.conf import settings
+from rest_framework.serializers import ModelSerializer, Serializer, CharField, IntegerField, ValidationError
+from .models import Customers, normalize_phone
+from .search import MIN_QUERY_LENGTH, is_phone_query
+from core.serializers import SelectableFieldsMixin
 
 
-class CustomerSerializer(ModelSerializer):
+class CustomerSerializer(SelectableFieldsMixin, ModelSerializer):
     """
     A serializer for Customer model
     """
     class Meta:
         model = Customers
-        fields = '__all__'
+        exclude = ('phone_normalized', )
+
+
+class CustomerSearchSerializer(Serializer):
+    """
+    Parameters of the customer search
+    """
+    q = CharField(min_length=MIN_QUERY_LENGTH, max_length=200)
+    limit = IntegerField(min_value=1, max_value=settings.CUSTOMER_SEARCH_MAX_RESULTS, default=20)
+
+    def validate_q(self, value):
+        if is_phone_query(value) and len(normalize_phone(value)) < MIN_QUERY_LENGTH:
+            raise ValidationError('A phone number needs at least {} digits'.format(MIN_QUERY_LENGTH))
+        return value
@@ -0,0 +1,50 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+from rest_framework.test import APIClient
+
+from customers.models import Customers
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+class CustomerOrdersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.customer = Customers.objects.create(name='history', phone='888', gender=Customers.MALE)
+        other = Customers.objects.create(name='other', phone='889', gender=Customers.MALE)
+        pizza = Pizzas.objects.create(name='history_pizza')
+        size = PizzaSizes.objects.create(sizename=PizzaSizes.MEDIUM)
+        cls.orders = []
+        for number in range(5):
+            order = Order.objects.create(customer=cls.customer)
+            for _ in range(2):
+                OrderItem.objects.create(order=order, pizza_name=pizza, pizza_size=size, number_of_pizzas=number + 1)
+            cls.orders.append(order)
+        Order.objects.create(customer=other)
+        cls.url = reverse('customers:customers-orders', args=[cls.customer.id])
+
+    def test_history_pages(self):
+        with self.assertNumQueries(2):
+            res = CustomerOrdersTest.client.get(CustomerOrdersTest.url, {'page_size': 3})
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual([x['id'] for x in res.data['results']], [x.id for x in CustomerOrdersTest.orders[:1:-1]])
+        first = res.data['results'][0]
+        self.assertEqual((first['total_pizzas'], first['active_items']), (10, 2))
+        self.assertEqual(sorted(first['items'][0]), ['id', 'is_active', 'number_of_pizzas', 'pizza_name', 'pizza_size'])
+
+        res = CustomerOrdersTest.client.get(res.data['next'])
+        self.assertEqual([x['id'] for x in res.data['results']], [x.id for x in CustomerOrdersTest.orders[1::-1]])
+        self.assertIsNone(res.data['next'])
+
+    def test_unknown_customer(self):
+        res = CustomerOrdersTest.client.get(reverse('customers:customers-orders', args=[0]))
+        self.assertEqual(res.status_code, HTTP_404_NOT_FOUND)
+
+    def test_customer_without_orders(self):
+        customer = Customers.objects.create(name='new', phone='890', gender=Customers.FEMALE)
+        res = CustomerOrdersTest.client.get(reverse('customers:customers-orders', args=[customer.id]))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from customers.models import Customers
+
+
+search_url = reverse('customers:customers-search')
+
+
+class CustomerSearchTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.anna = Customers.objects.create(name='Anna Smith', phone='+1 (555) 010-2030', email='anna@mail.com',
+                                            gender=Customers.FEMALE)
+        cls.bob = Customers.objects.create(name='Bob Stone', phone='555-777-1555', email='bob@work.org',
+                                           gender=Customers.MALE)
+
+    def search(self, **params):
+        res = CustomerSearchTest.client.get(search_url, params)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        return [x['id'] for x in res.data]
+
+    def test_phone_is_normalized(self):
+        self.assertEqual(CustomerSearchTest.anna.phone_normalized, '15550102030')
+        self.assertNotIn('phone_normalized', CustomerSearchTest.client.get(
+            reverse('customers:customers-detail', args=[CustomerSearchTest.anna.id])
+        ).data)
+
+    def test_phone_prefix_first(self):
+        self.assertEqual(self.search(q='555 7'), [CustomerSearchTest.bob.id])
+        self.assertEqual(self.search(q='555'), [CustomerSearchTest.bob.id, CustomerSearchTest.anna.id])
+
+    def test_name_and_email(self):
+        self.assertEqual(self.search(q='smi'), [CustomerSearchTest.anna.id])
+        self.assertEqual(self.search(q='WORK.org'), [CustomerSearchTest.bob.id])
+
+    def test_name_ranking(self):
+        smith = Customers.objects.create(name='Smith', phone='5559990000', gender=Customers.MALE)
+        smithers = Customers.objects.create(name='Smithers', phone='5559990001', gender=Customers.MALE)
+        self.assertEqual(self.search(q='smith'), [smith.id, smithers.id, CustomerSearchTest.anna.id])
+        self.assertEqual(self.search(q='smith', limit=2), [smith.id, smithers.id])
+
+    def test_limit(self):
+        self.assertEqual(len(self.search(q='555', limit=1)), 1)
+
+    def test_validation(self):
+        self.assertEqual(CustomerSearchTest.client.get(search_url, {'q': 'ab'}).status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(CustomerSearchTest.client.get(search_url, {'q': 'abc', 'limit': 0}).status_code,
+                         HTTP_400_BAD_REQUEST)
+        # Phone-like queries count digits only
+        self.assertEqual(CustomerSearchTest.client.get(search_url, {'q': '1 - 2'}).status_code, HTTP_400_BAD_REQUEST)
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from customers.models import Customers
+
+
+class ImportCustomersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Customers.objects.create(name='existing', phone='5550001', email='existing@mail.com', gender=Customers.MALE)
+
+    def write_file(self, suffix, content):
+        """
+        Writes a temporary input file removed after the test
+        :rtype: str
+        """
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w') as output:
+            output.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def run_import(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command('import_customers', path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import(self):
+        path = self.write_file('.csv', '\n'.join([
+            'name,phone,email,age,gender',
+            'first,5550010,first@mail.com,30,F',
+            'second,555-0011,,,M',
+        ]))
+        out, _ = self.run_import(path, batch_size=1)
+
+        self.assertIn('imported 2', out)
+        second = Customers.objects.get(phone_normalized='5550011')
+        self.assertIsNone(second.email)
+        self.assertIsNone(second.age)
+
+    def test_ndjson_import_skips_invalid_rows(self):
+        rows = [
+            {'name': 'valid', 'phone': '5550020', 'gender': 'F'},
+            {'name': 'bad email', 'phone': '5550021', 'gender': 'F', 'email': 'not an email'},
+            {'phone': '5550022', 'gender': 'M'},
+        ]
+        path = self.write_file('.ndjson', '\n'.join(json.dumps(x) for x in rows))
+        out, err = self.run_import(path)
+
+        self.assertIn('imported 1', out)
+        self.assertIn('invalid 2', out)
+        self.assertIn('Row 2', err)
+        self.assertTrue(Customers.objects.filter(phone='5550020').exists())
+
+    def test_dedup_against_database_and_file(self):
+        path = self.write_file('.csv', '\n'.join([
+            'name,phone,email,gender',
+            'known phone,5550001,new@mail.com,F',
+            'new,5550030,new@mail.com,F',
+            'known email,5550031,existing@mail.com,M',
+            'repeated,5550030,other@mail.com,M',
+        ]))
+        out, _ = self.run_import(path, dedup=['phone', 'email'], batch_size=2)
+
+        self.assertIn('imported 1', out)
+        self.assertIn('duplicates 3', out)
+        self.assertEqual(Customers.objects.filter(phone='5550030').count(), 1)
+
+    def test_dedup_skipped_row_marks_nothing_seen(self):
+        path = self.write_file('.csv', '\n'.join([
+            'name,phone,email,gender',
+            'known email,5550040,existing@mail.com,F',
+            'same phone,5550040,fresh@mail.com,F',
+        ]))
+        out, _ = self.run_import(path, dedup=['phone', 'email'])
+
+        self.assertIn('imported 1', out)
+        self.assertIn('duplicates 1', out)
+        self.assertEqual(Customers.objects.get(phone='5550040').email, 'fresh@mail.com')
+
+    def test_dedup_normalized_phones(self):
+        path = self.write_file('.csv', '\n'.join([
+            'name,phone,gender',
+            'formatted,+1 (555) 123-4567,F',
+            'digits,15551234567,F',
+            'known,555-0001,M',
+        ]))
+        out, _ = self.run_import(path, dedup=['phone'])
+
+        self.assertIn('imported 1', out)
+        self.assertIn('duplicates 2', out)
+        self.assertEqual(Customers.objects.get(phone_normalized='15551234567').name, 'formatted')
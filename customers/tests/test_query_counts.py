@@ -0,0 +1,31 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APIClient
+
+from customers.models import Customers
+
+
+class CustomerQueryCountTest(TestCase):
+    """
+    Query count regression tests for the customer endpoints
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.customers = [
+            Customers.objects.create(name='customer_{}'.format(x), phone='777{}'.format(x), gender=Customers.FEMALE)
+            for x in range(10)
+        ]
+
+    def assert_get_queries(self, num, url):
+        with self.assertNumQueries(num):
+            res = CustomerQueryCountTest.client.get(url)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    def test_customer_list(self):
+        self.assert_get_queries(1, reverse('customers:customers-list'))
+
+    def test_customer_retrieve(self):
+        self.assert_get_queries(1, reverse('customers:customers-detail', args=[CustomerQueryCountTest.customers[0].id]))
@@ -1,12 +1,55 @@
+from django.db.models import Prefetch
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from core.mixins import ExportMixin, FastListMixin, SparseFieldsMixin
 from customers.models import Customers
-from customers.serializers import CustomerSerializer
+from customers.search import search_customers
+from customers.serializers import CustomerSearchSerializer, CustomerSerializer
+from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from orders.serializers import CustomerArchivedOrderSerializer, CustomerOrderSerializer
 
 
-class CustomersViewSet(viewsets.ModelViewSet):
+class CustomersViewSet(SparseFieldsMixin, ExportMixin, FastListMixin, viewsets.ModelViewSet):
     """
-    A ViewSet for Pizza Model
+    A ViewSet for Customers Model
     """
     serializer_class = CustomerSerializer
     queryset = Customers.objects.all()
+    export_fields = ('id', 'name', 'email', 'phone', 'age', 'gender', 'created', 'updated')
 
+    @action(detail=True, methods=['get'])
+    def orders(self, request, pk=None):
+        """
+        Order history of the customer, newest first, with keyset pagination. Only the columns of the covering
+        (customer, -created, -id) index are read, so a page costs the same for a customer with ten orders
+        and one with ten thousand. '?archived=1' pages through the archived orders instead
+        """
+        try:
+            customer_id = int(pk)
+        except ValueError:
+            raise NotFound()
+        if request.query_params.get('archived') in ('1', 'true'):
+            orders, items, serializer_class = ArchivedOrder, ArchivedOrderItem, CustomerArchivedOrderSerializer
+        else:
+            orders, items, serializer_class = Order, OrderItem, CustomerOrderSerializer
+        queryset = orders.objects.filter(customer_id=customer_id).only(
+            'id', 'created', 'updated', 'order_state', 'total_pizzas', 'active_items'
+        ).prefetch_related(Prefetch('items', queryset=items.objects.only(
+            'id', 'order', 'pizza_name', 'pizza_size', 'number_of_pizzas', 'is_active'
+        )))
+        page = self.paginate_queryset(queryset)
+        if not page and not Customers.objects.filter(pk=customer_id).exists():
+            raise NotFound()
+        return self.get_paginated_response(serializer_class(page, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Finds customers by a part of the phone number, name or email: '?q=...&limit=20'
+        """
+        params = CustomerSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        customers = search_customers(params.validated_data['q'], params.validated_data['limit'])
+        return Response(CustomerSerializer(customers, many=True, context=self.get_serializer_context()).data)
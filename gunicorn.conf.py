@@ -0,0 +1,29 @@
+"""
+gunicorn configuration of the production stack: gunicorn -c gunicorn.conf.py pizza.wsgi
+
+Threaded workers are used by default, requests mostly wait for the database and the cache. The long polling
+and SSE order status endpoints hold a thread for up to ORDER_EVENTS_TIMEOUT seconds there, with many waiting
+clients run the ASGI application instead:
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py pizza.asgi:application
+Every setting can be changed with an environment variable
+"""
+import multiprocessing
+import os
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+# Threads of gthread workers, ASGI workers use ASGI_THREADS
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+# Pending connections beyond the busy threads
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# A worker silent for this long is restarted. Longer than the order events timeout
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Workers are recycled after a number of requests, the jitter keeps them from restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils import timezone
+
+from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from orders.status import forget_statuses
+
+
+# Orders in these states don't change any more
+ARCHIVED_STATES = (Order.DELIVERED, Order.CANCELED)
+
+
+def archive_cutoff(days=None):
+    """
+    Orders last changed before the cutoff are archived
+    :param days: age in days, settings.ORDERS_ARCHIVE_AFTER_DAYS by default
+    :type days: int
+    :rtype: datetime
+    """
+    return timezone.now() - timedelta(days=settings.ORDERS_ARCHIVE_AFTER_DAYS if days is None else days)
+
+
+def archive_batch(before, size):
+    """
+    Moves up to size Delivered or Canceled orders last changed before the cutoff, with their items, to the
+    archive tables in one short transaction. Orders are locked with SELECT ... FOR UPDATE SKIP LOCKED, so an
+    order being changed right now is left for the next run instead of waiting for it. The transition log
+    stays in place, it has no foreign key to the orders
+    :param before: cutoff of Order.updated
+    :type before: datetime
+    :param size: maximum number of orders
+    :type size: int
+    :return: number of archived orders, 0 when there is nothing left to archive
+    :rtype: int
+    """
+    using = router.db_for_write(Order)
+    with transaction.atomic(using=using):
+        orders = list(Order.objects.using(using).select_for_update(skip_locked=True).filter(
+            order_state__in=ARCHIVED_STATES, updated__lt=before
+        ).order_by('updated')[:size])
+        if not orders:
+            return 0
+        order_ids = [x.id for x in orders]
+        items = OrderItem.objects.using(using).filter(order_id__in=order_ids).order_by()
+        ArchivedOrder.objects.using(using).bulk_create([ArchivedOrder.from_order(x) for x in orders])
+        ArchivedOrderItem.objects.using(using).bulk_create([ArchivedOrderItem.from_item(x) for x in items])
+        # Raw DELETEs don't send the delete signals, the archived rows still count in the analytics rollups
+        items._raw_delete(using)
+        Order.objects.using(using).filter(id__in=order_ids).order_by()._raw_delete(using)
+    forget_statuses(order_ids)
+    return len(orders)
+
+
+def archive_orders(before, size=None, progress=None):
+    """
+    Archives all Delivered and Canceled orders last changed before the cutoff, batch by batch
+    :param before: cutoff of Order.updated
+    :type before: datetime
+    :param size: orders per batch, settings.ORDERS_ARCHIVE_BATCH_SIZE by default
+    :type size: int
+    :param progress: called with the total number of archived orders after every batch
+    :return: number of archived orders
+    :rtype: int
+    """
+    total = 0
+    while True:
+        archived = archive_batch(before, size or settings.ORDERS_ARCHIVE_BATCH_SIZE)
+        if not archived:
+            return total
+        total += archived
+        if progress:
+            progress(total)
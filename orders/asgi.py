@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+
+from core.asgi import run_sync, send_json
+from orders.events import CHANNEL, broker, ensure_listener
+from orders.status import get_statuses, status_etag
+from orders.views import batch_statuses, current_events, is_not_modified, parse_order_ids, parse_poll_params, \
+                         validator_headers
+
+
+class BrokerWakeup:
+    """
+    Wakes up the coroutines waiting for order events of one event loop. A single broker subscription serves all
+    of them: every published event resolves the current future, so ten thousand waiting clients cost ten
+    thousand futures instead of ten thousand threads
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+        broker.subscribe(self.notify)
+
+    def notify(self):
+        try:
+            self.loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            # The loop was closed
+            broker.unsubscribe(self.notify)
+            _wakeups.pop(self.loop, None)
+
+    def _wake(self):
+        future, self.future = self.future, self.loop.create_future()
+        future.set_result(None)
+
+    async def wait(self, since, timeout):
+        """
+        Async counterpart of OrderEventBroker.wait
+        :rtype: list
+        """
+        deadline = self.loop.time() + timeout
+        while True:
+            # Taken before the check, an event published in between resolves it
+            future = self.future
+            events = broker.pending(since)
+            remaining = deadline - self.loop.time()
+            if events or remaining <= 0:
+                return events
+            try:
+                await asyncio.wait_for(asyncio.shield(future), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+
+_wakeups = {}
+
+
+def get_wakeup():
+    """
+    :return: the BrokerWakeup of the running event loop
+    :rtype: BrokerWakeup
+    """
+    loop = asyncio.get_event_loop()
+    if loop not in _wakeups:
+        _wakeups[loop] = BrokerWakeup(loop)
+    return _wakeups[loop]
+
+
+async def send_conditional(request, send, data, etag, updated):
+    """
+    Async counterpart of OrderItemsStatusViewSet.conditional_response
+    """
+    not_modified = is_not_modified(request.headers.get('if-none-match'), request.headers.get('if-modified-since'),
+                                   etag, updated)
+    await send_json(send, 304 if not_modified else 200, None if not_modified else data,
+                    validator_headers(etag, updated))
+
+
+async def order_status(request, send, pk):
+    """
+    GET /api/orders/status/<pk>/
+    """
+    order_id = int(pk)
+    statuses = await run_sync(get_statuses, [order_id])
+    if order_id not in statuses:
+        return await send_json(send, 404, {'detail': 'Not found.'})
+    order_state, updated = statuses[order_id]
+    await send_conditional(request, send, {'order_state': order_state}, status_etag(order_id, updated), updated)
+
+
+async def order_status_batch(request, send):
+    """
+    GET /api/orders/status/batch/?ids=
+    """
+    try:
+        order_ids = parse_order_ids(request.query_params.get('ids', ''))
+    except ValidationError as exc:
+        return await send_json(send, 400, exc.detail)
+    await send_conditional(request, send, *await run_sync(batch_statuses, order_ids))
+
+
+async def order_status_poll(request, send):
+    """
+    GET /api/orders/status/poll/?ids=&since=&timeout=. A waiting client holds no thread
+    """
+    try:
+        order_ids = parse_order_ids(request.query_params.get('ids', ''))
+        since, timeout = parse_poll_params(request.query_params)
+    except ValidationError as exc:
+        return await send_json(send, 400, exc.detail)
+    events, since = await run_sync(current_events, order_ids, {x: since for x in order_ids})
+    if not events:
+        ensure_listener()
+        events = await get_wakeup().wait(since, timeout)
+    await send_json(send, 200, events)
+
+
+async def order_status_stream(request, send):
+    """
+    GET /api/orders/status/stream/?ids=, Server-Sent Events. Ends when the client disconnects
+    """
+    try:
+        order_ids = parse_order_ids(request.query_params.get('ids', ''))
+    except ValidationError as exc:
+        return await send_json(send, 400, exc.detail)
+    # The current statuses are sent to reconnecting clients too, see OrderItemsStatusViewSet.stream
+    events, since = await run_sync(current_events, order_ids, {x: -1 for x in order_ids})
+    ensure_listener()
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no'),
+    ]})
+    chunk = 'retry: {}\n\n'.format(settings.ORDER_EVENTS_RETRY_MS)
+    disconnected = asyncio.ensure_future(request.wait_disconnect())
+    try:
+        while not disconnected.done():
+            for event in events:
+                since[event['id']] = event['version']
+                chunk += 'id: {}\nevent: {}\ndata: {}\n\n'.format(event['version'], CHANNEL, json.dumps(event))
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+            waiting = asyncio.ensure_future(get_wakeup().wait(since, settings.ORDER_EVENTS_HEARTBEAT))
+            await asyncio.wait([waiting, disconnected], return_when=asyncio.FIRST_COMPLETED)
+            if not waiting.done():
+                waiting.cancel()
+                break
+            events = waiting.result()
+            chunk = '' if events else ': keep-alive\n\n'
+    finally:
+        disconnected.cancel()
+
+
+routes = [
+    (r'/api/orders/status/(?P<pk>[0-9]+)/', order_status),
+    (r'/api/orders/status/batch/', order_status_batch),
+    (r'/api/orders/status/poll/', order_status_poll),
+    (r'/api/orders/status/stream/', order_status_stream),
+]
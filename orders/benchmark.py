@@ -0,0 +1,37 @@
+import itertools
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.benchmark import explicit_timestamps
+from orders.models import Order
+
+
+def seed_orders(count, batch_size=5000, customer_ids=None, states=None):
+    """
+    Bulk inserts orders for benchmarks. Orders are spread back in time one second apart, so every order
+    gets its own 'created' value, customers and states are assigned round robin
+    :param count: number of orders to add
+    :type count: int
+    :param batch_size: rows per INSERT
+    :type batch_size: int
+    :param customer_ids: customers the orders belong to, orders have no customer if empty
+    :type customer_ids: list
+    :param states: order states to cycle through, Accepted if empty
+    :type states: list
+    """
+    start = timezone.now() - timedelta(seconds=count)
+    customers = itertools.cycle(customer_ids) if customer_ids else itertools.repeat(None)
+    order_states = itertools.cycle(states or [Order.ACCEPTED])
+    with explicit_timestamps(Order):
+        for batch_start in range(0, count, batch_size):
+            batch = []
+            for number in range(batch_start, min(batch_start + batch_size, count)):
+                created = start + timedelta(seconds=number)
+                batch.append(Order(
+                    customer_id=next(customers),
+                    order_state=next(order_states),
+                    created=created,
+                    updated=created
+                ))
+            Order.objects.bulk_create(batch)
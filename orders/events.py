@@ -0,0 +1,178 @@
+import json
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from orders.status import status_version
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'order_state'
+
+
+class OrderEventBroker:
+    """
+    Process local hub of order state changes. It keeps the latest event of the recently changed orders, waiting
+    subscribers sleep on a condition variable and are woken up only by a new event, so idle subscribers don't
+    run any queries
+    """
+
+    def __init__(self, size=None):
+        self._condition = threading.Condition()
+        self._latest = OrderedDict()
+        self._size = size
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """
+        Registers a callable run after every published event, in the thread of the publisher. Used by waiters
+        that can't block a thread, e.g. the event loop of the ASGI application
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def publish(self, event):
+        """
+        Stores the event and wakes up the subscribers
+        :param event: {'id': order id, 'order_state': state, 'version': status version}
+        :type event: dict
+        """
+        with self._condition:
+            current = self._latest.get(event['id'])
+            if current is None or current['version'] < event['version']:
+                self._latest[event['id']] = event
+                self._latest.move_to_end(event['id'])
+                while len(self._latest) > (self._size or settings.ORDER_EVENTS_BUFFER):
+                    self._latest.popitem(last=False)
+            self._condition.notify_all()
+        for callback in list(self._subscribers):
+            callback()
+
+    def pending(self, since):
+        """
+        Events newer than the known versions of the orders
+        :param since: order id -> last version known to the subscriber
+        :type since: dict
+        :rtype: list
+        """
+        with self._condition:
+            return [self._latest[x] for x, version in since.items()
+                    if x in self._latest and self._latest[x]['version'] > version]
+
+    def wait(self, since, timeout):
+        """
+        Waits for events newer than the known versions of the orders
+        :param since: order id -> last version known to the subscriber
+        :type since: dict
+        :param timeout: seconds
+        :type timeout: float
+        :return: new events, an empty list if nothing happened before the timeout
+        :rtype: list
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events = self.pending(since)
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                self._condition.wait(remaining)
+
+
+broker = OrderEventBroker()
+
+
+def state_event(order_id, order_state, updated):
+    return {'id': order_id, 'order_state': order_state, 'version': status_version(updated)}
+
+
+def notify_state(order_id, order_state, updated, using=DEFAULT_DB_ALIAS):
+    """
+    Announces a new state of an order when the current transaction commits. On PostgreSQL the event goes
+    through NOTIFY, so subscribers of every process receive it, other databases only reach the current process
+    """
+    notify_states([state_event(order_id, order_state, updated)], using)
+
+
+def notify_states(events, using=DEFAULT_DB_ALIAS):
+    """
+    Announces many state changes at once, see notify_state
+    :param events: see state_event
+    :type events: list
+    """
+    if not events:
+        return
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        # NOTIFY is delivered on commit and dropped on rollback
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, payload) FROM unnest(%s) AS payload',
+                           [CHANNEL, [json.dumps(x) for x in events]])
+    else:
+        transaction.on_commit(lambda: [broker.publish(x) for x in events], using=using)
+
+
+class PostgresListener(threading.Thread):
+    """
+    Feeds the broker from LISTEN on its own connection, reconnecting after failures
+    """
+    daemon = True
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        super().__init__(name='order-events-listener')
+        self.using = using
+
+    def run(self):
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.exception('Order events listener failed, reconnecting')
+                time.sleep(1)
+
+    def listen(self):
+        wrapper = connections[self.using]
+        params = wrapper.get_connection_params()
+        # Behind PgBouncer in transaction pooling mode the session would be lost after the LISTEN
+        if settings.ORDER_EVENTS_LISTEN_HOST:
+            params['host'] = settings.ORDER_EVENTS_LISTEN_HOST
+        if settings.ORDER_EVENTS_LISTEN_PORT:
+            params['port'] = settings.ORDER_EVENTS_LISTEN_PORT
+        connection = wrapper.get_new_connection(params)
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute('LISTEN {}'.format(CHANNEL))
+            while True:
+                if select.select([connection], [], [], settings.ORDER_EVENTS_HEARTBEAT) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    broker.publish(json.loads(connection.notifies.pop(0).payload))
+        finally:
+            connection.close()
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener():
+    """
+    Starts the LISTEN thread of the process on the first subscription, only PostgreSQL needs it
+    """
+    global _listener
+    if connections[DEFAULT_DB_ALIAS].vendor != 'postgresql' or _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = PostgresListener()
+            _listener.start()
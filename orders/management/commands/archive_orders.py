@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.archive import archive_cutoff, archive_orders
+
+
+class Command(BaseCommand):
+    """
+    Moves Delivered and Canceled orders unchanged for --days to the archive tables, meant to run monthly.
+    Every batch is a separate short transaction, orders locked by other transactions are skipped
+    """
+    help = 'Archives old Delivered and Canceled orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Age of archived orders, ORDERS_ARCHIVE_AFTER_DAYS by default')
+        parser.add_argument('--batch-size', type=int, help='Orders per transaction, ORDERS_ARCHIVE_BATCH_SIZE by default')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days can\'t be negative')
+        before = archive_cutoff(options['days'])
+        self.stdout.write('Archiving orders last changed before {}'.format(before))
+        archived = archive_orders(before, options['batch_size'],
+                                  progress=lambda total: self.stdout.write('{} orders archived'.format(total)))
+        self.stdout.write(self.style.SUCCESS('Archived {} orders'.format(archived)))
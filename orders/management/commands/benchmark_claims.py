@@ -0,0 +1,77 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from customers.models import Customers
+from orders.benchmark import seed_orders
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    """
+    Stress test of the kitchen queue. For every number of workers a fresh set of Accepted orders is seeded and
+    drained by parallel threads calling Order.objects.claim, each claimed batch is 'cooked' for --work-ms.
+    Reports throughput, scaling against one worker and checks no order was claimed twice. The seeded orders
+    belong to a customer created for the benchmark and only they are claimed, the real queue is left alone
+    """
+    help = 'Benchmarks concurrent claiming of the kitchen queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=5000, help='Accepted orders per run')
+        parser.add_argument('--workers', default='1,2,4,8,16,32', help='Comma separated numbers of workers')
+        parser.add_argument('--limit', type=int, default=5, help='Orders per claim')
+        parser.add_argument('--work-ms', type=float, default=20, help='Simulated processing time of a claim')
+
+    def handle(self, *args, **options):
+        if not connection.features.has_select_for_update_skip_locked:
+            raise CommandError('{} has no SELECT ... FOR UPDATE SKIP LOCKED'.format(connection.vendor))
+        try:
+            runs = [int(x) for x in options['workers'].split(',')]
+        except ValueError:
+            raise CommandError('--workers must be a comma separated list of numbers')
+        # A new customer per invocation, orders left behind by an interrupted earlier run are not counted
+        customer = Customers.objects.create(name='Claims benchmark', phone='0', gender=Customers.FEMALE)
+        queue = Order.objects.filter(customer=customer)
+
+        baseline = None
+        for workers in runs:
+            seed_orders(options['orders'], customer_ids=[customer.id])
+            claimed, elapsed = self.drain(queue, workers, options['limit'], options['work_ms'] / 1000)
+            throughput = len(claimed) / elapsed
+            baseline = baseline or throughput
+            self.stdout.write(self.style.MIGRATE_LABEL(
+                '{:>3} workers: {} orders in {:.2f}s - {:.0f} orders/s, x{:.1f}, claimed twice: {}'.format(
+                    workers, len(claimed), elapsed, throughput, throughput / baseline, len(claimed) - len(set(claimed))
+                )
+            ))
+
+    @staticmethod
+    def drain(queue, workers, limit, work):
+        """
+        Runs the workers until the queue is empty
+        :param queue: orders to claim from
+        :return: ids of the claimed orders, elapsed seconds
+        :rtype: tuple
+        """
+        claimed = []
+
+        def worker():
+            try:
+                while True:
+                    orders = queue.claim(limit)
+                    if not orders:
+                        return
+                    claimed.extend(x.id for x in orders)
+                    time.sleep(work)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return claimed, time.perf_counter() - started
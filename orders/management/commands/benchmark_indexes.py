@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.benchmark import measure, summarize
+from customers.models import Customers
+from orders.benchmark import seed_orders
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+# Indexes created by raw SQL in pizzas/migrations/0002_active_indexes.py and
+# orders/migrations/0006_customer_history_index.py
+RAW_SQL_INDEXES = ('pizzas_active_created_idx', 'pizzasizes_active_created_idx', 'order_customer_history_idx')
+
+
+class Command(BaseCommand):
+    """
+    Seeds a large data set and reports query plans and latencies of the hot filter paths with and without
+    the composite and partial indexes. The 'without' run drops the indexes inside a transaction that is
+    rolled back afterwards, so the schema is left untouched
+    """
+    help = 'Benchmarks the hot filter paths with and without their indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1000000, help='Minimal number of orders')
+        parser.add_argument('--customers', type=int, default=10000, help='Minimal number of customers')
+        parser.add_argument('--pizzas', type=int, default=2000, help='Minimal number of pizzas')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Seeding batch size')
+
+    def handle(self, *args, **options):
+        self.seed(options)
+        customer_ids = list(Customers.objects.order_by('id').values_list('id', flat=True))
+        customer_id = customer_ids[len(customer_ids) // 2]
+
+        queries = (
+            ('orders page', Order.objects.order_by('-created', '-id')[:50]),
+            ('orders of a customer', Order.objects.filter(customer_id=customer_id).order_by('-created', '-id')[:50]),
+            ('accepted orders', Order.objects.filter(order_state=Order.ACCEPTED).order_by('-created', '-id')[:50]),
+            ('active pizzas', Pizzas.objects.filter(is_deleted=False).order_by('-created', '-id')[:50]),
+            ('active sizes', PizzaSizes.objects.filter(is_deleted=False).order_by('-created', '-id')[:50]),
+        )
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in self.index_names():
+                    cursor.execute('DROP INDEX {}'.format(name))
+            self.report('Without indexes', queries, options['repeat'])
+            transaction.set_rollback(True)
+        self.report('With indexes', queries, options['repeat'])
+
+    def seed(self, options):
+        """
+        Tops up customers, pizzas and orders to the requested amounts. Every tenth pizza is soft deleted
+        """
+        missing = options['customers'] - Customers.objects.count()
+        if missing > 0:
+            self.stdout.write('Seeding {} customers'.format(missing))
+            Customers.objects.bulk_create(
+                [Customers(name='bench_{}'.format(x), phone=str(x), phone_normalized=str(x), gender=Customers.FEMALE)
+                 for x in range(missing)]
+            )
+
+        missing = options['pizzas'] - Pizzas.objects.count()
+        if missing > 0:
+            self.stdout.write('Seeding {} pizzas'.format(missing))
+            Pizzas.objects.bulk_create(
+                [Pizzas(name='bench_{}'.format(x), is_deleted=not x % 10) for x in range(missing)]
+            )
+
+        missing = options['orders'] - Order.objects.count()
+        if missing > 0:
+            self.stdout.write('Seeding {} orders'.format(missing))
+            customer_ids = list(Customers.objects.values_list('id', flat=True))
+            # Most orders are done, only a small share is waiting in the kitchen
+            states = [Order.DELIVERED] * 17 + [Order.CANCELED, Order.SENT, Order.PROCESSING, Order.ACCEPTED]
+            seed_orders(missing, options['batch_size'], customer_ids, states)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    @staticmethod
+    def index_names():
+        names = list(RAW_SQL_INDEXES)
+        for model in (Order, OrderItem, Customers):
+            names.extend(index.name for index in model._meta.indexes)
+        return names
+
+    def report(self, title, queries, repeat):
+        """
+        Prints the plan and the latency of every query
+        """
+        explain_options = {'analyze': True} if connection.vendor == 'postgresql' else {}
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in queries:
+            self.stdout.write(self.style.MIGRATE_LABEL('{}: {}'.format(
+                name, summarize(measure(lambda: list(queryset.all()), repeat))
+            )))
+            self.stdout.write(queryset.explain(**explain_options))
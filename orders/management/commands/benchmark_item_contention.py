@@ -0,0 +1,84 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.benchmark import summarize
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+class Command(BaseCommand):
+    """
+    Many writers add items to the same group order at once. Compares the previous flow (state check SELECT,
+    then SELECT ... FOR UPDATE of the order and the item INSERT) with OrderItem.add (conditional counter UPDATE
+    and the INSERT). Reports throughput, latencies of single additions and checks the order counters
+    """
+    help = 'Benchmarks concurrent item additions to one order'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=50, help='Concurrent writers')
+        parser.add_argument('--items', type=int, default=40, help='Items added by every writer')
+
+    def handle(self, *args, **options):
+        if not connection.features.has_select_for_update:
+            raise CommandError('{} has no row locks, writers would only wait for the database lock'.format(
+                connection.vendor
+            ))
+        pizza = Pizzas.objects.filter(is_deleted=False).first() or Pizzas.objects.create(name='contention')
+        size = PizzaSizes.objects.filter(is_deleted=False).first() or PizzaSizes.objects.create(
+            sizename=PizzaSizes.LARGE
+        )
+
+        for name, add in (('select_for_update', self.add_locked), ('conditional update', OrderItem.add)):
+            order = Order.objects.create()
+            fields = {'order_id': order.id, 'pizza_name': pizza, 'pizza_size': size, 'number_of_pizzas': 1}
+            samples, elapsed = self.run(add, fields, options['writers'], options['items'])
+            order.refresh_from_db()
+            self.stdout.write(self.style.MIGRATE_LABEL('{}: {} items in {:.2f}s - {:.0f} items/s'.format(
+                name, len(samples), elapsed, len(samples) / elapsed
+            )))
+            self.stdout.write('  per item: {}'.format(summarize(samples)))
+            self.stdout.write('  counters {}/{}, items {}'.format(
+                order.total_pizzas, order.active_items, order.items.count()
+            ))
+
+    @staticmethod
+    def add_locked(**fields):
+        """
+        Item creation as done before OrderItem.add
+        """
+        Order.objects.get(pk=fields['order_id'], order_state__in=Order.OPEN_STATES)
+        with transaction.atomic():
+            Order.objects.select_for_update().get(pk=fields['order_id'])
+            return OrderItem.objects.create(**fields)
+
+    @staticmethod
+    def run(add, fields, writers, items):
+        """
+        Starts the writers together and waits for them
+        :return: durations of single additions in milliseconds, elapsed seconds
+        :rtype: tuple
+        """
+        samples = []
+        barrier = threading.Barrier(writers + 1)
+
+        def writer():
+            try:
+                barrier.wait()
+                for _ in range(items):
+                    started = time.perf_counter()
+                    add(**fields)
+                    samples.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return samples, time.perf_counter() - started
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.pagination import Cursor
+from rest_framework.test import APIRequestFactory
+
+from core.benchmark import measure, summarize
+from core.pagination import CreatedCursorPagination
+from orders.benchmark import seed_orders
+from orders.models import Order
+from orders.views import OrderViewSet
+
+
+class Command(BaseCommand):
+    """
+    Measures the latency of GET /api/orders/ at increasing page depths. Keyset pagination should give the same
+    latency for the first and the last page, the OFFSET query is measured next to it for comparison
+    """
+    help = 'Benchmarks orders list pagination from page 1 to page N'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=10000, help='Deepest page to measure')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20, help='Requests per measured page')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Seeding batch size')
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        self.seed(options['pages'] * page_size, options['batch_size'])
+
+        view = OrderViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+        paginator = CreatedCursorPagination()
+
+        page = 1
+        while page <= options['pages']:
+            offset = (page - 1) * page_size
+            position = None
+            if offset:
+                position = Order.objects.order_by('-created', '-id').values_list('created', flat=True)[offset - 1]
+            cursor_url = self.page_url(paginator, factory, host, position, page_size)
+
+            def keyset_page():
+                response = view(factory.get(cursor_url, HTTP_HOST=host))
+                response.render()
+
+            def offset_page():
+                list(Order.objects.order_by('-created', '-id')[offset:offset + page_size])
+
+            self.stdout.write('page {:>6}  keyset: {}'.format(page, summarize(measure(keyset_page, options['repeat']))))
+            self.stdout.write('             offset: {}'.format(summarize(measure(offset_page, options['repeat']))))
+            page *= 10
+
+    def seed(self, total, batch_size):
+        """
+        Adds orders until the table holds at least total rows
+        """
+        missing = total - Order.objects.count()
+        if missing > 0:
+            self.stdout.write('Seeding {} orders'.format(missing))
+            seed_orders(missing, batch_size)
+
+    @staticmethod
+    def page_url(paginator, factory, host, position, page_size):
+        """
+        Builds the orders list URL pointing straight at the page that starts after position
+        """
+        request = factory.get('/api/orders/', {'page_size': page_size}, HTTP_HOST=host)
+        paginator.base_url = request.build_absolute_uri()
+        if position is None:
+            return paginator.base_url
+        return paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(position)))
@@ -0,0 +1,91 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmark import measure, summarize
+from orders.benchmark import seed_orders
+from orders.models import Order, OrderStateTransition
+
+
+# The happy path of an order, every step is one transition
+LIFECYCLE = (Order.ACCEPTED, Order.PROCESSING, Order.SENT, Order.DELIVERED)
+
+
+class Command(BaseCommand):
+    """
+    Measures ingestion of order state transitions, one by one through Order.save (order UPDATE and log INSERT
+    in one transaction) and in bulk, then the latency of the hourly Accepted to Delivered report over the
+    ingested log
+    """
+    help = 'Benchmarks ingestion and reporting of order state transitions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--saves', type=int, default=2000, help='State changes made through Order.save')
+        parser.add_argument('--transitions', type=int, default=1000000, help='Transitions inserted in bulk')
+        parser.add_argument('--days', type=int, default=30, help='Time span of the bulk inserted transitions')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs of the report query')
+
+    def handle(self, *args, **options):
+        self.ingest_saves(options['saves'])
+        self.ingest_bulk(options['transitions'], options['days'], options['batch_size'])
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE orders_orderstatetransition')
+        end = timezone.now()
+        report = OrderStateTransition.objects.delivery_times(end - timedelta(days=1), end)
+        explain_options = {'analyze': True} if connection.vendor == 'postgresql' else {}
+        self.stdout.write(self.style.MIGRATE_LABEL('Accepted to Delivered per hour, last day: {}'.format(
+            summarize(measure(lambda: list(report.all()), options['repeat']))
+        )))
+        self.stdout.write(report.explain(**explain_options))
+
+    def ingest_saves(self, count):
+        orders = count // (len(LIFECYCLE) - 1)
+        if not orders:
+            return
+        seed_orders(orders)
+        order_ids = Order.objects.order_by('-id').values_list('id', flat=True)[:orders]
+        started = time.perf_counter()
+        for order in Order.objects.filter(id__in=list(order_ids)):
+            for state in LIFECYCLE[1:]:
+                order.order_state = state
+                order.save()
+        self.report('Order.save', orders * (len(LIFECYCLE) - 1), started)
+
+    def ingest_bulk(self, count, days, batch_size):
+        """
+        Inserts whole lifecycles of fictional orders, the log has no foreign key to check. Deliveries take
+        15 to 90 minutes
+        """
+        order_ids = itertools.count(-1, -1)
+        end = timezone.now()
+        span = timedelta(days=days).total_seconds()
+        started = time.perf_counter()
+        inserted = 0
+        while inserted < count:
+            batch = []
+            while len(batch) < min(batch_size, count - inserted):
+                order_id = next(order_ids)
+                order_created = end - timedelta(seconds=random.uniform(0, span))
+                changed = order_created
+                for from_state, to_state in zip((None,) + LIFECYCLE, LIFECYCLE):
+                    if from_state is not None:
+                        changed += timedelta(minutes=random.uniform(5, 30))
+                    batch.append(OrderStateTransition(order_id=order_id, from_state=from_state, to_state=to_state,
+                                                      order_created=order_created, created=changed))
+            OrderStateTransition.objects.bulk_create(batch)
+            inserted += len(batch)
+        self.report('bulk_create', inserted, started)
+
+    def report(self, method, count, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.MIGRATE_LABEL('{}: {} transitions in {:.2f}s - {:.0f} transitions/s'.format(
+            method, count, elapsed, count / elapsed if elapsed else 0
+        )))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.export import EXPORT_FORMATS, export_rows, filter_created
+from customers.views import CustomersViewSet
+from orders.views import OrderViewSet, ItemsViewSet
+
+
+EXPORTS = {
+    'orders': OrderViewSet,
+    'items': ItemsViewSet,
+    'customers': CustomersViewSet,
+}
+
+
+class Command(BaseCommand):
+    """
+    Streams orders, items or customers to a file or stdout with the same columns as the API export routes
+    """
+    help = 'Exports orders, items or customers as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(EXPORTS))
+        parser.add_argument('--output', choices=sorted(EXPORT_FORMATS), default='csv', help='Output format')
+        parser.add_argument('--created-from', help='First date or datetime to export, inclusive')
+        parser.add_argument('--created-to', help='Last date or datetime to export, exclusive for datetimes')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched from the database at once')
+        parser.add_argument('--file', help='Output file, stdout by default')
+
+    def handle(self, *args, **options):
+        viewset = EXPORTS[options['model']]
+        try:
+            queryset = filter_created(viewset.queryset.all(), options['created_from'], options['created_to'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        chunks = export_rows(
+            queryset.order_by('created', 'id'), viewset.export_fields, options['output'], options['chunk_size']
+        )
+        if not options['file']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['file'], 'w', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    """
+    Recalculates total_pizzas and active_items of every order from its items. Orders are processed in id
+    ranges, every range is a single short UPDATE, so the table is never locked as a whole
+    """
+    help = 'Rebuilds the denormalized item counters of orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help='Orders per UPDATE')
+
+    def handle(self, *args, **options):
+        bounds = Order.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write('There are no orders')
+            return
+
+        batch_size = options['batch_size']
+        updated = 0
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            updated += Order.objects.filter(id__gte=start, id__lt=start + batch_size).rebuild_counters()
+            self.stdout.write('Orders up to id {}: {} rebuilt'.format(start + batch_size - 1, updated))
+        self.stdout.write(self.style.SUCCESS('Rebuilt counters of {} orders'.format(updated)))
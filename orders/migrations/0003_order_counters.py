@@ -0,0 +1,45 @@
+# Generated by Django 2.1.4 on 2026-10-18 01:56
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    """
+    Calculates the counters of the existing orders, see OrderQuerySet.rebuild_counters
+    """
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    active_items = OrderItem.objects.filter(order=OuterRef('pk'), is_active=True).order_by().values('order')
+    Order.objects.update(
+        total_pizzas=Coalesce(Subquery(
+            active_items.annotate(total=Sum('number_of_pizzas')).values('total'),
+            output_field=IntegerField()
+        ), 0),
+        active_items=Coalesce(Subquery(
+            active_items.annotate(total=Count('id')).values('total'),
+            output_field=IntegerField()
+        ), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='active_items',
+            field=models.PositiveIntegerField(default=0, verbose_name='Number of active items'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_pizzas',
+            field=models.PositiveIntegerField(default=0, verbose_name='Total number of pizzas'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 2.1.4 on 2026-10-18 02:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_brin_index(apps, schema_editor):
+    """
+    The log is appended in time order, a BRIN index on 'created' stays tiny and lets time range scans skip
+    whole blocks. Only PostgreSQL has BRIN
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX transition_created_brin ON orders_orderstatetransition USING brin (created)'
+        )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX transition_created_brin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStateTransition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_state', models.CharField(choices=[('C', 'Canceled'), ('A', 'Accepted'), ('P', 'Processing'), ('S', 'Sent'), ('D', 'Delivered')], max_length=1, null=True, verbose_name='From state')),
+                ('to_state', models.CharField(choices=[('C', 'Canceled'), ('A', 'Accepted'), ('P', 'Processing'), ('S', 'Sent'), ('D', 'Delivered')], max_length=1, verbose_name='To state')),
+                ('order_created', models.DateTimeField(verbose_name='Order created')),
+                ('created', models.DateTimeField(verbose_name='Changed')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='order_state',
+            field=models.CharField(choices=[('C', 'Canceled'), ('A', 'Accepted'), ('P', 'Processing'), ('S', 'Sent'), ('D', 'Delivered')], default='A', max_length=1, verbose_name='Order status'),
+        ),
+        migrations.AddField(
+            model_name='orderstatetransition',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='transitions', to='orders.Order'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatetransition',
+            index=models.Index(fields=['to_state', 'created'], name='transition_state_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatetransition',
+            index=models.Index(fields=['order', 'created'], name='transition_order_created_idx'),
+        ),
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 2.1.4 on 2026-10-18 02:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_customer_search'),
+        ('pizzas', '0002_active_indexes'),
+        ('orders', '0006_customer_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('order_state', models.CharField(choices=[('C', 'Canceled'), ('A', 'Accepted'), ('P', 'Processing'), ('S', 'Sent'), ('D', 'Delivered')], max_length=1, verbose_name='Order status')),
+                ('total_pizzas', models.PositiveIntegerField(verbose_name='Total number of pizzas')),
+                ('active_items', models.PositiveIntegerField(verbose_name='Number of active items')),
+                ('created', models.DateTimeField()),
+                ('updated', models.DateTimeField()),
+                ('archived', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to='customers.Customers')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('number_of_pizzas', models.SmallIntegerField(verbose_name='Number of pizzas')),
+                ('is_active', models.BooleanField(verbose_name='Is active')),
+                ('created', models.DateTimeField()),
+                ('updated', models.DateTimeField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.ArchivedOrder')),
+                ('pizza_name', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='pizzas.Pizzas')),
+                ('pizza_size', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='pizzas.PizzaSizes')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedorderitem',
+            index=models.Index(fields=['created'], name='archiveditem_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['-created', '-id'], name='archived_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['customer', '-created', '-id'], name='archived_customer_created_idx'),
+        ),
+    ]
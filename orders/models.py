@@ -1,12 +1,77 @@
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import QuerySet, Avg, Count, DurationField, ExpressionWrapper, F, IntegerField, OuterRef, \
+                             Subquery, Sum
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
 from core.models import TimeStampedModel
 from customers.models import Customers
 from pizzas.models import Pizzas, PizzaSizes
+from orders.status import publish_status, forget_status
+from orders.events import notify_state, notify_states, state_event
+
+
+class OrderQuerySet(QuerySet):
+    """
+    Order's QuerySet object with maintenance of the denormalized item counters and the kitchen queue
+    """
+    def claim(self, limit):
+        """
+        Moves up to limit oldest Accepted orders of the queryset to Processing and returns them. Rows are locked
+        with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent callers get disjoint orders without waiting for
+        each other. Databases without row locks fall back to UPDATEs conditional on the Accepted state
+        :param limit: maximum number of orders
+        :type limit: int
+        :return: claimed orders, oldest first
+        :rtype: list
+        """
+        using = self._db or router.db_for_write(self.model)
+        queryset = self.using(using)
+        with transaction.atomic(using=using):
+            orders = list(queryset.select_for_update(skip_locked=True).filter(
+                order_state=Order.ACCEPTED
+            ).order_by('created', 'id')[:limit])
+            now = timezone.now()
+            changes = {'order_state': Order.PROCESSING, 'updated': now}
+            if connections[using].features.has_select_for_update_skip_locked:
+                queryset.filter(id__in=[x.id for x in orders]).update(**changes)
+            else:
+                orders = [x for x in orders if queryset.filter(pk=x.pk, order_state=Order.ACCEPTED).update(**changes)]
+
+            for order in orders:
+                order.order_state = order._loaded_state = Order.PROCESSING
+                order.updated = now
+                publish_status(order.id, order.order_state, order.updated)
+            OrderStateTransition.objects.using(using).bulk_create(
+                [OrderStateTransition.for_order(x, Order.ACCEPTED) for x in orders]
+            )
+            notify_states([state_event(x.id, x.order_state, x.updated) for x in orders], using=using)
+        return orders
+
+    def rebuild_counters(self):
+        """
+        Recalculates total_pizzas and active_items of all orders of the queryset from their items
+        with one UPDATE
+        :return: number of updated orders
+        :rtype: int
+        """
+        active_items = OrderItem.objects.filter(order=OuterRef('pk'), is_active=True).order_by().values('order')
+        return self.update(
+            total_pizzas=Coalesce(Subquery(
+                active_items.annotate(total=Sum('number_of_pizzas')).values('total'),
+                output_field=IntegerField()
+            ), 0),
+            active_items=Coalesce(Subquery(
+                active_items.annotate(total=Count('id')).values('total'),
+                output_field=IntegerField()
+            ), 0),
+        )
 
 
 class Order(TimeStampedModel):
     """
-    An order class
+    An order class. total_pizzas and active_items summarize the active items of the order, they are kept up to
+    date by OrderItem and can be rebuilt with the rebuild_order_counters command. Every change of order_state
+    is recorded in OrderStateTransition in the transaction of the save
     """
     CANCELED = 'C'
     ACCEPTED = 'A'
@@ -21,16 +86,97 @@ class Order(TimeStampedModel):
         (SENT, 'Sent'),
         (DELIVERED, 'Delivered'),
     )
-    customer = models.ForeignKey(Customers, related_name='customer', on_delete=models.SET_NULL, null=True)
-    order_state = models.CharField('Order status', max_length=1, null=False, default='A')
+    # Orders in these states accept new items
+    OPEN_STATES = (ACCEPTED, PROCESSING)
+    # Allowed state changes. Sent and Delivered orders can be taken back to an earlier state, Canceled is final
+    TRANSITIONS = {
+        ACCEPTED: (PROCESSING, SENT, CANCELED),
+        PROCESSING: (ACCEPTED, SENT, CANCELED),
+        SENT: (ACCEPTED, PROCESSING, DELIVERED, CANCELED),
+        DELIVERED: (ACCEPTED, PROCESSING, CANCELED),
+        CANCELED: (),
+    }
+    # Indexed by order_customer_history_idx, see migration 0006
+    customer = models.ForeignKey(Customers, related_name='customer', on_delete=models.SET_NULL, null=True,
+                                 db_index=False)
+    order_state = models.CharField('Order status', max_length=1, null=False, default='A', choices=STATES_CHOICES)
+    total_pizzas = models.PositiveIntegerField('Total number of pizzas', default=0)
+    active_items = models.PositiveIntegerField('Number of active items', default=0)
+
+    objects = OrderQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'order_state' in field_names:
+            instance._loaded_state = values[field_names.index('order_state')]
+        if 'customer_id' in field_names:
+            instance._loaded_customer = values[field_names.index('customer_id')]
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        if fields is None or 'order_state' in fields:
+            self._loaded_state = self.order_state
+        if fields is None or 'customer' in fields or 'customer_id' in fields:
+            self._loaded_customer = self.customer_id
+
+    @classmethod
+    def can_change_state(cls, from_state, to_state):
+        """
+        Checks the state machine allows the change, staying in the same state is always allowed
+        :rtype: bool
+        """
+        return from_state == to_state or to_state in cls.TRANSITIONS.get(from_state, ())
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        loaded_state = getattr(self, '_loaded_state', None)
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(Order, instance=self)):
+            super().save(*args, **kwargs)
+            if adding or self.order_state != loaded_state:
+                OrderStateTransition.for_order(self, None if adding else loaded_state).save(using=self._state.db)
+                notify_state(self.id, self.order_state, self.updated, using=self._state.db)
+            publish_status(self.id, self.order_state, self.updated)
+        self._loaded_state = self.order_state
+        self._loaded_customer = self.customer_id
+
+    def delete(self, *args, **kwargs):
+        order_id = self.id
+        result = super().delete(*args, **kwargs)
+        forget_status(order_id)
+        return result
 
     class Meta:
         ordering = ['-created']
+        # 'id' follows 'created' in every index to match the keyset pagination ordering. The covering
+        # (customer, -created, -id) index is created by raw SQL in migration 0006
+        indexes = [
+            models.Index(fields=['-created', '-id'], name='order_created_idx'),
+            models.Index(fields=['order_state', '-created', '-id'], name='order_state_created_idx'),
+            # Changes picked up by the analytics refresh
+            models.Index(fields=['updated'], name='order_updated_idx'),
+        ]
+
+
+def apply_counter_deltas(deltas):
+    """
+    Adds the deltas to the denormalized counters of the orders. F() expressions keep concurrent changes
+    of different items of the same order consistent
+    :param deltas: order id -> (total_pizzas delta, active_items delta)
+    :type deltas: dict
+    """
+    for order_id, (pizzas, items) in deltas.items():
+        if pizzas or items:
+            Order.objects.filter(pk=order_id).update(
+                total_pizzas=F('total_pizzas') + pizzas,
+                active_items=F('active_items') + items
+            )
 
 
 class OrderItem(TimeStampedModel):
     """
-    An item from an order
+    An item from an order. Saving and deleting an item updates the counters of its order incrementally
     """
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE, null=False)
     pizza_name = models.ForeignKey(Pizzas, on_delete=models.SET_NULL, null=True)
@@ -38,5 +184,202 @@ class OrderItem(TimeStampedModel):
     number_of_pizzas = models.SmallIntegerField('Number of pizzas', null=False)
     is_active = models.BooleanField('Is active', default=True)
 
+    COUNTED_FIELDS = ('order_id', 'number_of_pizzas', 'is_active')
+
+    @classmethod
+    def add(cls, **fields):
+        """
+        Adds an active item to an open order. The counter UPDATE of the order is conditional on its state, so
+        one statement checks the state and locks the order row, the lock is held only until the item INSERT
+        commits. No SELECT ... FOR UPDATE is needed
+        :param fields: item fields, 'order_id' is required
+        :raise Order.DoesNotExist: if there is no such order in one of Order.OPEN_STATES
+        :rtype: OrderItem
+        """
+        item = cls(**fields)
+        with transaction.atomic(using=router.db_for_write(cls, instance=item)):
+            changed = Order.objects.filter(pk=item.order_id, order_state__in=Order.OPEN_STATES).update(
+                total_pizzas=F('total_pizzas') + item.number_of_pizzas,
+                active_items=F('active_items') + 1
+            )
+            if not changed:
+                raise Order.DoesNotExist('Order {} is not open'.format(item.order_id))
+            # The counters are already updated, skip OrderItem.save
+            models.Model.save(item, force_insert=True)
+            item._counted = item.counters(item.order_id, item.number_of_pizzas, item.is_active)
+        return item
+
+    @staticmethod
+    def counters(order_id, number_of_pizzas, is_active):
+        """
+        Contribution of an item to the counters of its order
+        :return: order id, number of pizzas, number of items
+        :rtype: tuple
+        """
+        return (order_id, number_of_pizzas, 1) if is_active else (order_id, 0, 0)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            adding = self._state.adding
+            if not adding:
+                # The previous contribution is read from the locked row, the loaded values may be stale
+                self._counted = self._locked_counters()
+            super().save(*args, **kwargs)
+            self._move_counters(None if adding else self._counted, self.counters(
+                self.order_id, self.number_of_pizzas, self.is_active
+            ))
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            counted = self._locked_counters()
+            result = super().delete(*args, **kwargs)
+            self._move_counters(counted, None)
+        return result
+
+    def _locked_counters(self):
+        """
+        Locks the row of the item with SELECT ... FOR UPDATE, so concurrent changes of the item apply their
+        counter deltas one after the other
+        :return: the current contribution of the item to the counters, None if it isn't stored
+        :rtype: tuple
+        """
+        row = OrderItem.objects.select_for_update().filter(pk=self.pk).values_list(*self.COUNTED_FIELDS).first()
+        return self.counters(*row) if row else None
+
+    def _move_counters(self, before, after):
+        deltas = {}
+        for counted, sign in ((before, -1), (after, 1)):
+            if counted:
+                order_id, pizzas, items = counted
+                delta = deltas.get(order_id, (0, 0))
+                deltas[order_id] = (delta[0] + sign * pizzas, delta[1] + sign * items)
+        apply_counter_deltas(deltas)
+        self._counted = after
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['-created', '-id'], name='orderitem_created_idx'),
+            models.Index(fields=['order', '-created', '-id'], name='orderitem_order_created_idx'),
+            models.Index(fields=['updated'], name='orderitem_updated_idx'),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """
+    A Delivered or Canceled order moved out of Order by orders.archive. The id, timestamps and counters are
+    copied unchanged, archived orders are read only
+    """
+    id = models.IntegerField(primary_key=True)
+    # Indexed by archived_customer_created_idx
+    customer = models.ForeignKey(Customers, related_name='archived_orders', on_delete=models.SET_NULL, null=True,
+                                 db_index=False)
+    order_state = models.CharField('Order status', max_length=1, choices=Order.STATES_CHOICES)
+    total_pizzas = models.PositiveIntegerField('Total number of pizzas')
+    active_items = models.PositiveIntegerField('Number of active items')
+    created = models.DateTimeField()
+    updated = models.DateTimeField()
+    archived = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def from_order(cls, order):
+        """
+        :type order: Order
+        :rtype: ArchivedOrder
+        """
+        return cls(id=order.id, customer_id=order.customer_id, order_state=order.order_state,
+                   total_pizzas=order.total_pizzas, active_items=order.active_items,
+                   created=order.created, updated=order.updated)
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['-created', '-id'], name='archived_created_idx'),
+            models.Index(fields=['customer', '-created', '-id'], name='archived_customer_created_idx'),
+        ]
+
+
+class ArchivedOrderItem(models.Model):
+    """
+    An item of an archived order
+    """
+    id = models.IntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, related_name='items', on_delete=models.CASCADE)
+    pizza_name = models.ForeignKey(Pizzas, on_delete=models.SET_NULL, null=True)
+    pizza_size = models.ForeignKey(PizzaSizes, on_delete=models.SET_NULL, null=True)
+    number_of_pizzas = models.SmallIntegerField('Number of pizzas')
+    is_active = models.BooleanField('Is active')
+    created = models.DateTimeField()
+    updated = models.DateTimeField()
+
+    @classmethod
+    def from_item(cls, item):
+        """
+        :type item: OrderItem
+        :rtype: ArchivedOrderItem
+        """
+        return cls(id=item.id, order_id=item.order_id, pizza_name_id=item.pizza_name_id,
+                   pizza_size_id=item.pizza_size_id, number_of_pizzas=item.number_of_pizzas,
+                   is_active=item.is_active, created=item.created, updated=item.updated)
+
     class Meta:
         ordering = ['-created']
+        indexes = [
+            # Hours rebuilt by the analytics
+            models.Index(fields=['created'], name='archiveditem_created_idx'),
+        ]
+
+
+class OrderStateTransitionQuerySet(QuerySet):
+
+    def delivery_times(self, start, end):
+        """
+        Average time from acceptance (order creation) to delivery of the orders delivered in [start, end),
+        per hour of delivery. Reads the transition log only
+        :return: dicts with 'hour', 'orders' and 'average' (timedelta), oldest hour first
+        :rtype: QuerySet
+        """
+        return self.filter(
+            to_state=Order.DELIVERED, created__gte=start, created__lt=end
+        ).annotate(
+            hour=Trunc('created', 'hour')
+        ).values('hour').annotate(
+            orders=Count('id'),
+            average=Avg(ExpressionWrapper(F('created') - F('order_created'), output_field=DurationField()))
+        ).order_by('hour')
+
+
+class OrderStateTransition(models.Model):
+    """
+    Append-only log of order state changes. from_state is empty for a new order. order_created is copied from
+    the order, so durations are calculated from the log alone. There is no foreign key constraint, the log
+    outlives deleted orders
+    """
+    order = models.ForeignKey(Order, related_name='transitions', on_delete=models.DO_NOTHING, db_constraint=False,
+                              db_index=False)
+    from_state = models.CharField('From state', max_length=1, null=True, choices=Order.STATES_CHOICES)
+    to_state = models.CharField('To state', max_length=1, choices=Order.STATES_CHOICES)
+    order_created = models.DateTimeField('Order created')
+    created = models.DateTimeField('Changed')
+
+    objects = OrderStateTransitionQuerySet.as_manager()
+
+    @classmethod
+    def for_order(cls, order, from_state):
+        """
+        Transition to the current state of a saved order, timed by its 'updated'
+        :param order: saved order
+        :type order: Order
+        :param from_state: previous state, None for a new order
+        :type from_state: str
+        :rtype: OrderStateTransition
+        """
+        return cls(order_id=order.id, from_state=from_state, to_state=order.order_state,
+                   order_created=order.created, created=order.updated)
+
+    class Meta:
+        # PostgreSQL also gets a BRIN index on 'created', see migration 0004
+        indexes = [
+            models.Index(fields=['to_state', 'created'], name='transition_state_created_idx'),
+            models.Index(fields=['order', 'created'], name='transition_order_created_idx'),
+        ]
@@ -1,16 +1,92 @@
-from .models import Order, OrderItem
+from django.conf import settings
+from django.db import connection, transaction
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStateTransition
+from core.serializers import ExpandableFieldsMixin, SelectableFieldsMixin
+from customers.models import Customers
+from customers.serializers import CustomerSerializer
+from pizzas.catalog import menu_catalog
 from pizzas.models import Pizzas, PizzaSizes
-from rest_framework.serializers import ModelSerializer, PrimaryKeyRelatedField, ValidationError
+from pizzas.serializers import MenuCatalogRelatedField
+from rest_framework.settings import api_settings
+from rest_framework.serializers import ModelSerializer, ListSerializer, PrimaryKeyRelatedField, IntegerField, \
+                                       Serializer, ValidationError
 
 
-class OrderSerializer(ModelSerializer):
+class ItemSerializer(SelectableFieldsMixin, ModelSerializer):
     """
-    A general serializer for Orders model
+    A general Item model serializer
     """
     class Meta:
-        model = Order
-        fields = ('id', 'customer', 'items', 'created', 'updated', 'order_state')
+        model = OrderItem
+        fields = ('id', 'order', 'pizza_name', 'pizza_size', 'number_of_pizzas')
         read_only_fields = ('id', )
+        extra_kwargs = {'number_of_pizzas': {'min_value': 1}}
+
+
+class OrderSerializer(SelectableFieldsMixin, ExpandableFieldsMixin, ModelSerializer):
+    """
+    A general serializer for Orders model. 'items' and 'customer' can be expanded to nested objects
+    """
+    expandable_fields = {
+        'items': (ItemSerializer, {'many': True}),
+        'customer': (CustomerSerializer, {}),
+    }
+
+    class Meta:
+        model = Order
+        fields = ('id', 'customer', 'items', 'created', 'updated', 'order_state', 'total_pizzas', 'active_items')
+        read_only_fields = ('id', 'total_pizzas', 'active_items')
+
+
+class OrderItemSummarySerializer(ModelSerializer):
+    """
+    A short item representation embedded in the order history of a customer
+    """
+    class Meta:
+        model = OrderItem
+        fields = ('id', 'pizza_name', 'pizza_size', 'number_of_pizzas', 'is_active')
+
+
+class CustomerOrderSerializer(ModelSerializer):
+    """
+    An order of the customer history with summaries of its items
+    """
+    items = OrderItemSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ('id', 'created', 'updated', 'order_state', 'total_pizzas', 'active_items', 'items')
+
+
+class ArchivedOrderItemSerializer(ModelSerializer):
+    """
+    An item of an archived order
+    """
+    class Meta:
+        model = ArchivedOrderItem
+        fields = ('id', 'pizza_name', 'pizza_size', 'number_of_pizzas', 'is_active')
+
+
+class CustomerArchivedOrderSerializer(CustomerOrderSerializer):
+    """
+    An archived order of the customer history
+    """
+    items = ArchivedOrderItemSerializer(many=True, read_only=True)
+
+    class Meta(CustomerOrderSerializer.Meta):
+        model = ArchivedOrder
+
+
+class ArchivedOrderSerializer(SelectableFieldsMixin, ModelSerializer):
+    """
+    An archived order with its items
+    """
+    items = ArchivedOrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedOrder
+        fields = ('id', 'customer', 'created', 'updated', 'archived', 'order_state', 'total_pizzas', 'active_items',
+                  'items')
 
 
 class OrderCreateSerializer(ModelSerializer):
@@ -28,16 +104,122 @@ class OrderCreateSerializer(ModelSerializer):
         read_only_fields = ('id', )
 
 
+class OrderBulkItemSerializer(ModelSerializer):
+    """
+    An item of the bulk order creation. References are plain ids, they are checked for the whole batch at once
+    by OrderBulkListSerializer
+    """
+    pizza_name = IntegerField()
+    pizza_size = IntegerField()
+
+    class Meta:
+        model = OrderItem
+        fields = ('pizza_name', 'pizza_size', 'number_of_pizzas')
+        extra_kwargs = {'number_of_pizzas': {'min_value': 1}}
+
+
+class OrderBulkListSerializer(ListSerializer):
+    """
+    Validates and creates a batch of orders with their items. Customers are checked with a single query,
+    pizzas and sizes against the menu catalog. Everything is written in one transaction
+    """
+    def to_internal_value(self, data):
+        # Checked before the orders are validated one by one, an oversized request costs nothing more
+        max_orders = settings.ORDERS_BULK_CREATE_MAX_ORDERS
+        if isinstance(data, list) and len(data) > max_orders:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Too many orders in one request, the limit is {}'.format(max_orders)
+            ]})
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        customer_ids = {x['customer'] for x in attrs}
+        references = (
+            ('customer', customer_ids, set(Customers.objects.filter(id__in=customer_ids).values_list('id', flat=True))),
+            ('pizza_name', {item['pizza_name'] for x in attrs for item in x['items']}, menu_catalog.ids('pizzas')),
+            ('pizza_size', {item['pizza_size'] for x in attrs for item in x['items']}, menu_catalog.ids('sizes')),
+        )
+        errors = {}
+        for name, ids, existing in references:
+            missing = ids - existing
+            if missing:
+                errors[name] = 'Invalid pk "{}" - object does not exist.'.format(
+                    '", "'.join(str(x) for x in sorted(missing))
+                )
+        if errors:
+            raise ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            # Items are inserted with bulk_create which bypasses OrderItem.save, so the counters are set upfront
+            orders = [
+                Order(
+                    customer_id=x['customer'],
+                    total_pizzas=sum(item['number_of_pizzas'] for item in x['items']),
+                    active_items=len(x['items'])
+                )
+                for x in validated_data
+            ]
+            if connection.features.can_return_ids_from_bulk_insert:
+                Order.objects.bulk_create(orders)
+                # bulk_create bypasses Order.save, which logs the initial state otherwise
+                OrderStateTransition.objects.bulk_create([OrderStateTransition.for_order(x, None) for x in orders])
+            else:
+                for order in orders:
+                    order.save()
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    pizza_name_id=item['pizza_name'],
+                    pizza_size_id=item['pizza_size'],
+                    number_of_pizzas=item['number_of_pizzas']
+                )
+                for order, data in zip(orders, validated_data) for item in data['items']
+            ])
+        return orders
+
+
+class OrderBulkCreateSerializer(ModelSerializer):
+    """
+    A serializer for an order created together with all its items. Always used with many=True
+    """
+    customer = IntegerField()
+    items = OrderBulkItemSerializer(many=True)
+
+    class Meta:
+        model = Order
+        fields = ('id', 'customer', 'items')
+        read_only_fields = ('id', )
+        list_serializer_class = OrderBulkListSerializer
+
+
+class OrderClaimSerializer(Serializer):
+    """
+    Parameters of the kitchen queue claim
+    """
+    limit = IntegerField(min_value=1, max_value=settings.ORDERS_CLAIM_MAX_ORDERS, default=1)
+
+
 class OrderUpdateSerializer(ModelSerializer):
     """
-    A special serializer for order update process. Order can't be updated if it is in states Delivered or Sent
+    A special serializer for order update process. Order can't be updated if it is in states Delivered or Sent,
+    its state can only be changed along Order.TRANSITIONS. Both are checked against the locked order row
     """
     def update(self, instance, validated_data):
-        if validated_data.get('customer') and instance.order_state in (Order.DELIVERED, Order.SENT):
-            raise ValidationError('Order can\'t be change already. It is in state: {}'.format(instance.order_state))
-        instance.customer = validated_data.get('customer', instance.customer)
-        instance.order_state = validated_data.get('order_state', instance.order_state)
-        instance.save()
+        with transaction.atomic():
+            current_state = Order.objects.select_for_update().values_list('order_state', flat=True).get(pk=instance.pk)
+            if validated_data.get('customer') and current_state in (Order.DELIVERED, Order.SENT):
+                raise ValidationError('Order can\'t be change already. It is in state: {}'.format(current_state))
+            order_state = validated_data.get('order_state', current_state)
+            if not Order.can_change_state(current_state, order_state):
+                raise ValidationError({'order_state': 'Order can\'t go from state {} to {}'.format(
+                    current_state, order_state
+                )})
+            instance._loaded_state = current_state
+            instance.customer = validated_data.get('customer', instance.customer)
+            instance.order_state = order_state
+            instance.save()
         return instance
 
     class Meta:
@@ -46,7 +228,7 @@ class OrderUpdateSerializer(ModelSerializer):
         read_only_fields = ('id', )
 
 
-class OrderItemSerializer(ModelSerializer):
+class OrderItemSerializer(SelectableFieldsMixin, ModelSerializer):
     """
     A general Item model serializer
     """
@@ -54,30 +236,31 @@ class OrderItemSerializer(ModelSerializer):
         model = OrderItem
         fields = ('id', 'order', 'pizza_name', 'pizza_size', 'number_of_pizzas', 'is_active', 'created', 'updated')
         read_only_fields = ('id', )
+        extra_kwargs = {'number_of_pizzas': {'min_value': 1}}
 
 
 class OrderItemCreateSerializer(ModelSerializer):
     """
-    A special Item serializer for creation process. Order can only be in states Accepted or Processing
+    A special Item serializer for creation process. Order can only be in states Accepted or Processing, the state
+    is checked by OrderItem.add in the same statement that locks the order
     """
-    pizza_name = PrimaryKeyRelatedField(queryset=Pizzas.objects.filter(is_deleted=False))
-    pizza_size = PrimaryKeyRelatedField(queryset=PizzaSizes.objects.filter(is_deleted=False))
-    order = PrimaryKeyRelatedField(queryset=Order.objects.filter(order_state__in=["A", "P"]))
+    pizza_name = MenuCatalogRelatedField('pizzas', queryset=Pizzas.objects.filter(is_deleted=False))
+    pizza_size = MenuCatalogRelatedField('sizes', queryset=PizzaSizes.objects.filter(is_deleted=False))
+    order = IntegerField(source='order_id')
 
-    class Meta:
-        model = OrderItem
-        fields = ('id', 'order', 'pizza_name', 'pizza_size', 'number_of_pizzas')
-        read_only_fields = ('id', )
+    def create(self, validated_data):
+        try:
+            return OrderItem.add(**validated_data)
+        except Order.DoesNotExist:
+            raise ValidationError({'order': [PrimaryKeyRelatedField.default_error_messages['does_not_exist'].format(
+                pk_value=validated_data['order_id']
+            )]})
 
-
-class ItemSerializer(ModelSerializer):
-    """
-    A general Item model serializer
-    """
     class Meta:
         model = OrderItem
         fields = ('id', 'order', 'pizza_name', 'pizza_size', 'number_of_pizzas')
         read_only_fields = ('id', )
+        extra_kwargs = {'number_of_pizzas': {'min_value': 1}}
 
 
 class OrderStatusSerializer(ModelSerializer):
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+STATUS_KEY = 'orders:status:{}'
+
+
+def status_version(updated):
+    """
+    Version of an order status, microseconds of Order.updated
+    :type updated: datetime
+    :rtype: int
+    """
+    return int(updated.timestamp() * 1000000)
+
+
+def status_etag(order_id, updated):
+    """
+    ETag of an order status, it changes with every save of the order
+    :param order_id: order id
+    :type order_id: int
+    :param updated: Order.updated
+    :type updated: datetime
+    :rtype: str
+    """
+    return '"{}-{}"'.format(order_id, status_version(updated))
+
+
+def publish_status(order_id, order_state, updated):
+    """
+    Writes the new status of an order through to the cache once the current transaction commits, see
+    cache_status. The cached value is dropped right away, so nobody reads it while the transaction is in
+    progress and a rolled back change is never cached
+    :param order_id: order id
+    :type order_id: int
+    :param order_state: Order.order_state
+    :type order_state: str
+    :param updated: Order.updated
+    :type updated: datetime
+    """
+    key = STATUS_KEY.format(order_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache_status(key, (order_state, updated)))
+
+
+def cache_status(key, status):
+    """
+    Caches a status unless a newer one is cached already. Changes of an order commit in order, but their
+    on_commit callbacks run in different threads and may reach the cache in the opposite order
+    :param key: STATUS_KEY of the order
+    :type key: str
+    :param status: (order_state, updated)
+    :type status: tuple
+    """
+    if cache.add(key, status, settings.ORDER_STATUS_CACHE_TIMEOUT):
+        return
+    cached = cache.get(key)
+    if cached is None or cached[1] < status[1]:
+        cache.set(key, status, settings.ORDER_STATUS_CACHE_TIMEOUT)
+
+
+def forget_status(order_id):
+    cache.delete(STATUS_KEY.format(order_id))
+
+
+def forget_statuses(order_ids):
+    cache.delete_many([STATUS_KEY.format(x) for x in order_ids])
+
+
+def get_statuses(order_ids):
+    """
+    Returns statuses of the orders from the cache, only the missing ones are read from the database. Misses
+    are read from the primary, a replica may lag behind the write through of publish_status. They are cached
+    with add: a row read before a concurrent save commits never overwrites the status that save writes
+    :param order_ids: order ids
+    :type order_ids: list
+    :return: order id -> (order_state, updated), unknown orders are left out
+    :rtype: dict
+    """
+    from orders.models import Order
+
+    cached = cache.get_many([STATUS_KEY.format(x) for x in order_ids])
+    statuses = {x: cached[STATUS_KEY.format(x)] for x in order_ids if STATUS_KEY.format(x) in cached}
+    missing = [x for x in order_ids if x not in statuses]
+    if missing:
+        loaded = {
+            order_id: (order_state, updated)
+            for order_id, order_state, updated in Order.objects.using(DEFAULT_DB_ALIAS).filter(
+                id__in=missing
+            ).values_list('id', 'order_state', 'updated')
+        }
+        for order_id, value in loaded.items():
+            cache.add(STATUS_KEY.format(order_id), value, settings.ORDER_STATUS_CACHE_TIMEOUT)
+        statuses.update(loaded)
+    return statuses
@@ -0,0 +1,117 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from customers.models import Customers
+from orders.models import Order, OrderItem
+from orders.serializers import OrderBulkCreateSerializer
+from pizzas.catalog import menu_catalog
+from pizzas.models import Pizzas, PizzaSizes
+
+
+bulk_url = reverse('orders:orders-bulk')
+
+
+class OrderBulkCreateTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.customer = Customers.objects.create(name='bulk', phone='1234567', gender=Customers.FEMALE)
+        cls.pizzas = [Pizzas.objects.create(name='bulk_{}'.format(x)) for x in range(3)]
+        cls.sizes = [PizzaSizes.objects.create(sizename=x) for x, _ in PizzaSizes.SIZE_CHOICES]
+        cls.deleted_pizza = Pizzas.objects.create(name='bulk_deleted', is_deleted=True)
+
+    def order_data(self, pizza_ids):
+        """
+        Builds the request body of one order with an item per pizza id
+        :param pizza_ids: pizza ids
+        :type pizza_ids: list
+        :rtype: dict
+        """
+        return {
+            'customer': OrderBulkCreateTest.customer.id,
+            'items': [
+                {'pizza_name': x, 'pizza_size': OrderBulkCreateTest.sizes[0].id, 'number_of_pizzas': 2}
+                for x in pizza_ids
+            ]
+        }
+
+    def post(self, data):
+        return OrderBulkCreateTest.client.post(bulk_url, json.dumps(data), content_type='application/json')
+
+    def test_create_order_with_items(self):
+        """
+        Tests an order and all its items are created by one request
+        """
+        pizza_ids = [x.id for x in OrderBulkCreateTest.pizzas]
+        res = self.post(self.order_data(pizza_ids))
+
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        self.assertEqual(res.data['customer'], OrderBulkCreateTest.customer.id)
+        order = Order.objects.get(id=res.data['id'])
+        self.assertEqual(sorted(order.items.values_list('pizza_name_id', flat=True)), sorted(pizza_ids))
+        self.assertEqual(sorted(res.data['items']), sorted(order.items.values_list('id', flat=True)))
+
+    def test_create_list_of_orders(self):
+        """
+        Tests a list of orders is created and returned in the requested order
+        """
+        pizzas = OrderBulkCreateTest.pizzas
+        res = self.post([self.order_data([pizzas[0].id]), self.order_data([pizzas[1].id, pizzas[2].id])])
+
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        self.assertEqual([len(x['items']) for x in res.data], [1, 2])
+
+    def test_references_are_checked_with_one_query_each(self):
+        """
+        Tests customers are validated with one query regardless of the batch size, pizzas and sizes come
+        from the menu catalog
+        """
+        menu_catalog.ids('pizzas')
+        data = [self.order_data([x.id for x in OrderBulkCreateTest.pizzas]) for _ in range(10)]
+        serializer = OrderBulkCreateSerializer(data=data, many=True)
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+    def test_fail_on_deleted_pizza_creates_nothing(self):
+        """
+        Tests a single invalid reference rejects the whole batch
+        """
+        orders_before = Order.objects.count()
+        items_before = OrderItem.objects.count()
+        res = self.post([
+            self.order_data([OrderBulkCreateTest.pizzas[0].id]),
+            self.order_data([OrderBulkCreateTest.deleted_pizza.id])
+        ])
+
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), orders_before)
+        self.assertEqual(OrderItem.objects.count(), items_before)
+
+    def test_fail_without_customer(self):
+        data = self.order_data([OrderBulkCreateTest.pizzas[0].id])
+        data.pop('customer')
+        res = self.post(data)
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+
+    @override_settings(ORDERS_BULK_CREATE_MAX_ORDERS=2)
+    def test_fail_on_too_many_orders(self):
+        """
+        The limit is checked before any order is validated, invalid orders beyond it report nothing
+        """
+        res = self.post([{'customer': 'x'}] * 3)
+
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data, {'non_field_errors': ['Too many orders in one request, the limit is 2']})
+
+    def test_fail_on_zero_pizzas(self):
+        data = self.order_data([OrderBulkCreateTest.pizzas[0].id])
+        data['items'][0]['number_of_pizzas'] = 0
+        res = self.post(data)
+
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
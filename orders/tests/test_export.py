@@ -0,0 +1,111 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from core.benchmark import explicit_timestamps
+from core.export import keyset_rows
+from customers.models import Customers
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+order_export_url = reverse('orders:orders-export')
+
+
+def read_stream(response):
+    """
+    Joins the chunks of a streaming response
+    :rtype: str
+    """
+    return b''.join(response.streaming_content).decode()
+
+
+class ExportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.customer = Customers.objects.create(name='export', phone='2222', gender=Customers.FEMALE)
+        cls.now = timezone.now()
+        with explicit_timestamps(Order):
+            cls.orders = [
+                Order.objects.create(customer=cls.customer, created=cls.now - timedelta(days=x), updated=cls.now)
+                for x in range(5)
+            ]
+        pizza = Pizzas.objects.create(name='export_pizza')
+        size = PizzaSizes.objects.create(sizename=PizzaSizes.SMALL)
+        OrderItem.objects.create(order=cls.orders[0], pizza_name=pizza, pizza_size=size, number_of_pizzas=2)
+
+    def test_orders_csv(self):
+        res = ExportTest.client.get(order_export_url)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+
+        rows = list(csv.DictReader(StringIO(read_stream(res))))
+        self.assertEqual([int(x['id']) for x in rows], [x.id for x in reversed(ExportTest.orders)])
+        self.assertEqual(rows[-1]['total_pizzas'], '2')
+        self.assertTrue(rows[0]['created'].endswith('Z'))
+
+    def test_orders_ndjson_with_date_range(self):
+        """
+        Tests the range includes created_from and excludes created_to
+        """
+        res = ExportTest.client.get(order_export_url, data={
+            'output': 'ndjson',
+            'created_from': (ExportTest.now - timedelta(days=3)).isoformat(),
+            'created_to': (ExportTest.now - timedelta(days=1)).isoformat(),
+        })
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+        rows = [json.loads(x) for x in read_stream(res).splitlines()]
+        self.assertEqual([x['id'] for x in rows], [ExportTest.orders[3].id, ExportTest.orders[2].id])
+        self.assertEqual(rows[0]['customer'], ExportTest.customer.id)
+
+    def test_items_and_customers(self):
+        res = ExportTest.client.get(reverse('orders:items-export'), data={'output': 'ndjson'})
+        self.assertEqual(json.loads(read_stream(res))['number_of_pizzas'], 2)
+
+        res = ExportTest.client.get(reverse('customers:customers-export'))
+        self.assertIn('export', read_stream(res))
+
+    def test_fail_on_wrong_parameters(self):
+        res = ExportTest.client.get(order_export_url, data={'output': 'xml'})
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+
+        res = ExportTest.client.get(order_export_url, data={'created_from': 'yesterday'})
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command('export_data', 'orders', output='ndjson', chunk_size=2, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
+
+    def test_export_without_server_side_cursors(self):
+        connection.settings_dict['DISABLE_SERVER_SIDE_CURSORS'] = True
+        try:
+            out = StringIO()
+            call_command('export_data', 'orders', output='ndjson', chunk_size=2, stdout=out)
+        finally:
+            connection.settings_dict['DISABLE_SERVER_SIDE_CURSORS'] = False
+        ids = [json.loads(x)['id'] for x in out.getvalue().splitlines()]
+        self.assertEqual(ids, [x.id for x in reversed(ExportTest.orders)])
+
+    def test_keyset_rows_with_equal_timestamps(self):
+        moment = ExportTest.now - timedelta(hours=1)
+        with explicit_timestamps(Order):
+            same = [Order.objects.create(created=moment, updated=moment) for _ in range(3)]
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(keyset_rows(Order.objects.filter(created=moment), ('id',), 2))
+        self.assertEqual([x[0] for x in rows], [x.id for x in same])
+        self.assertEqual(len(queries), 2)
+        self.assertIn('"created", "orders_order"."id") > (', queries[1]['sql'])
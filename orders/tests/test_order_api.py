@@ -300,7 +300,7 @@ class OrderTest(TestCase):
             rec['created'] = rec['created'].isoformat().replace('+00:00', 'Z')
             rec['updated'] = rec['updated'].isoformat().replace('+00:00', 'Z')
 
-        req_data = [dict(x) for x in res.data]
+        req_data = [dict(x) for x in res.data['results']]
         self.assertListEqual(orm_result, req_data)
 
     def test_list_orders_total_count_vs_orm(self):
@@ -309,7 +309,7 @@ class OrderTest(TestCase):
         """
         res = OrderTest.client.get(order_url)
         orm_order_count = Order.objects.count()
-        self.assertEqual(orm_order_count, len(res.data))
+        self.assertEqual(orm_order_count, len(res.data['results']))
 
     def test_create_new_item_for_order(self):
         """
@@ -329,6 +329,21 @@ class OrderTest(TestCase):
 
         self.assertDictEqual(item_data, result_data)
 
+    def test_fail_create_item_with_negative_number_of_pizzas(self):
+        """
+        An item has at least one pizza, the order counters never go negative
+        """
+        item_data = {
+            'pizza_name': OrderTest.test_pizzas[0].id,
+            'pizza_size': OrderTest.test_sizes[0].id,
+            'number_of_pizzas': -3
+        }
+        total_pizzas = Order.objects.get(id=self.locked_order.id).total_pizzas
+        res = OrderTest.client.post(OrderTest.order_item_url, json.dumps(item_data), content_type='application/json')
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('number_of_pizzas', res.data)
+        self.assertEqual(Order.objects.get(id=self.locked_order.id).total_pizzas, total_pizzas)
+
     def test_order_status_changed(self):
         """
         Tests order's status change
@@ -369,7 +384,7 @@ class OrderTest(TestCase):
         self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
 
         last_order_state = OrderTest.client.get(OrderTest.order_item_url)
-        self.assertListEqual(first_order_state.data, last_order_state.data)
+        self.assertListEqual(first_order_state.data['results'], last_order_state.data['results'])
 
     def test_order_item_update_pizza_size_in_forbidden_status(self):
         """
@@ -385,7 +400,7 @@ class OrderTest(TestCase):
         self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
 
         last_order_state = OrderTest.client.get(OrderTest.order_item_url)
-        self.assertListEqual(first_order_state.data, last_order_state.data)
+        self.assertListEqual(first_order_state.data['results'], last_order_state.data['results'])
 
     def test_order_item_update_pizza_name_in_forbidden_status(self):
         """
@@ -401,7 +416,7 @@ class OrderTest(TestCase):
         self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
 
         last_order_state = OrderTest.client.get(OrderTest.order_item_url)
-        self.assertListEqual(first_order_state.data, last_order_state.data)
+        self.assertListEqual(first_order_state.data['results'], last_order_state.data['results'])
 
     def test_change_order_information_in_forbidden_status(self):
         """
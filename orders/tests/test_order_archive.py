@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+from rest_framework.test import APIClient
+
+from customers.models import Customers
+from orders.archive import archive_batch, archive_cutoff, archive_orders
+from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStateTransition
+from orders.status import get_statuses
+from pizzas.models import Pizzas, PizzaSizes
+
+
+class OrderArchiveTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customers.objects.create(name='archive', phone='666', gender=Customers.FEMALE)
+        cls.pizza = Pizzas.objects.create(name='archive_pizza')
+        cls.size = PizzaSizes.objects.create(sizename=PizzaSizes.LARGE)
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def create_order(self, state, days_ago, items=2):
+        order = Order.objects.create(customer=OrderArchiveTest.customer)
+        for number in range(items):
+            OrderItem.objects.create(order=order, pizza_name=OrderArchiveTest.pizza, pizza_size=OrderArchiveTest.size,
+                                     number_of_pizzas=number + 1)
+        Order.objects.filter(pk=order.pk).update(order_state=state, updated=timezone.now() - timedelta(days=days_ago))
+        order.refresh_from_db()
+        return order
+
+    def test_archives_old_final_orders(self):
+        delivered = self.create_order(Order.DELIVERED, 100)
+        canceled = self.create_order(Order.CANCELED, 200, items=0)
+        recent = self.create_order(Order.DELIVERED, 10)
+        open_order = self.create_order(Order.PROCESSING, 300)
+
+        self.assertEqual(archive_orders(archive_cutoff(90), size=1), 2)
+        self.assertEqual(set(Order.objects.values_list('id', flat=True)), {recent.id, open_order.id})
+        self.assertFalse(OrderItem.objects.filter(order__in=[delivered.id, canceled.id]).exists())
+
+        archived = ArchivedOrder.objects.get(pk=delivered.pk)
+        self.assertEqual(
+            (archived.customer_id, archived.order_state, archived.total_pizzas, archived.active_items,
+             archived.created, archived.updated),
+            (delivered.customer_id, Order.DELIVERED, 3, 2, delivered.created, delivered.updated)
+        )
+        self.assertEqual(sorted(archived.items.values_list('number_of_pizzas', flat=True)), [1, 2])
+        self.assertTrue(ArchivedOrder.objects.filter(pk=canceled.pk).exists())
+        # The log outlives archived orders
+        self.assertTrue(OrderStateTransition.objects.filter(order_id=delivered.id).exists())
+        self.assertEqual(archive_batch(archive_cutoff(90), 10), 0)
+
+    def test_archived_status_is_forgotten(self):
+        order = self.create_order(Order.DELIVERED, 100)
+        self.assertIn(order.id, get_statuses([order.id]))
+        archive_orders(archive_cutoff(90))
+        self.assertEqual(get_statuses([order.id]), {})
+
+    def test_command(self):
+        self.create_order(Order.DELIVERED, 10)
+        call_command('archive_orders', days=5, batch_size=10, stdout=open('/dev/null', 'w'))
+        self.assertEqual(ArchivedOrder.objects.count(), 1)
+        self.assertEqual(ArchivedOrderItem.objects.count(), 2)
+
+    def test_archive_api(self):
+        order = self.create_order(Order.DELIVERED, 100)
+        archive_orders(archive_cutoff(90))
+
+        res = self.client.get(reverse('orders:archivedorders-list'), {'customer': OrderArchiveTest.customer.id})
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual([x['id'] for x in res.data['results']], [order.id])
+
+        res = self.client.get(reverse('orders:archivedorders-detail', args=[order.id]))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(len(res.data['items']), 2)
+        self.assertEqual(self.client.get(reverse('orders:orders-detail', args=[order.id])).status_code,
+                         HTTP_404_NOT_FOUND)
+
+    def test_customer_history(self):
+        archived = self.create_order(Order.DELIVERED, 100)
+        current = self.create_order(Order.DELIVERED, 10)
+        archive_orders(archive_cutoff(90))
+        url = reverse('customers:customers-orders', args=[OrderArchiveTest.customer.id])
+
+        res = self.client.get(url)
+        self.assertEqual([x['id'] for x in res.data['results']], [current.id])
+        with self.assertNumQueries(2):
+            res = self.client.get(url, {'archived': 1})
+        self.assertEqual([x['id'] for x in res.data['results']], [archived.id])
+        self.assertEqual(len(res.data['results'][0]['items']), 2)
@@ -0,0 +1,76 @@
+import threading
+import unittest
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem, OrderStateTransition
+from pizzas.models import Pizzas, PizzaSizes
+
+
+claim_url = reverse('orders:orders-claim')
+
+
+class OrderClaimTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.orders = [Order.objects.create() for _ in range(5)]
+        Order.objects.filter(pk=cls.orders[1].pk).update(order_state=Order.SENT)
+        OrderItem.objects.create(order=cls.orders[0], pizza_name=Pizzas.objects.create(name='claim_pizza'),
+                                 pizza_size=PizzaSizes.objects.create(sizename=PizzaSizes.LARGE), number_of_pizzas=2)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_claims_oldest_accepted_orders(self):
+        claimed = Order.objects.claim(2)
+
+        self.assertEqual([x.id for x in claimed], [self.orders[0].id, self.orders[2].id])
+        self.assertEqual(Order.objects.filter(order_state=Order.PROCESSING).count(), 2)
+        self.assertEqual(
+            OrderStateTransition.objects.filter(from_state=Order.ACCEPTED, to_state=Order.PROCESSING).count(), 2
+        )
+        self.assertEqual([x.id for x in Order.objects.claim(10)], [self.orders[3].id, self.orders[4].id])
+        self.assertEqual(Order.objects.claim(10), [])
+
+    def test_claim_endpoint(self):
+        res = self.client.post(claim_url, {'limit': 1}, format='json')
+
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['order_state'], Order.PROCESSING)
+        self.assertEqual(res.data[0]['items'][0]['number_of_pizzas'], 2)
+
+    def test_claim_limit_validation(self):
+        self.assertEqual(self.client.post(claim_url, {'limit': 0}, format='json').status_code, HTTP_400_BAD_REQUEST)
+
+
+@unittest.skipUnless(connection.features.has_select_for_update_skip_locked, 'SKIP LOCKED is not supported')
+class ConcurrentClaimTest(TransactionTestCase):
+
+    def test_workers_never_share_orders(self):
+        Order.objects.bulk_create([Order() for _ in range(200)])
+        claimed = []
+
+        def worker():
+            try:
+                while True:
+                    orders = Order.objects.claim(3)
+                    if not orders:
+                        break
+                    claimed.extend(x.id for x in orders)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(len(claimed), 200)
+        self.assertEqual(len(set(claimed)), 200)
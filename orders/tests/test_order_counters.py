@@ -0,0 +1,154 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from customers.models import Customers
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+class OrderCountersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.customer = Customers.objects.create(name='counters', phone='1111', gender=Customers.MALE)
+        cls.pizza = Pizzas.objects.create(name='counters_pizza')
+        cls.size = PizzaSizes.objects.create(sizename=PizzaSizes.MEDIUM)
+
+    def setUp(self):
+        self.order = Order.objects.create(customer=OrderCountersTest.customer)
+
+    def add_item(self, number_of_pizzas, order=None):
+        return OrderItem.objects.create(
+            order=order or self.order,
+            pizza_name=OrderCountersTest.pizza,
+            pizza_size=OrderCountersTest.size,
+            number_of_pizzas=number_of_pizzas
+        )
+
+    def assert_counters(self, total_pizzas, active_items, order=None):
+        order = Order.objects.get(id=(order or self.order).id)
+        self.assertEqual((order.total_pizzas, order.active_items), (total_pizzas, active_items))
+
+    def test_item_creation(self):
+        self.add_item(3)
+        self.add_item(2)
+        self.assert_counters(5, 2)
+
+    def test_item_update_and_deactivation(self):
+        """
+        Tests changes of loaded items are applied as deltas
+        """
+        self.add_item(3)
+        item = OrderItem.objects.get(id=self.add_item(2).id)
+        item.number_of_pizzas = 4
+        item.save()
+        self.assert_counters(7, 2)
+
+        item.is_active = False
+        item.save()
+        self.assert_counters(3, 1)
+
+    def test_item_deletion(self):
+        self.add_item(3)
+        OrderItem.objects.get(id=self.add_item(2).id).delete()
+        self.assert_counters(3, 1)
+
+    def test_item_moved_to_another_order(self):
+        other_order = Order.objects.create(customer=OrderCountersTest.customer)
+        item = self.add_item(3)
+        item.order = other_order
+        item.save()
+        self.assert_counters(0, 0)
+        self.assert_counters(3, 1, order=other_order)
+
+    def test_deferred_item_update(self):
+        """
+        Tests an item loaded without its counted fields still leaves correct counters
+        """
+        item = self.add_item(3)
+        deferred = OrderItem.objects.only('id', 'order').get(id=item.id)
+        deferred.is_active = False
+        deferred.save()
+        self.assert_counters(0, 0)
+
+    def test_stale_item_updates(self):
+        """
+        Tests two instances loaded before either update each apply their change to the stored values
+        """
+        item = self.add_item(2)
+        first, second = OrderItem.objects.get(id=item.id), OrderItem.objects.get(id=item.id)
+        first.number_of_pizzas = 3
+        first.save()
+        second.number_of_pizzas = 5
+        second.save()
+        self.assert_counters(5, 1)
+        first.delete()
+        second.delete()
+        self.assert_counters(0, 0)
+
+    def test_api_exposes_counters(self):
+        url = reverse('orders:orderitems-list', args=[self.order.id])
+        item = {'pizza_name': OrderCountersTest.pizza.id, 'pizza_size': OrderCountersTest.size.id, 'number_of_pizzas': 4}
+        res = OrderCountersTest.client.post(url, json.dumps(item), content_type='application/json')
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+
+        with self.assertNumQueries(2):
+            res = OrderCountersTest.client.get(reverse('orders:orders-detail', args=[self.order.id]))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual((res.data['total_pizzas'], res.data['active_items']), (4, 1))
+
+    def test_item_added_without_reading_order(self):
+        """
+        Tests the state check, lock and counters of a new item need one UPDATE and the INSERT, without SELECTs
+        """
+        url = reverse('orders:orderitems-list', args=[self.order.id])
+        item = {'pizza_name': OrderCountersTest.pizza.id, 'pizza_size': OrderCountersTest.size.id, 'number_of_pizzas': 2}
+        OrderCountersTest.client.post(url, json.dumps(item), content_type='application/json')
+        with CaptureQueriesContext(connection) as queries:
+            res = OrderCountersTest.client.post(url, json.dumps(item), content_type='application/json')
+
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        statements = [x['sql'].split()[0] for x in queries if 'SAVEPOINT' not in x['sql']]
+        self.assertEqual(statements, ['UPDATE', 'INSERT'])
+        self.assert_counters(4, 2)
+
+    def test_item_not_added_to_closed_order(self):
+        self.add_item(1)
+        Order.objects.filter(pk=self.order.pk).update(order_state=Order.SENT)
+        url = reverse('orders:orderitems-list', args=[self.order.id])
+        item = {'pizza_name': OrderCountersTest.pizza.id, 'pizza_size': OrderCountersTest.size.id, 'number_of_pizzas': 2}
+        res = OrderCountersTest.client.post(url, json.dumps(item), content_type='application/json')
+
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('order', res.data)
+        self.assert_counters(1, 1)
+        self.assertEqual(self.order.items.count(), 1)
+
+    def test_bulk_created_order(self):
+        data = {
+            'customer': OrderCountersTest.customer.id,
+            'items': [
+                {'pizza_name': OrderCountersTest.pizza.id, 'pizza_size': OrderCountersTest.size.id, 'number_of_pizzas': x}
+                for x in (1, 2, 3)
+            ]
+        }
+        res = OrderCountersTest.client.post(reverse('orders:orders-bulk'), json.dumps(data), content_type='application/json')
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        self.assertEqual((res.data['total_pizzas'], res.data['active_items']), (6, 3))
+
+    def test_rebuild_command(self):
+        self.add_item(3)
+        self.add_item(2)
+        Order.objects.update(total_pizzas=0, active_items=0)
+
+        call_command('rebuild_order_counters', batch_size=1, stdout=StringIO())
+        self.assert_counters(5, 2)
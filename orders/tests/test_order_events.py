@@ -0,0 +1,112 @@
+import json
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from orders.events import OrderEventBroker, broker
+from orders.models import Order
+from orders.status import status_version
+
+
+poll_url = reverse('orders:orderstatus-poll')
+stream_url = reverse('orders:orderstatus-stream')
+
+
+class OrderEventBrokerTest(TestCase):
+
+    def setUp(self):
+        self.broker = OrderEventBroker(size=2)
+
+    def test_wait_returns_newer_events(self):
+        self.broker.publish({'id': 1, 'order_state': 'P', 'version': 10})
+        self.assertEqual(self.broker.wait({1: 5}, 0), [{'id': 1, 'order_state': 'P', 'version': 10}])
+        self.assertEqual(self.broker.wait({1: 10}, 0), [])
+
+    def test_wait_is_woken_up(self):
+        threading.Timer(0.05, self.broker.publish, [{'id': 1, 'order_state': 'S', 'version': 20}]).start()
+        self.assertEqual(self.broker.wait({1: 10, 2: 0}, 5), [{'id': 1, 'order_state': 'S', 'version': 20}])
+
+    def test_older_event_is_ignored(self):
+        self.broker.publish({'id': 1, 'order_state': 'S', 'version': 20})
+        self.broker.publish({'id': 1, 'order_state': 'P', 'version': 10})
+        self.assertEqual(self.broker.wait({1: 0}, 0)[0]['order_state'], 'S')
+
+    def test_buffer_is_bounded(self):
+        for order_id in range(3):
+            self.broker.publish({'id': order_id, 'order_state': 'A', 'version': 1})
+        self.assertEqual(self.broker.wait({0: 0, 1: 0, 2: 0}, 0), [
+            {'id': 1, 'order_state': 'A', 'version': 1},
+            {'id': 2, 'order_state': 'A', 'version': 1},
+        ])
+
+
+class OrderEventsApiTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.order = Order.objects.create()
+        self.version = status_version(self.order.updated)
+
+    def test_poll_returns_current_state(self):
+        res = self.client.get(poll_url, {'ids': self.order.id, 'since': 0})
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data, [{'id': self.order.id, 'order_state': 'A', 'version': self.version}])
+
+    def test_poll_times_out(self):
+        res = self.client.get(poll_url, {'ids': self.order.id, 'since': self.version, 'timeout': 0})
+        self.assertEqual(res.data, [])
+
+    def test_poll_rejects_invalid_timeout(self):
+        for timeout in ('nan', 'inf', '-1', 'x'):
+            res = self.client.get(poll_url, {'ids': self.order.id, 'since': self.version, 'timeout': timeout})
+            self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST, timeout)
+
+    def test_poll_waits_for_change(self):
+        event = {'id': self.order.id, 'order_state': 'P', 'version': self.version + 1}
+        self.client.get(poll_url, {'ids': self.order.id, 'since': self.version, 'timeout': 0})
+        threading.Timer(0.05, broker.publish, [event]).start()
+        with self.assertNumQueries(0):
+            res = self.client.get(poll_url, {'ids': self.order.id, 'since': self.version, 'timeout': 5})
+        self.assertEqual(res.data, [event])
+
+    def test_stream(self):
+        res = self.client.get(stream_url, {'ids': self.order.id}, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        chunks = iter(res.streaming_content)
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        self.assertEqual(next(chunks).decode(), 'id: {}\nevent: order_state\ndata: {}\n\n'.format(
+            self.version, json.dumps({'id': self.order.id, 'order_state': 'A', 'version': self.version})
+        ))
+
+    def test_stream_resumes_with_current_statuses(self):
+        """
+        Last-Event-ID is the version of the last event of any order, the other orders may have changed before
+        """
+        res = self.client.get(stream_url, {'ids': self.order.id}, HTTP_LAST_EVENT_ID=str(self.version + 10))
+        chunks = iter(res.streaming_content)
+        next(chunks)
+        self.assertIn('"version": {}'.format(self.version).encode(), next(chunks))
+        event = {'id': self.order.id, 'order_state': 'S', 'version': self.version + 1}
+        broker.publish(event)
+        self.assertIn(json.dumps(event).encode(), next(chunks))
+
+
+class OrderSaveEventsTest(TransactionTestCase):
+    """
+    Events are published on commit, TransactionTestCase runs the test in autocommit mode
+    """
+
+    def test_state_change_is_published(self):
+        with mock.patch.object(broker, 'publish') as publish:
+            order = Order.objects.create()
+            order = Order.objects.get(pk=order.pk)
+            order.save()
+            order.order_state = Order.PROCESSING
+            order.save()
+        self.assertEqual([x[0][0]['order_state'] for x in publish.call_args_list], ['A', 'P'])
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
+from rest_framework.test import APIClient
+
+from orders.models import Order
+from orders.status import STATUS_KEY, get_statuses, publish_status
+
+
+batch_url = reverse('orders:orderstatus-batch')
+
+
+class OrderStatusTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.order = Order.objects.create()
+        self.other = Order.objects.create(order_state=Order.PROCESSING)
+        self.url = reverse('orders:orderstatus-detail', args=[self.order.id])
+
+    def test_retrieve(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data, {'order_state': 'A'})
+        self.assertEqual(res['Last-Modified'], http_date(self.order.updated.timestamp()))
+
+    def test_unknown_order(self):
+        self.assertEqual(self.client.get(reverse('orders:orderstatus-detail', args=[0])).status_code,
+                         HTTP_404_NOT_FOUND)
+
+    def test_not_modified_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        res = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_state_change_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.order.order_state = Order.SENT
+        self.order.save()
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data, {'order_state': 'S'})
+
+    def test_publish_drops_cached_status(self):
+        """
+        Tests a new status isn't visible before commit, TestCase never commits so on_commit callbacks don't run
+        """
+        key = STATUS_KEY.format(self.order.id)
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(key))
+        publish_status(self.order.id, Order.SENT, self.order.updated)
+        self.assertIsNone(cache.get(key))
+
+    def test_miss_never_overwrites_published_status(self):
+        """
+        A miss read before a save committed must not replace the status written through by that save
+        """
+        key = STATUS_KEY.format(self.order.id)
+        published = (Order.SENT, self.order.updated)
+        cache.set(key, published)
+        with mock.patch.object(cache, 'get_many', return_value={}):
+            self.assertEqual(get_statuses([self.order.id]), {self.order.id: (Order.ACCEPTED, self.order.updated)})
+        self.assertEqual(cache.get(key), published)
+
+    def test_late_publish_never_overwrites_newer_status(self):
+        """
+        on_commit callbacks of two changes may run in the opposite order of their commits
+        """
+        key = STATUS_KEY.format(self.order.id)
+        older, newer = self.order.updated, self.order.updated + timedelta(seconds=1)
+        callbacks = []
+        with mock.patch('orders.status.transaction.on_commit', callbacks.append):
+            publish_status(self.order.id, Order.PROCESSING, older)
+            publish_status(self.order.id, Order.SENT, newer)
+        for callback in reversed(callbacks):
+            callback()
+        self.assertEqual(cache.get(key), (Order.SENT, newer))
+
+    def test_batch(self):
+        res = self.client.get(batch_url, {'ids': '{},{},0'.format(self.other.id, self.order.id)})
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data, [
+            {'id': self.order.id, 'order_state': 'A'},
+            {'id': self.other.id, 'order_state': 'P'},
+        ])
+        with self.assertNumQueries(0):
+            res = self.client.get(batch_url, {'ids': '{},{}'.format(self.order.id, self.other.id)},
+                                  HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_batch_validation(self):
+        self.assertEqual(self.client.get(batch_url).status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(batch_url, {'ids': 'one,two'}).status_code, HTTP_400_BAD_REQUEST)
+        with self.settings(ORDER_STATUS_BATCH_MAX=1):
+            res = self.client.get(batch_url, {'ids': '{},{}'.format(self.order.id, self.other.id)})
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderStateTransition
+
+
+class OrderStateTransitionTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.order = Order.objects.create()
+        self.url = reverse('orders:orders-detail', args=[self.order.id])
+
+    def change_state(self, state):
+        return self.client.patch(self.url, json.dumps({'order_state': state}), content_type='application/json')
+
+    def test_transitions_are_logged(self):
+        for state in (Order.PROCESSING, Order.SENT, Order.DELIVERED):
+            self.assertEqual(self.change_state(state).status_code, HTTP_200_OK)
+        self.order.refresh_from_db()
+        self.order.save()
+
+        self.assertEqual(
+            list(self.order.transitions.order_by('created', 'id').values_list('from_state', 'to_state')),
+            [(None, 'A'), ('A', 'P'), ('P', 'S'), ('S', 'D')]
+        )
+
+    def test_forbidden_transition(self):
+        self.assertEqual(self.change_state(Order.CANCELED).status_code, HTTP_200_OK)
+        res = self.change_state(Order.ACCEPTED)
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('order_state', res.data)
+        self.assertEqual(self.order.transitions.count(), 2)
+
+    def test_unknown_state(self):
+        self.assertEqual(self.change_state('X').status_code, HTTP_400_BAD_REQUEST)
+
+    def test_delivery_times(self):
+        hour = timezone.make_aware(datetime(2026, 1, 1, 12))
+        for minutes, delivered in ((30, 10), (50, 20), (60, 70)):
+            OrderStateTransition.objects.create(
+                order=self.order, from_state=Order.SENT, to_state=Order.DELIVERED,
+                order_created=hour + timedelta(minutes=delivered - minutes), created=hour + timedelta(minutes=delivered)
+            )
+        OrderStateTransition.objects.create(
+            order=self.order, from_state=Order.ACCEPTED, to_state=Order.PROCESSING,
+            order_created=hour, created=hour + timedelta(minutes=5)
+        )
+
+        result = list(OrderStateTransition.objects.delivery_times(hour, hour + timedelta(hours=2)))
+        self.assertEqual([x['orders'] for x in result], [2, 1])
+        self.assertEqual(result[0]['average'], timedelta(minutes=40))
+        self.assertEqual(result[1]['average'], timedelta(minutes=60))
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APIClient
+
+from core.benchmark import explicit_timestamps
+from core.pagination import CreatedCursorPagination
+from orders.models import Order
+
+
+order_url = reverse('orders:orders-list')
+
+
+class OrderPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        start = timezone.now() - timedelta(days=1)
+        with explicit_timestamps(Order):
+            Order.objects.bulk_create([
+                Order(created=start + timedelta(minutes=number), updated=start + timedelta(minutes=number))
+                for number in range(25)
+            ])
+        # Two orders sharing the same 'created' value must not be lost between pages
+        with explicit_timestamps(Order):
+            Order.objects.bulk_create([Order(created=start, updated=start) for _ in range(2)])
+
+    def walk(self, page_size):
+        """
+        Follows 'next' links through the whole orders list
+        :param page_size: requested page size
+        :type page_size: int
+        :return: list of pages, each page is a list of order ids
+        :rtype: list
+        """
+        pages = []
+        url = order_url
+        params = {'page_size': page_size}
+        while url:
+            res = OrderPaginationTest.client.get(url, data=params)
+            self.assertEqual(res.status_code, HTTP_200_OK)
+            pages.append([x['id'] for x in res.data['results']])
+            url = res.data['next']
+            params = None
+        return pages
+
+    def test_list_is_paginated(self):
+        """
+        Tests the list returns a cursor page instead of the whole table
+        """
+        res = OrderPaginationTest.client.get(order_url, data={'page_size': 10})
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 10)
+        self.assertIsNotNone(res.data['next'])
+        self.assertIsNone(res.data['previous'])
+
+    def test_walk_returns_every_order_once_newest_first(self):
+        """
+        Tests following the cursors returns every order exactly once in the '-created' order
+        """
+        pages = self.walk(page_size=10)
+        self.assertListEqual([len(x) for x in pages], [10, 10, 7])
+
+        walked_ids = [order_id for page in pages for order_id in page]
+        orm_ids = list(Order.objects.order_by('-created', '-id').values_list('id', flat=True))
+        self.assertListEqual(walked_ids, orm_ids)
+
+    def test_page_size_is_capped(self):
+        """
+        Tests the page_size parameter can't exceed the configured maximum
+        """
+        with patch.object(CreatedCursorPagination, 'max_page_size', 5):
+            res = OrderPaginationTest.client.get(order_url, data={'page_size': 1000})
+        self.assertEqual(len(res.data['results']), 5)
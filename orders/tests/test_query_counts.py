@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APIClient
+
+from customers.models import Customers
+from orders.models import Order, OrderItem
+from pizzas.models import Pizzas, PizzaSizes
+
+
+order_url = reverse('orders:orders-list')
+item_url = reverse('orders:items-list')
+
+
+class OrderQueryCountTest(TestCase):
+    """
+    Query count regression tests. The number of queries of every read endpoint must not depend on the number
+    of returned rows
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        pizza = Pizzas.objects.create(name='query_pizza')
+        size = PizzaSizes.objects.create(sizename=PizzaSizes.LARGE)
+        for number in range(15):
+            customer = Customers.objects.create(
+                name='query_{}'.format(number),
+                phone='555{}'.format(number),
+                gender=Customers.MALE
+            )
+            order = Order.objects.create(customer=customer)
+            for _ in range(3):
+                OrderItem.objects.create(order=order, pizza_name=pizza, pizza_size=size, number_of_pizzas=2)
+        cls.order = Order.objects.first()
+        cls.item = OrderItem.objects.first()
+
+    def assert_get_queries(self, num, url, data=None):
+        """
+        Asserts a GET request to the url runs exactly num queries and succeeds
+        :param num: expected number of queries
+        :type num: int
+        :param url: requested URL
+        :type url: str
+        :param data: query parameters
+        :type data: dict
+        :return: response
+        """
+        with self.assertNumQueries(num):
+            res = OrderQueryCountTest.client.get(url, data=data)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        return res
+
+    def test_order_list(self):
+        """
+        Orders page and their items are fetched with two queries
+        """
+        res = self.assert_get_queries(2, order_url)
+        self.assertEqual(len(res.data['results']), 15)
+        self.assertEqual(len(res.data['results'][0]['items']), 3)
+
+    def test_order_list_filtered(self):
+        """
+        The customer filter validates its value with one more query
+        """
+        self.assert_get_queries(3, order_url, data={'customer': OrderQueryCountTest.order.customer_id})
+
+    def test_order_list_expanded(self):
+        """
+        Expanding customers and items doesn't add per-order queries
+        """
+        res = self.assert_get_queries(2, order_url, data={'expand': 'items,customer'})
+        first = res.data['results'][0]
+        self.assertEqual(first['customer']['id'], OrderQueryCountTest.order.customer_id)
+        self.assertEqual(len(first['items']), 3)
+        self.assertIn('number_of_pizzas', first['items'][0])
+
+    def test_order_retrieve(self):
+        self.assert_get_queries(2, reverse('orders:orders-detail', args=[OrderQueryCountTest.order.id]))
+
+    def test_order_retrieve_expanded(self):
+        res = self.assert_get_queries(
+            2,
+            reverse('orders:orders-detail', args=[OrderQueryCountTest.order.id]),
+            data={'expand': 'items,customer'}
+        )
+        self.assertEqual(res.data['customer']['name'], OrderQueryCountTest.order.customer.name)
+
+    def test_order_items_list(self):
+        self.assert_get_queries(1, reverse('orders:orderitems-list', args=[OrderQueryCountTest.order.id]))
+
+    def test_items_list(self):
+        self.assert_get_queries(1, item_url)
+
+    def test_items_retrieve(self):
+        self.assert_get_queries(1, reverse('orders:items-detail', args=[OrderQueryCountTest.item.id]))
+
+    def test_order_status_retrieve(self):
+        """
+        Tests the status is read from the database once and served from the cache afterwards
+        """
+        cache.clear()
+        url = reverse('orders:orderstatus-detail', args=[OrderQueryCountTest.order.id])
+        self.assert_get_queries(1, url)
+        self.assert_get_queries(0, url)
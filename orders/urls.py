@@ -4,6 +4,8 @@ from orders import views
 
 
 router = DefaultRouter()
+# Registered before 'orders', whose detail route would take 'archive' for an order id
+router.register('orders/archive', views.ArchivedOrderViewSet, basename='archivedorders')
 router.register('orders', views.OrderViewSet, basename='orders')
 router.register('orders/(?P<order>[0-9]+)/items', views.OrderItemsViewSet, basename='orderitems')
 router.register('orders/status', views.OrderItemsStatusViewSet, basename='orderstatus')
@@ -1,48 +1,222 @@
+import hashlib
+import json
+import math
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
 from rest_framework import status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, mixins
-from django.db import transaction
+from rest_framework.decorators import action
+from django.db.models import prefetch_related_objects
+from core.idempotency import idempotent
+from core.mixins import ExpandMixin, ExportMixin, FastListMixin, SparseFieldsMixin
 from rest_framework.response import Response
-from orders.models import Order, OrderItem
+from rest_framework.exceptions import NotFound, ValidationError
+from orders.models import ArchivedOrder, Order, OrderItem
+from core.renderers import EventStreamRenderer, FastJSONRenderer
+from orders.events import CHANNEL, broker, ensure_listener
+from orders.status import get_statuses, status_etag, status_version
 from orders.serializers import OrderSerializer, OrderItemSerializer, \
                                 OrderCreateSerializer, OrderItemCreateSerializer, \
-                                ItemSerializer, OrderStatusSerializer, OrderUpdateSerializer
+                                ItemSerializer, OrderStatusSerializer, OrderUpdateSerializer, \
+                                OrderBulkCreateSerializer, OrderClaimSerializer, ArchivedOrderSerializer
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+def parse_order_ids(value):
     """
-    A ViewSet for Orders Model
+    Parses the comma separated '?ids=' list of the order status endpoints
+    :type value: str
+    :raise ValidationError: if the list is empty, too long or has something else than numbers
+    :rtype: list
+    """
+    try:
+        order_ids = sorted({int(x) for x in value.split(',') if x.strip()})
+    except ValueError:
+        raise ValidationError({'ids': 'A comma separated list of order ids is expected'})
+    if not order_ids:
+        raise ValidationError({'ids': 'This parameter is required'})
+    if len(order_ids) > settings.ORDER_STATUS_BATCH_MAX:
+        raise ValidationError({'ids': 'At most {} orders are allowed'.format(settings.ORDER_STATUS_BATCH_MAX)})
+    return order_ids
+
+
+def parse_poll_params(query_params):
+    """
+    :return: '?since=' version and '?timeout=' seconds of a long poll, the timeout is capped by
+             settings.ORDER_EVENTS_TIMEOUT
+    :rtype: tuple
+    """
+    try:
+        since = int(query_params.get('since', 0))
+        timeout = float(query_params.get('timeout', settings.ORDER_EVENTS_TIMEOUT))
+    except ValueError:
+        raise ValidationError({'since': 'since and timeout must be numbers'})
+    # NaN would never run out, the broker would wait forever
+    if not math.isfinite(timeout) or timeout < 0:
+        raise ValidationError({'timeout': 'timeout must be a non negative number of seconds'})
+    return since, min(timeout, settings.ORDER_EVENTS_TIMEOUT)
+
+
+def batch_statuses(order_ids):
+    """
+    Statuses of the existing orders of the list
+    :return: data, ETag of the whole batch, newest change
+    :rtype: tuple
+    """
+    statuses = get_statuses(order_ids)
+    found = [x for x in order_ids if x in statuses]
+    data = [{'id': x, 'order_state': statuses[x][0]} for x in found]
+    etag = '"{}"'.format(hashlib.md5(','.join(status_etag(x, statuses[x][1]) for x in found).encode()).hexdigest())
+    return data, etag, max((statuses[x][1] for x in found), default=None)
+
+
+def current_events(order_ids, since):
+    """
+    Events of the current statuses newer than the known versions, read from the status cache
+    :return: events, known versions including the returned events
+    :rtype: tuple
+    """
+    events = []
+    since = dict(since)
+    for order_id, (order_state, updated) in get_statuses(order_ids).items():
+        version = status_version(updated)
+        if version > since[order_id]:
+            events.append({'id': order_id, 'order_state': order_state, 'version': version})
+            since[order_id] = version
+    return events, since
+
+
+def is_not_modified(if_none_match, if_modified_since, etag, updated):
+    """
+    Checks the client already has the current representation, by If-None-Match or, without it,
+    by If-Modified-Since
+    :type if_none_match: str
+    :type if_modified_since: str
+    :rtype: bool
+    """
+    if if_none_match is not None:
+        return etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+    since = parse_http_date_safe(if_modified_since or '')
+    return since is not None and updated is not None and int(updated.timestamp()) <= since
+
+
+def validator_headers(etag, updated):
+    """
+    ETag, Last-Modified and Cache-Control of the order status responses
+    :rtype: dict
+    """
+    headers = {'ETag': etag}
+    if updated is not None:
+        headers['Last-Modified'] = http_date(updated.timestamp())
+    headers['Cache-Control'] = 'no-cache'
+    return headers
+
+
+class OrderViewSet(ExpandMixin, SparseFieldsMixin, ExportMixin, FastListMixin, viewsets.ModelViewSet):
+    """
+    A ViewSet for Orders Model. Read actions accept '?expand=items,customer' to embed related objects and
+    '?fields=' to return only some of the fields
     """
     serializer_class = OrderSerializer
     queryset = Order.objects.all()
     filter_backends = (DjangoFilterBackend,)
     filter_fields = ('customer', 'order_state')
+    export_fields = ('id', 'customer', 'order_state', 'total_pizzas', 'active_items', 'created', 'updated')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            # Items are fetched with one extra query for the whole page instead of one query per order
+            fields = self.get_sparse_fields()
+            if not fields or 'items' in fields:
+                queryset = queryset.prefetch_related('items')
+            if 'customer' in self.get_expand():
+                queryset = queryset.select_related('customer')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'create':
             return OrderCreateSerializer
         elif self.action in ('update', 'partial_update'):
             return OrderUpdateSerializer
+        elif self.action == 'bulk':
+            return OrderBulkCreateSerializer
+        elif self.action == 'claim':
+            return OrderClaimSerializer
         return self.serializer_class
 
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """
+        Creates an order. Retries with the same 'Idempotency-Key' header get the first response
+        """
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def bulk(self, request, *args, **kwargs):
+        """
+        Creates an order with all its items in one request. A list of such orders is accepted as well
+        """
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(data=request.data if many else [request.data], many=True)
+        serializer.is_valid(raise_exception=True)
+        orders = serializer.save()
+
+        created = Order.objects.filter(id__in=[x.id for x in orders]).prefetch_related('items').in_bulk()
+        data = OrderSerializer([created[x.id] for x in orders], many=True, context=self.get_serializer_context()).data
+        return Response(data if many else data[0], status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def claim(self, request, *args, **kwargs):
+        """
+        Kitchen queue. Claims up to 'limit' oldest Accepted orders and moves them to Processing, concurrent
+        stations never get the same order. Claimed orders are returned with their items
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        orders = Order.objects.claim(serializer.validated_data['limit'])
+        prefetch_related_objects(orders, 'items')
+
+        context = self.get_serializer_context()
+        context['expand'] = context['expand'] | {'items'}
+        return Response(OrderSerializer(orders, many=True, context=context).data)
+
+
+class ArchivedOrderViewSet(SparseFieldsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Read only access to the orders moved to the archive by the archive_orders command, with their items
+    """
+    serializer_class = ArchivedOrderSerializer
+    queryset = ArchivedOrder.objects.all()
+    filter_backends = (DjangoFilterBackend,)
+    filter_fields = ('customer', 'order_state')
+
+    def get_queryset(self):
+        fields = self.get_sparse_fields()
+        if not fields or 'items' in fields:
+            return self.queryset.prefetch_related('items')
+        return self.queryset
+
 
-class OrderItemsViewSet(viewsets.ModelViewSet):
+class OrderItemsViewSet(SparseFieldsMixin, FastListMixin, viewsets.ModelViewSet):
     """
     A ViewSet for Orders Model
     """
     serializer_class = OrderItemSerializer
     queryset = OrderItem.objects.all()
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         order_id = kwargs.get('order')
         data = request.data
         data['order'] = order_id
         serializer = OrderItemCreateSerializer(data=data)
         serializer.is_valid(raise_exception=True)
-        with transaction.atomic():
-            result = Order.objects.select_for_update().get(id=order_id)
-            self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def list(self, request, *args, **kwargs):
@@ -53,7 +227,10 @@ class OrderItemsViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class ItemsViewSet(viewsets.GenericViewSet,
+class ItemsViewSet(SparseFieldsMixin,
+                   ExportMixin,
+                   FastListMixin,
+                   viewsets.GenericViewSet,
                    mixins.ListModelMixin,
                    mixins.RetrieveModelMixin):
     """
@@ -61,12 +238,98 @@ class ItemsViewSet(viewsets.GenericViewSet,
     """
     serializer_class = ItemSerializer
     queryset = OrderItem.objects.all()
+    export_fields = ('id', 'order', 'pizza_name', 'pizza_size', 'number_of_pizzas', 'is_active', 'created', 'updated')
 
 
 class OrderItemsStatusViewSet(viewsets.GenericViewSet,
                               mixins.RetrieveModelMixin):
     """
-    A viewset for order status
+    A viewset for order status, built for frequent polling. Statuses are served from the cache written through on
+    every order save, responses carry ETag and Last-Modified and an unchanged status is answered with 304.
+    '?ids=1,2,3' of the batch action returns statuses of many orders at once, poll and stream push state changes
+    without repeated queries
     """
     serializer_class = OrderStatusSerializer
     queryset = Order.objects.all()
+    authentication_classes = ()
+    permission_classes = ()
+    renderer_classes = (FastJSONRenderer,)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            order_id = int(kwargs['pk'])
+        except ValueError:
+            raise NotFound()
+        statuses = get_statuses([order_id])
+        if order_id not in statuses:
+            raise NotFound()
+        order_state, updated = statuses[order_id]
+        return self.conditional_response(request, {'order_state': order_state},
+                                         status_etag(order_id, updated), updated)
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        return self.conditional_response(request, *batch_statuses(self.get_order_ids()))
+
+    @action(detail=False, methods=['get'])
+    def poll(self, request):
+        """
+        Long polling. Answers as soon as any of the '?ids=' orders has a status version newer than '?since=',
+        or with an empty list after '?timeout=' seconds
+        """
+        order_ids = self.get_order_ids()
+        since, timeout = parse_poll_params(request.query_params)
+        events, since = current_events(order_ids, {x: since for x in order_ids})
+        if not events:
+            ensure_listener()
+            events = broker.wait(since, timeout)
+        return Response(events)
+
+    @action(detail=False, methods=['get'], renderer_classes=(EventStreamRenderer, FastJSONRenderer))
+    def stream(self, request):
+        """
+        Server-Sent Events of the '?ids=' orders. The current statuses are sent first, to reconnecting
+        clients too: Last-Event-ID is the version of one order only, it doesn't tell which changes of the other
+        orders the client saw. Every connection holds a worker thread, so streams are meant for event loop
+        workers (gevent) or the ASGI application
+        """
+        order_ids = self.get_order_ids()
+        response = StreamingHttpResponse(
+            self.event_stream(order_ids, {x: -1 for x in order_ids}),
+            content_type=EventStreamRenderer.media_type
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def event_stream(self, order_ids, since):
+        events, since = current_events(order_ids, since)
+        ensure_listener()
+        yield 'retry: {}\n\n'.format(settings.ORDER_EVENTS_RETRY_MS)
+        while True:
+            for event in events:
+                since[event['id']] = event['version']
+                yield 'id: {}\nevent: {}\ndata: {}\n\n'.format(event['version'], CHANNEL, json.dumps(event))
+            events = broker.wait(since, settings.ORDER_EVENTS_HEARTBEAT)
+            if not events:
+                yield ': keep-alive\n\n'
+
+    def get_order_ids(self):
+        """
+        Parses the '?ids=' list of the collection actions
+        :rtype: list
+        """
+        return parse_order_ids(self.request.query_params.get('ids', ''))
+
+    @staticmethod
+    def conditional_response(request, data, etag, updated):
+        """
+        Returns 304 if the client already has the current representation, checked by If-None-Match or,
+        without it, by If-Modified-Since
+        """
+        not_modified = is_not_modified(request.META.get('HTTP_IF_NONE_MATCH'),
+                                       request.META.get('HTTP_IF_MODIFIED_SINCE'), etag, updated)
+        response = Response(status=status.HTTP_304_NOT_MODIFIED) if not_modified else Response(data)
+        for name, value in validator_headers(etag, updated).items():
+            response[name] = value
+        return response
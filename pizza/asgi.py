@@ -0,0 +1,21 @@
+"""
+ASGI config for pizza project. Run with an ASGI server, e.g.
+gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker pizza.asgi:application
+
+The order status endpoints and the menu lists are served by async handlers, so waiting and slow clients don't
+hold a thread each. Every other request goes to the WSGI application in a thread pool, see core.asgi
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pizza.settings')
+
+wsgi_application = get_wsgi_application()
+
+from core.asgi import AsgiApplication  # noqa: E402
+from orders.asgi import routes as order_routes  # noqa: E402
+from pizzas.asgi import routes as pizza_routes  # noqa: E402
+
+application = AsgiApplication(wsgi_application, order_routes + pizza_routes)
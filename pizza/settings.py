@@ -18,6 +18,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/2.1/howto/deployment/checklist/
+# Production deployments use pizza.settings_production
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = '@()@&171_cn_(jfnqmn4mt706ah77)47c0rhimjfitq%fa_v+6'
@@ -41,11 +42,13 @@ INSTALLED_APPS = [
     'core',
     'customers',
     'pizzas',
-    'orders'
+    'orders',
+    'analytics',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -78,16 +81,52 @@ WSGI_APPLICATION = 'pizza.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
+# DB_PGBOUNCER=1 makes the application work through PgBouncer in transaction pooling mode. A server connection
+# is held only for a transaction, so server side cursors, which outlive it, are disabled. LISTEN needs a session
+# of its own, the order events listener connects to PostgreSQL directly, see ORDER_EVENTS_LISTEN_HOST
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER') == '1'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql_psycopg2',
         'HOST': os.getenv('DB_HOST'),
+        'PORT': os.getenv('DB_PORT', ''),
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
-        'PASSWORD': os.getenv('DB_PASS')
+        'PASSWORD': os.getenv('DB_PASS'),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+    }
+}
+
+# Read replicas, DB_REPLICA_HOSTS is a comma separated list of 'host' or 'host:port' items. Replicas use
+# the credentials of the primary and mirror it in tests
+DATABASE_REPLICAS = []
+for number, replica in enumerate(x.strip() for x in os.getenv('DB_REPLICA_HOSTS', '').split(',') if x.strip()):
+    host, _, port = replica.partition(':')
+    alias = 'replica_{}'.format(number)
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host, PORT=port, TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db_routers.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after its last write
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+
+# Cache
+# The local memory cache is per process. Point CACHE_BACKEND/CACHE_LOCATION to a shared cache (e.g. memcached)
+# when running several workers, so they share the menu catalog and its version
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
+# Lifetime of a menu catalog version in the shared cache, seconds
+MENU_CATALOG_TIMEOUT = int(os.getenv('MENU_CATALOG_TIMEOUT', 24 * 60 * 60))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -128,3 +167,65 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 TEMPLATE_DIRS = (os.path.join(BASE_DIR,  'templates'),)
+
+
+# Django REST framework
+# All list endpoints use keyset pagination over '-created', see core.pagination
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CreatedCursorPagination',
+    'PAGE_SIZE': int(os.getenv('PAGINATION_PAGE_SIZE', 50)),
+    # Same output as JSONRenderer, encoded with orjson when it is installed
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+}
+
+# Upper bound for the 'page_size' query parameter
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv('PAGINATION_MAX_PAGE_SIZE', 500))
+
+# Maximum number of orders accepted by one POST /api/orders/bulk/ request
+ORDERS_BULK_CREATE_MAX_ORDERS = int(os.getenv('ORDERS_BULK_CREATE_MAX_ORDERS', 1000))
+
+# Rows fetched at once by the server side cursor of streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Lifetime of cached order statuses, seconds. Statuses are written through on every order save
+ORDER_STATUS_CACHE_TIMEOUT = int(os.getenv('ORDER_STATUS_CACHE_TIMEOUT', 60 * 60))
+
+# Maximum number of orders in one status batch request
+ORDER_STATUS_BATCH_MAX = int(os.getenv('ORDER_STATUS_BATCH_MAX', 100))
+
+# Maximum number of orders a kitchen station can claim at once
+ORDERS_CLAIM_MAX_ORDERS = int(os.getenv('ORDERS_CLAIM_MAX_ORDERS', 50))
+
+# Order state push channel: maximum long poll wait and SSE keep-alive interval in seconds, number of recent
+# events kept by every process and the reconnection delay advised to SSE clients
+ORDER_EVENTS_TIMEOUT = int(os.getenv('ORDER_EVENTS_TIMEOUT', 30))
+ORDER_EVENTS_HEARTBEAT = int(os.getenv('ORDER_EVENTS_HEARTBEAT', 15))
+ORDER_EVENTS_BUFFER = int(os.getenv('ORDER_EVENTS_BUFFER', 10000))
+ORDER_EVENTS_RETRY_MS = 3000
+# PostgreSQL host and port of the LISTEN connection, the ones of the default database when empty
+ORDER_EVENTS_LISTEN_HOST = os.getenv('ORDER_EVENTS_LISTEN_HOST', '')
+ORDER_EVENTS_LISTEN_PORT = os.getenv('ORDER_EVENTS_LISTEN_PORT', '')
+
+# Analytics rollups: customers rebuilt per statement and seconds the refresh looks back before its previous run,
+# to pick up transactions that committed after it
+ANALYTICS_BATCH_SIZE = int(os.getenv('ANALYTICS_BATCH_SIZE', 5000))
+ANALYTICS_REFRESH_OVERLAP = int(os.getenv('ANALYTICS_REFRESH_OVERLAP', 5 * 60))
+
+# Maximum number of customers returned by the customer search
+CUSTOMER_SEARCH_MAX_RESULTS = int(os.getenv('CUSTOMER_SEARCH_MAX_RESULTS', 100))
+
+# Delivered and Canceled orders unchanged for this many days are moved to the archive tables by archive_orders,
+# in transactions of ORDERS_ARCHIVE_BATCH_SIZE orders
+ORDERS_ARCHIVE_AFTER_DAYS = int(os.getenv('ORDERS_ARCHIVE_AFTER_DAYS', 90))
+ORDERS_ARCHIVE_BATCH_SIZE = int(os.getenv('ORDERS_ARCHIVE_BATCH_SIZE', 1000))
+
+# Seconds a response stored for an 'Idempotency-Key' header is replayed to retries of the request
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+# Threads of a pizza.asgi process running the ORM, the cache and the Django views for the async handlers.
+# They bound the database connections of the process
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', 32))
@@ -0,0 +1,46 @@
+"""
+Production settings, selected with DJANGO_SETTINGS_MODULE=pizza.settings_production. Everything not set here
+comes from pizza.settings. Served by gunicorn, see gunicorn.conf.py and docker-compose.prod.yml
+"""
+import os
+
+from pizza.settings import *  # noqa: F401,F403
+
+
+DEBUG = False
+
+SECRET_KEY = os.environ['SECRET_KEY']
+
+ALLOWED_HOSTS = [x.strip() for x in os.getenv('ALLOWED_HOSTS', '').split(',') if x.strip()]
+
+# Persistent connections, seconds. Every worker thread keeps its own connection, so the database has to accept
+# GUNICORN_WORKERS * GUNICORN_THREADS connections per application server, plus one per worker for the order
+# events listener. With DB_PGBOUNCER the connections go to PgBouncer and PostgreSQL sees only its pool
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', 60))
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = CONN_MAX_AGE
+
+# Workers are separate processes, the order statuses and the menu catalog version have to be in a shared cache
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.memcached.MemcachedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', '127.0.0.1:11211'),
+    }
+}
+
+# The browsable API renders templates and runs extra queries for its forms
+REST_FRAMEWORK = dict(REST_FRAMEWORK, DEFAULT_RENDERER_CLASSES=('core.renderers.FastJSONRenderer',))
+
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'static'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': os.getenv('LOG_LEVEL', 'WARNING'),
+    },
+}
@@ -4,4 +4,5 @@ urlpatterns = [
     path('api/', include('pizzas.urls')),
     path('api/', include('orders.urls')),
     path('api/', include('customers.urls')),
+    path('api/', include('analytics.urls')),
 ]
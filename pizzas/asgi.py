@@ -0,0 +1,29 @@
+from django.utils.http import parse_etags
+
+from core.asgi import run_sync, send_json
+from core.serializers import get_field_sources, parse_fields
+from pizzas.catalog import menu_catalog
+from pizzas.serializers import PizzaSerializer, PizzaSizeSerializer
+
+
+def menu_list(section, serializer_class):
+    """
+    Async counterpart of MenuCatalogListMixin.list
+    :param section: catalog section
+    :type section: str
+    :param serializer_class: serializer of the section, it tells the known '?fields=' names
+    """
+    async def handler(request, send):
+        fields = parse_fields(request.query_params.get('fields', '')) & set(get_field_sources(serializer_class))
+        etag = await run_sync(menu_catalog.etag, fields)
+        if_none_match = parse_etags(request.headers.get('if-none-match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return await send_json(send, 304, headers={'ETag': etag})
+        await send_json(send, 200, await run_sync(menu_catalog.serialized, section, fields), {'ETag': etag})
+    return handler
+
+
+routes = [
+    (r'/api/pizzas/', menu_list('pizzas', PizzaSerializer)),
+    (r'/api/pizzas/sizes/', menu_list('sizes', PizzaSizeSerializer)),
+]
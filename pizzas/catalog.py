@@ -0,0 +1,120 @@
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+VERSION_KEY = 'pizzas:menu:version'
+DATA_KEY = 'pizzas:menu:{}'
+
+
+class MenuCatalog:
+    """
+    Active pizzas and pizza sizes cached in two levels: a process local copy and the shared Django cache.
+    Both are keyed by a menu version kept in the shared cache. Any change of Pizzas or PizzaSizes bumps the
+    version, so every process drops its local copy on the next access and the first one rebuilds the
+    shared entry from the database
+    """
+    sections = ('pizzas', 'sizes')
+
+    def __init__(self):
+        self._local = (None, None)
+
+    def version(self):
+        """
+        Current menu version. A missing version (empty or flushed cache) starts from a random number,
+        so it never matches a copy built before the flush
+        :rtype: int
+        """
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, random.getrandbits(62), None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    def etag(self, fields=None):
+        """
+        ETag of the menu list responses
+        :param fields: names of the selected fields, all fields if empty
+        :type fields: set
+        :rtype: str
+        """
+        if fields:
+            return '"menu-{}-{}"'.format(self.version(), '.'.join(sorted(fields)))
+        return '"menu-{}"'.format(self.version())
+
+    def invalidate(self):
+        """
+        Bumps the version now, so the current process doesn't see stale data inside its own transaction, and
+        once more on commit, so other processes can't keep a copy rebuilt before the change became visible
+        """
+        self._bump()
+        transaction.on_commit(self._bump)
+
+    @staticmethod
+    def _bump():
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, random.getrandbits(62), None)
+
+    def get(self, section, pk):
+        """
+        Returns an active model instance from the catalog
+        :param section: 'pizzas' or 'sizes'
+        :type section: str
+        :param pk: primary key
+        :type pk: int
+        :raise KeyError: if there is no such active object
+        """
+        return self._load()[section]['objects'][pk]
+
+    def ids(self, section):
+        """
+        Ids of all active objects of the section
+        :rtype: set
+        """
+        return set(self._load()[section]['objects'])
+
+    def serialized(self, section, fields=None):
+        """
+        Serialized representation of the active objects of the section, newest first
+        :param fields: names of the selected fields, all fields if empty
+        :type fields: set
+        :rtype: list
+        """
+        data = self._load()[section]['data']
+        if fields:
+            return [{k: v for k, v in x.items() if k in fields} for x in data]
+        return data
+
+    def _load(self):
+        version = self.version()
+        local_version, data = self._local
+        if local_version != version:
+            data = cache.get(DATA_KEY.format(version))
+            if data is None:
+                data = self._build()
+                cache.set(DATA_KEY.format(version), data, settings.MENU_CATALOG_TIMEOUT)
+            self._local = (version, data)
+        return data
+
+    @staticmethod
+    def _build():
+        from pizzas.models import Pizzas, PizzaSizes
+        from pizzas.serializers import PizzaSerializer, PizzaSizeSerializer
+
+        data = {}
+        for section, model, serializer_class in (('pizzas', Pizzas, PizzaSerializer),
+                                                 ('sizes', PizzaSizes, PizzaSizeSerializer)):
+            # Read from the primary, a lagging replica would store an outdated menu under the new version
+            objects = list(model.objects.using(DEFAULT_DB_ALIAS).filter(is_deleted=False).order_by('-created', '-id'))
+            data[section] = {
+                'objects': {x.id: x for x in objects},
+                'data': [dict(x) for x in serializer_class(objects, many=True).data],
+            }
+        return data
+
+
+menu_catalog = MenuCatalog()
@@ -0,0 +1,26 @@
+# Generated by Django 2.1.4 on 2026-10-18 01:53
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Partial indexes on the active (not soft deleted) rows. Django 2.1 can't declare index conditions in
+    Meta.indexes, so they are created with plain SQL understood by both PostgreSQL and SQLite
+    """
+
+    dependencies = [
+        ('pizzas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ['CREATE INDEX pizzas_active_created_idx ON pizzas_pizzas (created DESC, id DESC) WHERE NOT is_deleted'],
+            ['DROP INDEX pizzas_active_created_idx'],
+        ),
+        migrations.RunSQL(
+            ['CREATE INDEX pizzasizes_active_created_idx ON pizzas_pizzasizes (created DESC, id DESC) '
+             'WHERE NOT is_deleted'],
+            ['DROP INDEX pizzasizes_active_created_idx'],
+        ),
+    ]
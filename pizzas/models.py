@@ -1,18 +1,40 @@
 from django.db import models
+from django.utils import timezone
 from core.models import TimeStampedModel
 from django.db.models import QuerySet
+from pizzas.catalog import menu_catalog
 
 
 class PizzaQuerySet(QuerySet):
     """
-    Pizza's QuerySet object with hidden delete method
+    Pizza's QuerySet object with hidden delete method. Soft delete and restore are set based, the whole
+    queryset is changed by a single UPDATE. All of them invalidate the menu catalog
     """
     def _delete(self):
         super().delete()
+        menu_catalog.invalidate()
 
     def delete(self):
-        for obj in self:
-            obj.delete()
+        """
+        Marks all objects of the queryset as deleted
+        :return: number of updated rows
+        :rtype: int
+        """
+        updated = self.update(is_deleted=True, updated=timezone.now())
+        if updated:
+            menu_catalog.invalidate()
+        return updated
+
+    def restore(self):
+        """
+        Brings back all soft deleted objects of the queryset
+        :return: number of updated rows
+        :rtype: int
+        """
+        updated = self.update(is_deleted=False, updated=timezone.now())
+        if updated:
+            menu_catalog.invalidate()
+        return updated
 
 
 class Pizzas(TimeStampedModel):
@@ -24,6 +46,10 @@ class Pizzas(TimeStampedModel):
 
     objects = PizzaQuerySet.as_manager()
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        menu_catalog.invalidate()
+
     def delete(self, using=None, keep_parents=False):
         """
         Don't delete object from the database
@@ -36,6 +62,7 @@ class Pizzas(TimeStampedModel):
         Don't delete object from the database
         """
         super().delete()
+        menu_catalog.invalidate()
 
     class Meta:
         ordering = ['-created']
@@ -62,6 +89,10 @@ class PizzaSizes(TimeStampedModel):
 
     objects = PizzaQuerySet.as_manager()
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        menu_catalog.invalidate()
+
     def delete(self, using=None, keep_parents=False):
         """
         Don't delete object from the database
@@ -1,8 +1,10 @@
 from .models import Pizzas, PizzaSizes
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ModelSerializer, Serializer, ListField, IntegerField, PrimaryKeyRelatedField
+from pizzas.catalog import menu_catalog
+from core.serializers import SelectableFieldsMixin
 
 
-class PizzaSerializer(ModelSerializer):
+class PizzaSerializer(SelectableFieldsMixin, ModelSerializer):
     """
     A Pizzas model general serializer
     """
@@ -12,7 +14,7 @@ class PizzaSerializer(ModelSerializer):
         read_only_fields = ('id', )
 
 
-class PizzaSizeSerializer(ModelSerializer):
+class PizzaSizeSerializer(SelectableFieldsMixin, ModelSerializer):
     """
     A PizzaSizes model general serializer
     """
@@ -20,3 +22,28 @@ class PizzaSizeSerializer(ModelSerializer):
         model = PizzaSizes
         fields = ('id', 'sizename', 'created', 'updated')
         read_only_fileds = ('id', )
+
+
+class PizzaIdsSerializer(Serializer):
+    """
+    A list of pizza ids for bulk actions
+    """
+    ids = ListField(child=IntegerField(), allow_empty=False)
+
+
+class MenuCatalogRelatedField(PrimaryKeyRelatedField):
+    """
+    A primary key field resolved against the menu catalog instead of the database. Only active (not deleted)
+    objects are accepted
+    """
+    def __init__(self, section, **kwargs):
+        self.section = section
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return menu_catalog.get(self.section, int(data))
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
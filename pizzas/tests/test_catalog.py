@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+from rest_framework.test import APIClient
+
+from orders.serializers import OrderItemCreateSerializer
+from pizzas.catalog import menu_catalog
+from pizzas.models import Pizzas, PizzaSizes
+
+
+pizza_url = reverse('pizzas:pizzas-list')
+
+
+class MenuCatalogTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.pizza = Pizzas.objects.create(name='catalog_pizza')
+        cls.size = PizzaSizes.objects.create(sizename=PizzaSizes.SMALL)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_not_modified_without_queries(self):
+        """
+        Tests a client with the current ETag gets 304 without database access
+        """
+        res = MenuCatalogTest.client.get(pizza_url)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = MenuCatalogTest.client.get(pizza_url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_save_changes_etag_and_content(self):
+        etag = MenuCatalogTest.client.get(pizza_url)['ETag']
+        Pizzas.objects.create(name='new_pizza')
+
+        res = MenuCatalogTest.client.get(pizza_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertIn('new_pizza', [x['name'] for x in res.data])
+
+    def test_soft_delete_removes_from_catalog(self):
+        """
+        Tests both model and queryset soft deletes invalidate the catalog
+        """
+        self.assertIn(MenuCatalogTest.pizza.id, menu_catalog.ids('pizzas'))
+        MenuCatalogTest.pizza.delete()
+        self.assertNotIn(MenuCatalogTest.pizza.id, menu_catalog.ids('pizzas'))
+
+        Pizzas.objects.filter(id=MenuCatalogTest.pizza.id).restore()
+        self.assertIn(MenuCatalogTest.pizza.id, menu_catalog.ids('pizzas'))
+
+        PizzaSizes.objects.filter(id=MenuCatalogTest.size.id).delete()
+        self.assertNotIn(MenuCatalogTest.size.id, menu_catalog.ids('sizes'))
+
+    def test_item_validation_uses_catalog(self):
+        """
+        Tests pizza and size of a new order item are validated without database queries
+        """
+        menu_catalog.ids('pizzas')
+        serializer = OrderItemCreateSerializer(data={
+            'pizza_name': MenuCatalogTest.pizza.id,
+            'pizza_size': MenuCatalogTest.size.id,
+            'number_of_pizzas': 1
+        })
+        with self.assertNumQueries(0):
+            serializer.fields['pizza_name'].run_validation(MenuCatalogTest.pizza.id)
+            serializer.fields['pizza_size'].run_validation(MenuCatalogTest.size.id)
+
+    def test_deleted_pizza_is_rejected(self):
+        MenuCatalogTest.pizza.delete()
+        serializer = OrderItemCreateSerializer(data={
+            'pizza_name': MenuCatalogTest.pizza.id,
+            'pizza_size': MenuCatalogTest.size.id,
+            'number_of_pizzas': 1
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('pizza_name', serializer.errors)
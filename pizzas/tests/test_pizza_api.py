@@ -0,0 +1,71 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.test import APIClient
+
+from pizzas.models import Pizzas
+
+
+bulk_delete_url = reverse('pizzas:pizzas-bulk-delete')
+bulk_restore_url = reverse('pizzas:pizzas-bulk-restore')
+
+
+class PizzaSoftDeleteTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.pizzas = [Pizzas.objects.create(name='pizza_{}'.format(x)) for x in range(5)]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_queryset_delete_is_one_update(self):
+        """
+        Tests soft delete of a queryset runs a single query and keeps the rows
+        """
+        updated_before = Pizzas.objects.get(id=PizzaSoftDeleteTest.pizzas[0].id).updated
+        with self.assertNumQueries(1):
+            deleted = Pizzas.objects.all().delete()
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(Pizzas.objects.filter(is_deleted=True).count(), 5)
+        self.assertGreater(Pizzas.objects.get(id=PizzaSoftDeleteTest.pizzas[0].id).updated, updated_before)
+
+    def test_queryset_restore(self):
+        Pizzas.objects.all().delete()
+        with self.assertNumQueries(1):
+            restored = Pizzas.objects.filter(id=PizzaSoftDeleteTest.pizzas[0].id).restore()
+
+        self.assertEqual(restored, 1)
+        self.assertFalse(Pizzas.objects.get(id=PizzaSoftDeleteTest.pizzas[0].id).is_deleted)
+
+    def test_hidden_hard_delete(self):
+        """
+        Tests _delete still removes the rows from the database
+        """
+        Pizzas.objects.filter(id=PizzaSoftDeleteTest.pizzas[0].id)._delete()
+        self.assertFalse(Pizzas.objects.filter(id=PizzaSoftDeleteTest.pizzas[0].id).exists())
+
+    def test_bulk_delete_and_restore_api(self):
+        """
+        Tests bulk delete hides pizzas from the list and bulk restore brings them back
+        """
+        ids = [x.id for x in PizzaSoftDeleteTest.pizzas[:3]]
+        res = PizzaSoftDeleteTest.client.post(bulk_delete_url, json.dumps({'ids': ids}), content_type='application/json')
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data['deleted'], 3)
+
+        listed = PizzaSoftDeleteTest.client.get(reverse('pizzas:pizzas-list'))
+        self.assertEqual(len(listed.data), 2)
+
+        res = PizzaSoftDeleteTest.client.post(bulk_restore_url, json.dumps({'ids': ids}), content_type='application/json')
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data['restored'], 3)
+
+    def test_fail_bulk_delete_without_ids(self):
+        res = PizzaSoftDeleteTest.client.post(bulk_delete_url, json.dumps({'ids': []}), content_type='application/json')
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APIClient
+
+from pizzas.models import Pizzas, PizzaSizes
+
+
+class PizzaQueryCountTest(TestCase):
+    """
+    Query count regression tests for the menu endpoints
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.pizzas = [Pizzas.objects.create(name='pizza_{}'.format(x)) for x in range(10)]
+        cls.sizes = [PizzaSizes.objects.create(sizename=x) for x, _ in PizzaSizes.SIZE_CHOICES]
+
+    def assert_get_queries(self, num, url):
+        with self.assertNumQueries(num):
+            res = PizzaQueryCountTest.client.get(url)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pizza_list(self):
+        """
+        A cold menu catalog loads pizzas and sizes once, later lists are served from the cache
+        """
+        self.assert_get_queries(2, reverse('pizzas:pizzas-list'))
+        self.assert_get_queries(0, reverse('pizzas:pizzas-list'))
+
+    def test_pizza_retrieve(self):
+        self.assert_get_queries(1, reverse('pizzas:pizzas-detail', args=[PizzaQueryCountTest.pizzas[0].id]))
+
+    def test_size_list(self):
+        self.assert_get_queries(2, reverse('pizzas:pizzasizes-list'))
+        self.assert_get_queries(0, reverse('pizzas:pizzasizes-list'))
+
+    def test_size_retrieve(self):
+        self.assert_get_queries(1, reverse('pizzas:pizzasizes-detail', args=[PizzaQueryCountTest.sizes[0].id]))
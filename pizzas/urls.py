@@ -4,8 +4,9 @@ from pizzas import views
 
 
 router = DefaultRouter()
-router.register('pizzas', views.PizzaViewSet)
+# 'pizzas/sizes' goes first, otherwise its list URL is matched by the pizza detail route
 router.register('pizzas/sizes', views.PizzaSizeViewSet)
+router.register('pizzas', views.PizzaViewSet)
 
 app_name = 'pizzas'
 
@@ -1,25 +1,73 @@
-from rest_framework import viewsets, mixins
-from pizzas.serializers import PizzaSerializer, PizzaSizeSerializer
+from django.utils.http import parse_etags
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from core.mixins import SparseFieldsMixin
+from pizzas.catalog import menu_catalog
+from pizzas.serializers import PizzaSerializer, PizzaSizeSerializer, PizzaIdsSerializer
 from pizzas.models import Pizzas, PizzaSizes
 
 
-class PizzaViewSet(viewsets.ModelViewSet):
+class MenuCatalogListMixin:
     """
-    A ViewSet for Pizza Model
+    Serves the list action from the menu catalog without touching the database. The menu is small, so it is
+    returned as a whole without pagination. Clients sending the ETag back in If-None-Match get 304 until
+    the menu changes. Used with SparseFieldsMixin, '?fields=' selects the fields and is part of the ETag
+    """
+    catalog_section = None
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        # The ETag is taken first: if the menu changes in between, the client just gets it again next time
+        fields = self.get_sparse_fields()
+        etag = menu_catalog.etag(fields)
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(menu_catalog.serialized(self.catalog_section, fields), headers={'ETag': etag})
+
+
+class PizzaViewSet(MenuCatalogListMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    """
+    A ViewSet for Pizza Model. The list is served from the menu catalog
     """
     serializer_class = PizzaSerializer
     queryset = Pizzas.objects.all()
+    catalog_section = 'pizzas'
 
     def get_queryset(self):
         return self.queryset.filter(is_deleted=False)
 
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request, *args, **kwargs):
+        """
+        Soft deletes all pizzas listed in 'ids' with one UPDATE
+        """
+        serializer = PizzaIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deleted = self.get_queryset().filter(id__in=serializer.validated_data['ids']).delete()
+        return Response({'deleted': deleted})
+
+    @action(detail=False, methods=['post'], url_path='bulk-restore')
+    def bulk_restore(self, request, *args, **kwargs):
+        """
+        Restores all soft deleted pizzas listed in 'ids' with one UPDATE
+        """
+        serializer = PizzaIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        restored = self.queryset.filter(id__in=serializer.validated_data['ids'], is_deleted=True).restore()
+        return Response({'restored': restored})
+
 
-class PizzaSizeViewSet(viewsets.GenericViewSet,
+class PizzaSizeViewSet(MenuCatalogListMixin,
+                       SparseFieldsMixin,
+                       viewsets.GenericViewSet,
                        mixins.ListModelMixin,
                        mixins.RetrieveModelMixin):
     """
-    A ViewSet for PizzaSize Model
+    A ViewSet for PizzaSize Model. The list of active sizes is served from the menu catalog
     """
     serializer_class = PizzaSizeSerializer
     queryset = PizzaSizes.objects.all()
+    catalog_section = 'sizes'
 